@@ -0,0 +1,63 @@
+"""Micro-benchmark: `emails list --brief` body previews, old marker loop vs instantly.extract.
+
+Run with `python benchmarks/bench_extract.py [--emails 100] [--repeat 20]`.
+"""
+
+import argparse
+import random
+import timeit
+
+from instantly.extract import preview
+
+
+def legacy_preview(body: dict) -> str:
+    """The previous implementation: one find() per marker, then a full whitespace collapse."""
+    text = body.get("text", "")
+    for marker in ["\nOn ", "\n>", "\n---", "\n___", "\nFrom:"]:
+        idx = text.find(marker)
+        if idx > 0:
+            text = text[:idx]
+    text = " ".join(text.split())
+    return text[:500]
+
+
+def make_page(count: int, seed: int = 1) -> list:
+    """Emails shaped like real replies: a short answer on top of a long quoted thread."""
+    rng = random.Random(seed)
+    words = "thanks interested pricing call next week investors round seed demo happy".split()
+    page = []
+    for i in range(count):
+        reply = " ".join(rng.choice(words) for _ in range(rng.randint(10, 120)))
+        quoted = "\n".join("> " + " ".join(rng.choice(words) for _ in range(12)) for _ in range(rng.randint(50, 400)))
+        header = rng.choice([
+            "On Mon, Jan 1, 2024 at 10:00 AM Daniel <d@easyvc.ai> wrote:",
+            "Le lun. 1 janv. 2024 à 10:00, Daniel <d@easyvc.ai> a écrit :",
+            "________________________________\nFrom: Daniel\nSent: Monday",
+        ])
+        text = f"{reply}\n\n{header}\n{quoted}"
+        html = f"<div><p>{reply}</p><div class='gmail_quote'>{header}<blockquote>{quoted}</blockquote></div></div>"
+        page.append({"text": text, "html": html} if i % 4 else {"text": "", "html": html})
+    return page
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--emails", type=int, default=100, help="emails per page")
+    parser.add_argument("--repeat", type=int, default=20, help="pages per measurement")
+    args = parser.parse_args()
+
+    page = make_page(args.emails)
+    text_page = [b for b in page if b["text"]]
+    html_page = [b for b in page if not b["text"]]
+
+    def measure(fn, bodies):
+        return min(timeit.repeat(lambda: [fn(b) for b in bodies], number=args.repeat, repeat=3)) / args.repeat * 1000
+
+    legacy = measure(legacy_preview, text_page)
+    current = measure(preview, text_page)
+    html = measure(preview, html_page)
+    print(f"text bodies ({len(text_page)}): legacy {legacy:8.2f} ms, extract {current:8.2f} ms, speedup {legacy / current:.2f}x")
+    print(f"HTML-only bodies ({len(html_page)}): extract {html:8.2f} ms (legacy returns empty previews)")
+
+if __name__ == "__main__":
+    main()
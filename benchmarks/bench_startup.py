@@ -0,0 +1,112 @@
+"""Startup regression gate: time `instantly --help` and argument parsing, and check what they import.
+
+Run with `python benchmarks/bench_startup.py [--runs 20] [--save] [--tolerance 0.25]`.
+
+Each case is timed as a fresh interpreter, alternating with a bare
+`python -c pass` whose median is subtracted so the numbers measure the CLI,
+not the machine's interpreter startup. The cost per case is compared with
+benchmarks/startup_baseline.json, like benchmarks/run.py does: a case more
+than --tolerance (and at least --slack-ms) slower than its baseline fails.
+--save records the current costs as the baseline. One extra run per case
+uses `-X importtime` to list the slowest imports and to check that nothing
+pulls in the HTTP stack, SQLite, the HTML parser or orjson before a command
+actually runs. Exits 1 when a case
+regressed or imports a forbidden module.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASELINE = Path(__file__).resolve().parent / "startup_baseline.json"
+ENTRY = "from instantly.cli import main; main()"
+
+CASES = [
+    ["--help"],
+    ["emails", "--help"],
+    ["emails", "unread-count", "--help"],
+    ["campaigns", "list", "--help"],
+    ["leads", "list", "--no-such-option"],  # usage error: parsed and rejected before any request
+]
+
+# Modules that must only load once a command runs
+FORBIDDEN = ("requests", "urllib3", "asyncio", "sqlite3", "html.parser", "orjson")
+
+
+def _run(argv: list) -> float:
+    start = time.perf_counter()
+    subprocess.run(argv, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return (time.perf_counter() - start) * 1000
+
+
+def overhead(args: list, runs: int) -> tuple:
+    """Median wall time of a case and of a bare interpreter, run alternately so machine noise hits both."""
+    bare, case = [], []
+    for _ in range(runs):
+        bare.append(_run([sys.executable, "-c", "pass"]))
+        case.append(_run([sys.executable, "-c", ENTRY, *args]))
+    return statistics.median(case), statistics.median(bare)
+
+
+def imports(args: list) -> tuple:
+    """Cumulative import time in ms by top-level module, and every module loaded, from -X importtime."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", ENTRY, *args],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    cumulative, modules = {}, set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cum, name = line.split("|")
+        if not cum.strip().isdigit():
+            continue
+        modules.add(name.strip())
+        if not name.startswith("  "):
+            cumulative[name.strip()] = int(cum) / 1000
+    return cumulative, modules
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20, help="runs per case (median is reported)")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression")
+    parser.add_argument("--slack-ms", type=float, default=15, help="allowed regression in ms, whichever is larger")
+    parser.add_argument("--save", action="store_true", help="store these results as the baseline")
+    args = parser.parse_args()
+
+    baseline = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+    if not baseline and not args.save:
+        print("No baseline yet; run with --save to create one. Checking imports only.")
+    results = {}
+    failed = False
+    for case in CASES:
+        name = " ".join(case)
+        elapsed, bare = overhead(case, args.runs)
+        cost = results[name] = round(elapsed - bare, 1)
+        loaded, modules = imports(case)
+        forbidden = [module for module in FORBIDDEN if module in modules]
+        # site and encodings load in the bare interpreter too
+        own = {module: ms for module, ms in loaded.items() if module not in ("site", "encodings")}
+        slowest = sorted(own.items(), key=lambda item: -item[1])[:3]
+        old = baseline.get(name)
+        allowed = max(old * (1 + args.tolerance), old + args.slack_ms) if old is not None and not args.save else None
+        ok = (allowed is None or cost <= allowed) and not forbidden
+        failed = failed or not ok
+        against = f" (baseline {old:.0f} ms)" if old is not None else ""
+        print(f"{'ok  ' if ok else 'FAIL'} instantly {name:<36} {cost:6.1f} ms{against}, bare {bare:.0f} ms", end="")
+        print(f"  slowest: {', '.join(f'{module} {ms:.0f}ms' for module, ms in slowest)}")
+        if forbidden:
+            print(f"     imports {', '.join(forbidden)}")
+    if args.save and not failed:
+        BASELINE.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Saved baseline to {BASELINE}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Benchmark: decoding one large list page whole (resp.json()) vs item by item (InstantlyClient.stream_items).
+
+Run with `python benchmarks/bench_stream.py [--items 100] [--html-kb 200]`.
+
+A local HTTP server returns a single page of emails with large HTML bodies.
+Each path consumes the items the way `emails list --all` does (encode each
+as an NDJSON line) and reports peak traced memory and the time until the
+first item is available.
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+os.environ.setdefault("INSTANTLY_API_KEY", "benchmark")
+os.environ.setdefault("INSTANTLY_NO_DAEMON", "1")
+
+from instantly.client import InstantlyClient  # noqa: E402
+from instantly.output import dumps  # noqa: E402
+
+
+def make_page(items: int, html_kb: int) -> bytes:
+    html = "<p>" + "quoted reply text " * (html_kb * 1024 // 18) + "</p>"
+    page = {
+        "items": [{"id": str(i), "subject": f"Re: {i}", "body": {"html": html, "text": html[:500]}} for i in range(items)],
+        "next_starting_after": None,
+    }
+    return json.dumps(page).encode()
+
+
+def serve(body: bytes) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            # Trickle the body so the time to the first item reflects a real download
+            for start in range(0, len(body), 256 * 1024):
+                self.wfile.write(body[start:start + 256 * 1024])
+                time.sleep(0.005)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def measure(consume) -> tuple:
+    tracemalloc.start()
+    start = time.perf_counter()
+    first = None
+    for _ in consume():
+        if first is None:
+            first = time.perf_counter() - start
+    total = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 2**20, first * 1000, total * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--html-kb", type=int, default=200)
+    args = parser.parse_args()
+
+    body = make_page(args.items, args.html_kb)
+    server = serve(body)
+    InstantlyClient.BASE_URL = f"http://127.0.0.1:{server.server_address[1]}"
+    client = InstantlyClient()
+    client.limiter.rules.clear()
+
+    def whole():
+        for item in client.request("GET", "/api/v2/emails", cache_reads=False)["items"]:
+            yield dumps(item)
+
+    def streamed():
+        for item in client.stream_items("GET", "/api/v2/emails"):
+            yield dumps(item)
+
+    print(f"one page: {args.items} emails, {len(body) / 2**20:.1f} MB")
+    for name, consume in (("resp.json()", whole), ("stream_items", streamed)):
+        peak, first, total = measure(consume)
+        print(f"{name:<13} peak {peak:7.1f} MB   first item {first:7.1f} ms   total {total:7.1f} ms")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
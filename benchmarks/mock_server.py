@@ -0,0 +1,262 @@
+"""A local stand-in for the Instantly v2 API, for benchmarks and manual testing.
+
+Run with `python benchmarks/mock_server.py [--port 8765] [--leads 10000] [--latency-ms 20] [--rate-429 0.01]`
+and point the CLI at it with INSTANTLY_BASE_URL=http://127.0.0.1:8765.
+
+Serves generated leads, emails and campaigns with cursor pagination
+(limit / starting_after / next_starting_after) on the endpoints the CLI
+uses. Every response can be delayed by a fixed latency plus random jitter,
+and a fraction of requests can be answered with 429 and Retry-After.
+Writes answer with plausible bodies and change nothing.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import socket
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+WORDS = "thanks interested pricing call next week investors round seed demo happy quick question".split()
+
+
+def _stamp(moment: datetime) -> str:
+    return moment.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+class Fixtures:
+    """Deterministic workspace data: campaigns, leads spread over them, and a reply thread per email."""
+
+    def __init__(self, leads: int, emails: int, campaigns: int, body_kb: float, seed: int = 1):
+        rng = random.Random(seed)
+        self.campaigns = [
+            {
+                "id": f"c{i:05d}",
+                "name": f"Campaign {i}",
+                "status": rng.choice([0, 1, 2, 3]),
+                "timestamp_created": _stamp(EPOCH + timedelta(hours=i)),
+            }
+            for i in range(campaigns)
+        ]
+        self.leads = [
+            {
+                "id": f"l{i:08d}",
+                "email": f"lead{i}@example{i % 97}.com",
+                "first_name": f"First{i}",
+                "last_name": f"Last{i}",
+                "company_name": f"Company {i % 500}",
+                "campaign": self.campaigns[i % campaigns]["id"] if campaigns else None,
+                "lt_interest_status": rng.choice([None, 0, 1, -1]),
+                "custom_variables": {f"var{k}": " ".join(rng.choices(WORDS, k=8)) for k in range(5)},
+                "timestamp_created": _stamp(EPOCH + timedelta(minutes=i)),
+            }
+            for i in range(leads)
+        ]
+        quote = "\n".join("> " + " ".join(rng.choices(WORDS, k=12)) for _ in range(max(1, int(body_kb * 1024 / 80))))
+        self.emails = []
+        for i in range(emails):
+            reply = " ".join(rng.choices(WORDS, k=rng.randint(10, 60)))
+            text = f"{reply}\n\nOn Mon, Jan 1, 2025 at 10:00 AM Daniel <d@example.com> wrote:\n{quote}"
+            lead = self.leads[i % leads]["email"] if leads else f"lead{i}@example.com"
+            sender = f"sender{i % 5}@example.com"
+            # Every third email of a thread is the outgoing one; the rest are replies
+            sent = i % 3 == 0
+            self.emails.append({
+                "id": f"e{i:08d}",
+                "thread_id": f"t{i // 3:08d}",
+                "from_address_email": sender if sent else lead,
+                "to_address_email_list": lead if sent else sender,
+                "eaccount": sender,
+                "lead": lead,
+                "campaign_id": self.leads[i % leads]["campaign"] if leads else None,
+                "ue_type": 1 if sent else 2,
+                "i_status": None if sent else rng.choice([None, 1, -1, 0]),
+                "subject": f"Re: Intro {i}",
+                "timestamp_created": _stamp(EPOCH + timedelta(minutes=7 * i)),
+                "timestamp_email": _stamp(EPOCH + timedelta(minutes=7 * i)),
+                "is_unread": i % 4 == 0,
+                "body": {"text": text, "html": "<div>" + text.replace("\n", "<br>") + "</div>"},
+            })
+        self.by_id = {item["id"]: item for item in self.campaigns + self.leads + self.emails}
+
+
+def _page(items: List[dict], limit: int, starting_after: Optional[str]) -> dict:
+    """Cursor pagination over items sorted by id, the way the API pages."""
+    start = 0
+    if starting_after:
+        # IDs are zero-padded, so they sort in list order
+        lo, hi = 0, len(items)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if items[mid]["id"] <= starting_after:
+                lo = mid + 1
+            else:
+                hi = mid
+        start = lo
+    page = items[start:start + limit]
+    more = start + limit < len(items)
+    return {"items": page, "next_starting_after": page[-1]["id"] if page and more else None}
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], fixtures: Fixtures, latency_ms: float = 0,
+                 jitter_ms: float = 0, rate_429: float = 0, seed: int = 1):
+        super().__init__(address, _Handler)
+        self.fixtures = fixtures
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.rate_429 = rate_429
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.throttled = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+    server: MockServer
+
+    def setup(self):
+        super().setup()
+        # Headers and body go out as separate writes; without this, Nagle plus delayed ACKs add ~40 ms each
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body: dict, headers: Optional[dict] = None) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _handle(self, method: str) -> None:
+        server = self.server
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        with server.lock:
+            server.requests += 1
+            delay = server.latency + server.rng.uniform(0, server.jitter)
+            throttle = server.rng.random() < server.rate_429
+            server.throttled += throttle
+        if delay:
+            time.sleep(delay)
+        if throttle:
+            self._send(429, {"error": "Too Many Requests"}, {"Retry-After": "1"})
+            return
+        status, result = route(server.fixtures, method, url.path, query, body)
+        self._send(status, result)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PATCH(self):
+        self._handle("PATCH")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+
+_ITEM = re.compile(r"^/api/v2/(campaigns|leads|emails)/([^/]+)$")
+
+
+def route(fixtures: Fixtures, method: str, path: str, query: dict, body: dict) -> Tuple[int, dict]:
+    limit = int(query.get("limit") or body.get("limit") or 100)
+    if method == "GET" and path == "/api/v2/campaigns":
+        items = fixtures.campaigns
+        if query.get("search"):
+            items = [c for c in items if query["search"].lower() in c["name"].lower()]
+        return 200, _page(items, limit, query.get("starting_after"))
+    if method == "POST" and path == "/api/v2/leads/list":
+        items = fixtures.leads
+        if body.get("campaign"):
+            items = [lead for lead in items if lead["campaign"] == body["campaign"]]
+        if body.get("contacts"):
+            wanted = {email.lower() for email in body["contacts"]}
+            items = [lead for lead in items if lead["email"] in wanted]
+        return 200, _page(items, limit, body.get("starting_after"))
+    if method == "GET" and path == "/api/v2/emails":
+        items = fixtures.emails
+        low, high = query.get("min_timestamp_created"), query.get("max_timestamp_created")
+        if low or high:
+            items = [e for e in items if (not low or e["timestamp_created"] >= low)
+                     and (not high or e["timestamp_created"] <= high)]
+        if query.get("eaccount"):
+            items = [e for e in items if e["eaccount"] in query["eaccount"].split(",")]
+        return 200, _page(items, limit, query.get("starting_after"))
+    if path == "/api/v2/emails/unread/count":
+        return 200, {"count": sum(1 for e in fixtures.emails if e["is_unread"])}
+    if path == "/api/v2/leads/add":
+        leads = body.get("leads") or []
+        return 200, {"status": "success", "total_sent": len(leads), "leads_uploaded": len(leads),
+                     "duplicated_leads": 0, "remaining_in_plan": 100000}
+    if path == "/api/v2/leads/update-interest-status":
+        return 202, {"message": "Interest status update background job submitted"}
+    if path in ("/api/v2/emails/reply", "/api/v2/emails/forward"):
+        return 200, {"id": "e-sent", **{k: body.get(k) for k in ("reply_to_uuid", "eaccount", "subject")}}
+    match = _ITEM.match(path)
+    if match and method == "GET":
+        item = fixtures.by_id.get(match.group(2))
+        return (200, item) if item else (404, {"error": "Not Found"})
+    if match and method == "PATCH":
+        item = fixtures.by_id.get(match.group(2))
+        return (200, {**item, **body}) if item else (404, {"error": "Not Found"})
+    # Campaign actions, mark-as-read, ...: acknowledge without changing anything
+    return 200, {"success": True}
+
+
+def start(port: int = 0, leads: int = 1000, emails: int = 1000, campaigns: int = 50, body_kb: float = 2,
+          latency_ms: float = 0, jitter_ms: float = 0, rate_429: float = 0, seed: int = 1) -> MockServer:
+    """Start a mock server on a background thread; port 0 picks a free port (see server.url)."""
+    fixtures = Fixtures(leads, emails, campaigns, body_kb, seed)
+    server = MockServer(("127.0.0.1", port), fixtures, latency_ms, jitter_ms, rate_429, seed)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--leads", type=int, default=10000)
+    parser.add_argument("--emails", type=int, default=5000)
+    parser.add_argument("--campaigns", type=int, default=200)
+    parser.add_argument("--body-kb", type=float, default=2, help="size of the quoted thread in each email body")
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--rate-429", type=float, default=0, help="fraction of requests answered with 429")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    server = start(args.port, args.leads, args.emails, args.campaigns, args.body_kb,
+                   args.latency_ms, args.jitter_ms, args.rate_429, args.seed)
+    print(f"Mock Instantly API on {server.url} (Ctrl-C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""Benchmark suite: run CLI workloads against the local mock API and compare with a stored baseline.
+
+Run with `python benchmarks/run.py [--only leads_list] [--save] [--tolerance 0.25]`.
+
+Each case runs `instantly` as a fresh process against benchmarks/mock_server.py,
+with a throwaway HOME whose config turns client-side rate limits off, so
+the numbers measure the CLI rather than the rate budget. Reported per case:
+wall time, items per second where it applies, and the peak RSS of the CLI
+process. Results are compared with benchmarks/baseline.json. A case that is
+slower, or uses more memory, than the baseline by more than --tolerance
+fails the run (exit 1). --save stores the current results as the new
+baseline.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import mock_server  # noqa: E402
+
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+LEADS = 5000
+EMAILS = 2000
+IMPORT_LEADS = 20000
+
+# Runs `instantly` and reports its peak RSS, which getrusage only gives for waited-on children
+_MEASURE = (
+    "import resource, subprocess, sys\n"
+    "code = subprocess.run([sys.executable, '-c', 'from instantly.cli import main; main()', *sys.argv[1:]],"
+    " stdout=subprocess.DEVNULL).returncode\n"
+    "print(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)\n"
+    "sys.exit(code)\n"
+)
+
+
+def _run(env: dict, args: list) -> tuple:
+    """Wall seconds and peak RSS (MB) of one `instantly <args>` run."""
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-c", _MEASURE, *args], env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"instantly {' '.join(args)} failed: {proc.stderr.strip()[-500:]}")
+    return elapsed, int(proc.stdout.split()[-1]) / 1024
+
+
+def _cases(workdir: Path) -> dict:
+    """name -> (arguments, items processed or None)."""
+    leads_csv = workdir / "leads.csv"
+    with open(leads_csv, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["email", "first_name", "company_name", "plan"])
+        for i in range(IMPORT_LEADS):
+            writer.writerow([f"new{i}@example.com", f"New{i}", f"Company {i % 300}", "seed"])
+    return {
+        "cold_start_help": (["--help"], None),
+        "cold_start_unread_count": (["emails", "unread-count"], None),
+        "leads_list_all": (["-o", "ndjson", "leads", "list", "--all"], LEADS),
+        "leads_list_all_stream": (["-o", "ndjson", "--stream", "leads", "list", "--all"], LEADS),
+        "emails_list_all": (["emails", "list", "--all"], EMAILS),
+        "emails_list_all_brief": (["emails", "list", "--all", "--brief"], EMAILS),
+        "campaigns_add_leads": (
+            ["campaigns", "add-leads", "c00001", "--file", str(leads_csv), "--workers", "4",
+             "--checkpoint", str(workdir / "checkpoint.json")],
+            IMPORT_LEADS,
+        ),
+    }
+
+
+def _environment(workdir: Path, url: str) -> dict:
+    home = workdir / "home"
+    (home / ".instantly").mkdir(parents=True, exist_ok=True)
+    # Client-side rate limits off: the mock imposes no budget, and waits would swamp the timings
+    config = {"rate_limits": {"*": None, "GET /api/v2/emails": None}}
+    (home / ".instantly" / "config.json").write_text(json.dumps(config))
+    root = str(Path(__file__).resolve().parent.parent)
+    return {
+        **os.environ,
+        "HOME": str(home),
+        "INSTANTLY_API_KEY": "benchmark",
+        "INSTANTLY_BASE_URL": url,
+        "INSTANTLY_NO_DAEMON": "1",
+        "PYTHONPATH": os.pathsep.join(filter(None, [root, os.environ.get("PYTHONPATH")])),
+    }
+
+
+def measure(only: list, runs: int, latency_ms: float) -> dict:
+    server = mock_server.start(leads=LEADS, emails=EMAILS, campaigns=100, body_kb=8, latency_ms=latency_ms)
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            workdir = Path(tmp)
+            env = _environment(workdir, server.url)
+            for name, (args, items) in _cases(workdir).items():
+                if only and name not in only:
+                    continue
+                timings, peaks = [], []
+                for _ in range(runs):
+                    elapsed, peak = _run(env, args)
+                    timings.append(elapsed)
+                    peaks.append(peak)
+                wall = statistics.median(timings)
+                result = {"wall_ms": round(wall * 1000, 1), "peak_rss_mb": round(max(peaks), 1)}
+                if items:
+                    result["items_per_s"] = round(items / wall, 1)
+                results[name] = result
+                print(f"{name:<26} " + "  ".join(f"{key} {value}" for key, value in result.items()))
+    finally:
+        server.shutdown()
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> bool:
+    """Print the change against the baseline per metric; return False if any regressed beyond tolerance."""
+    ok = True
+    for name, metrics in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        for key, value in metrics.items():
+            old = before.get(key)
+            if not old:
+                continue
+            change = (value - old) / old
+            # Throughput regresses when it drops; time and memory when they grow
+            worse = -change if key == "items_per_s" else change
+            flag = "REGRESSION" if worse > tolerance else ""
+            ok = ok and not flag
+            print(f"  {name:<26} {key:<12} {old:>10} -> {value:<10} {change:+7.1%} {flag}")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", action="append", default=[], help="run only this case (repeatable)")
+    parser.add_argument("--runs", type=int, default=3, help="runs per case; the median wall time is reported")
+    parser.add_argument("--latency-ms", type=float, default=2, help="mock server latency per request")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression")
+    parser.add_argument("--save", action="store_true", help="store these results as the baseline")
+    args = parser.parse_args()
+
+    results = measure(args.only, args.runs, args.latency_ms)
+    if args.save:
+        baseline = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+        baseline.update(results)
+        BASELINE.write_text(json.dumps(baseline, indent=2) + "\n")
+        print(f"Saved baseline to {BASELINE}")
+        return
+    if not BASELINE.exists():
+        print("No baseline yet; run with --save to create one.")
+        return
+    print("Compared with baseline:")
+    if not compare(results, json.loads(BASELINE.read_text()), args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
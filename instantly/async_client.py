@@ -0,0 +1,75 @@
+"""asyncio client for high fan-out operations (many IDs fetched at once)."""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Union
+
+from instantly.client import InstantlyClient, InstantlyError
+
+
+class AsyncInstantlyClient:
+    """Same get/post/patch/delete surface as InstantlyClient, as coroutines.
+
+    Requests run on a dedicated thread pool over the wrapped client's pooled
+    requests.Session, so rate limiting, retries and the circuit breaker apply
+    unchanged. A semaphore caps how many requests are in flight at once.
+    """
+
+    def __init__(self, concurrency: int = 10, client: InstantlyClient | None = None):
+        self.concurrency = concurrency
+        self.client = client or InstantlyClient(pool_size=concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=concurrency)
+        self._semaphore: asyncio.Semaphore | None = None
+
+    async def __aenter__(self) -> "AsyncInstantlyClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+    async def request(self, method: str, path: str, **kwargs) -> dict:
+        if self._semaphore is None:
+            # Created lazily so it binds to the running loop (Python 3.9)
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            call = functools.partial(self.client.request, method, path, **kwargs)
+            return await loop.run_in_executor(self._executor, call)
+
+    async def get(self, path: str, params: dict | None = None) -> dict:
+        return await self.request("GET", path, params=params)
+
+    async def post(self, path: str, json: dict | None = None, idempotent: bool | None = None) -> dict:
+        return await self.request("POST", path, json=json if json is not None else {}, idempotent=idempotent)
+
+    async def patch(self, path: str, json: dict | None = None) -> dict:
+        return await self.request("PATCH", path, json=json)
+
+    async def delete(self, path: str, json: dict | None = None) -> dict:
+        return await self.request("DELETE", path, json=json)
+
+    async def get_many(self, paths: Iterable[str]) -> List[Union[dict, InstantlyError]]:
+        """GET every path concurrently; results keep input order and failures are returned, not raised."""
+        return await asyncio.gather(*(self._get_or_error(path) for path in paths))
+
+    async def _get_or_error(self, path: str) -> Union[dict, InstantlyError]:
+        try:
+            return await self.get(path)
+        except InstantlyError as exc:
+            return exc
+
+
+def get_many(paths: List[str], concurrency: int = 10) -> List[Union[dict, InstantlyError]]:
+    """Blocking helper for commands: fetch every path concurrently and return results in input order."""
+
+    async def run() -> List[Union[dict, InstantlyError]]:
+        async with AsyncInstantlyClient(concurrency=concurrency) as client:
+            return await client.get_many(paths)
+
+    return asyncio.run(run())
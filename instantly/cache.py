@@ -0,0 +1,141 @@
+"""SQLite-backed response cache with per-endpoint TTLs and size-bounded LRU eviction."""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from instantly.db import connect
+
+FOREVER = 10 * 365 * 24 * 3600
+
+# Seconds a GET response stays fresh, by endpoint key (see client.endpoint_key)
+DEFAULT_CACHE_TTLS = {
+    "GET /api/v2/emails/{id}": FOREVER,
+    "GET /api/v2/campaigns/{id}": 300,
+    "GET /api/v2/campaigns": 60,
+    "GET /api/v2/emails": 30,
+}
+DEFAULT_MAX_MB = 50
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    template TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    expires REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+CREATE INDEX IF NOT EXISTS entries_path ON entries (path);
+"""
+
+
+class Cache:
+    """Key/value store where each entry expires after its TTL and the least recently used go first when full."""
+
+    def __init__(self, path: Path, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._conn = connect(self.path)
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: float, path: str = "", template: str = "") -> None:
+        encoded = json.dumps(value)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, path, template, value, size, expires, accessed)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, path, template, encoded, len(encoded), now + ttl, now),
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        self._conn.execute("DELETE FROM entries WHERE expires <= ?", (time.time(),))
+        rows = self._conn.execute("SELECT key, size FROM entries ORDER BY accessed").fetchall()
+        total = sum(size for _, size in rows)
+        stale = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", stale)
+
+    def delete_where(self, clause: str, args: tuple) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM entries WHERE {clause}", args)
+
+    def clear(self) -> None:
+        self.delete_where("1", ())
+
+
+class ResponseCache:
+    """Caches GET responses by endpoint TTL and drops entries that a local write touches."""
+
+    def __init__(self, path: Path, ttls: dict | None = None, max_mb: float = DEFAULT_MAX_MB):
+        self.ttls = dict(DEFAULT_CACHE_TTLS)
+        self.ttls.update(ttls or {})
+        self.store = Cache(path, max_bytes=int(max_mb * 1024 * 1024))
+
+    @staticmethod
+    def _key(path: str, params: dict | None) -> str:
+        return f"GET {path}?{json.dumps(params or {}, sort_keys=True)}"
+
+    def ttl_for(self, template: str) -> Optional[float]:
+        return self.ttls.get(template)
+
+    def get(self, path: str, params: dict | None) -> Optional[dict]:
+        return self.store.get(self._key(path, params))
+
+    def set(self, path: str, params: dict | None, template: str, value: dict) -> None:
+        ttl = self.ttl_for(template)
+        if ttl:
+            self.store.set(self._key(path, params), value, ttl, path=path, template=template)
+
+    def invalidate(self, path: str, template: str) -> None:
+        """Forget cached reads a write to path may have changed.
+
+        A write to /api/v2/<collection>/<id>[/action] drops the collection's
+        list pages and everything under that ID. A write without an ID (e.g.
+        /leads/add) only drops list pages. IDs nested deeper, like
+        /emails/threads/<id>/mark-as-read, can touch any item, so they drop
+        the whole collection.
+        """
+        segments = path.split("/")
+        template_segments = template.split(" ", 1)[-1].split("/")
+        collection = "/".join(segments[:4])
+        id_positions = [i for i, seg in enumerate(template_segments) if seg == "{id}"]
+        lists = "(path = ? OR path LIKE ?) AND template NOT LIKE '%{id}%'"
+        if not id_positions:
+            self.store.delete_where(lists, (collection, collection + "/%"))
+        elif id_positions[0] == 4:
+            resource = "/".join(segments[:5])
+            self.store.delete_where(
+                f"({lists}) OR path = ? OR path LIKE ?",
+                (collection, collection + "/%", resource, resource + "/%"),
+            )
+        else:
+            self.store.delete_where("path = ? OR path LIKE ?", (collection, collection + "/%"))
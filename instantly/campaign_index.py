@@ -0,0 +1,145 @@
+"""Local campaign index kept current by incremental sync, so `campaigns list` needs at most one request."""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from instantly.db import META_SCHEMA, connect, get_meta, set_meta, transaction
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS campaigns (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL DEFAULT '',
+    status INTEGER,
+    timestamp_created TEXT NOT NULL DEFAULT '',
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS campaigns_created ON campaigns (timestamp_created);
+CREATE INDEX IF NOT EXISTS campaigns_status ON campaigns (status, timestamp_created);
+"""
+
+PAGE_SIZE = 100
+
+
+class CampaignIndex:
+    """Campaigns mirrored into SQLite, indexed by timestamp_created for top-k reads.
+
+    A full sync walks every page and records the order the API returns
+    campaigns in. Later syncs only fetch what is new: for newest-first
+    listings they read from the top until reaching a campaign at or below the
+    timestamp_created watermark; for oldest-first listings they continue from
+    the last campaign ID seen. Status and settings changes made elsewhere are
+    picked up by the periodic full sync; changes made through this CLI are
+    applied directly with record_write().
+    """
+
+    def __init__(self, path: Path):
+        self._conn = connect(Path(path))
+        self._conn.executescript(META_SCHEMA + _SCHEMA)
+        self._lock = threading.Lock()
+
+    def _upsert(self, campaigns: List[dict]) -> None:
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO campaigns (id, name, status, timestamp_created, data) VALUES (?, ?, ?, ?, ?)",
+            [
+                (c["id"], c.get("name") or "", c.get("status"), c.get("timestamp_created") or "", json.dumps(c))
+                for c in campaigns
+            ],
+        )
+
+    def refresh(self, client, max_age: float = 30, full_sync_every: float = 3600, force: bool = False) -> None:
+        """Bring the index up to date unless it was synced within max_age seconds."""
+        now = time.time()
+        with self._lock:
+            full_synced_at = float(get_meta(self._conn, "full_synced_at", "0"))
+            synced_at = float(get_meta(self._conn, "synced_at", "0"))
+            if now - full_synced_at >= full_sync_every:
+                self._full_sync(client)
+            elif force or now - synced_at >= max_age:
+                self._incremental_sync(client)
+
+    def _full_sync(self, client) -> None:
+        campaigns = list(client.paginate("GET", "/api/v2/campaigns", page_size=PAGE_SIZE))
+        created = [c.get("timestamp_created") or "" for c in campaigns]
+        order = "desc" if created and created[0] > created[-1] else "asc"
+        now = time.time()
+        with transaction(self._conn):
+            # Replace wholesale so campaigns deleted upstream disappear too
+            self._conn.execute("DELETE FROM campaigns")
+            self._upsert(campaigns)
+            set_meta(
+                self._conn,
+                order=order,
+                cursor=campaigns[-1]["id"] if campaigns else "",
+                watermark=max(created, default=""),
+                synced_at=now,
+                full_synced_at=now,
+            )
+
+    def _incremental_sync(self, client) -> None:
+        watermark = get_meta(self._conn, "watermark")
+        new = []
+        if get_meta(self._conn, "order") == "desc":
+            # Usually the first page already reaches the watermark: fetch the next only when needed
+            for page in client.iter_pages("GET", "/api/v2/campaigns", page_size=PAGE_SIZE, prefetch=False):
+                items = page.get("items", [])
+                fresh = [c for c in items if (c.get("timestamp_created") or "") > watermark]
+                new.extend(fresh)
+                if len(fresh) < len(items):
+                    break
+            cursor = get_meta(self._conn, "cursor")
+        else:
+            cursor = get_meta(self._conn, "cursor")
+            params = {"starting_after": cursor} if cursor else None
+            for campaign in client.paginate("GET", "/api/v2/campaigns", params=params, page_size=PAGE_SIZE):
+                new.append(campaign)
+                cursor = campaign["id"]
+        self._upsert(new)
+        created = [c.get("timestamp_created") or "" for c in new]
+        set_meta(self._conn, cursor=cursor, watermark=max(created + [watermark]), synced_at=time.time())
+
+    def record_write(self, campaign_id: str, result: dict) -> None:
+        """Apply a local write: store the returned campaign, or force a full sync if the response is not one."""
+        with self._lock:
+            if isinstance(result, dict) and result.get("id") == campaign_id and "name" in result:
+                self._upsert([result])
+            else:
+                set_meta(self._conn, full_synced_at=0)
+
+    def top(
+        self,
+        limit: int,
+        newest: bool = True,
+        search: Optional[str] = None,
+        status: Optional[int] = None,
+    ) -> List[dict]:
+        """Return the first `limit` campaigns by timestamp_created, read straight off the index."""
+        clauses = []
+        args: list = []
+        if search:
+            clauses.append("name LIKE ? ESCAPE '\\'")
+            escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            args.append(f"%{escaped}%")
+        if status is not None:
+            clauses.append("status = ?")
+            args.append(status)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        order = "DESC" if newest else "ASC"
+        rows = self._conn.execute(
+            f"SELECT data FROM campaigns {where} ORDER BY timestamp_created {order} LIMIT ?",
+            (*args, limit),
+        )
+        return [json.loads(data) for (data,) in rows]
+
+    def names(self, ids: List[str]) -> dict:
+        """Map the given campaign IDs to their names, for those in the index."""
+        found = {}
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            sql = f"SELECT id, name FROM campaigns WHERE id IN ({', '.join('?' * len(chunk))})"
+            found.update(self._conn.execute(sql, chunk))
+        return found
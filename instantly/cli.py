@@ -1,24 +1,149 @@
+import importlib
+import sys
+from typing import Optional
+
 import typer
+from typer.core import TyperGroup
+
+# Command groups are imported only when one is invoked, so `instantly --help` and
+# argument parsing don't load every command module (or the HTTP stack behind them)
+LAZY_GROUPS = {
+    "emails": ("instantly.commands.emails", "emails_app", "Read, reply to and triage Unibox emails."),
+    "leads": ("instantly.commands.leads", "leads_app", "Create, search, sync and update leads."),
+    "campaigns": ("instantly.commands.campaigns", "campaigns_app", "List, manage and bulk-load campaigns."),
+}
+
+
+class LazyGroup(TyperGroup):
+    """Root group that loads a command group's module the first time the group is looked up."""
+
+    def list_commands(self, ctx):
+        return list(LAZY_GROUPS) + [name for name in super().list_commands(ctx) if name not in LAZY_GROUPS]
+
+    def get_command(self, ctx, name):
+        if name in LAZY_GROUPS and name not in self.commands:
+            module, attr, help = LAZY_GROUPS[name]
+            group = typer.main.get_command(getattr(importlib.import_module(module), attr))
+            group.help = group.help or help
+            self.add_command(group, name)
+        return super().get_command(ctx, name)
+
+    def format_commands(self, ctx, formatter):
+        # Describe groups from LAZY_GROUPS instead of importing them just to print --help
+        rows = []
+        for name in self.list_commands(ctx):
+            if name in LAZY_GROUPS and name not in self.commands:
+                rows.append((name, LAZY_GROUPS[name][2]))
+                continue
+            command = self.get_command(ctx, name)
+            if command is not None and not command.hidden:
+                rows.append((name, command.get_short_help_str(formatter.width - 6 - len(name))))
+        if rows:
+            with formatter.section("Commands"):
+                formatter.write_dl(rows)
 
-from instantly.client import save_api_key
-from instantly.commands.campaigns import campaigns_app
-from instantly.commands.emails import emails_app
-from instantly.commands.leads import leads_app
 
-app = typer.Typer(no_args_is_help=True)
-app.add_typer(emails_app, name="emails")
-app.add_typer(leads_app, name="leads")
-app.add_typer(campaigns_app, name="campaigns")
+# Plain help formatting: rich help would look up (and so import) every group to describe it
+app = typer.Typer(cls=LazyGroup, no_args_is_help=True, rich_markup_mode=None)
+
+
+@app.callback()
+def global_options(
+    cache: Optional[bool] = typer.Option(
+        None,
+        "--cache/--no-cache",
+        help="Serve reads from the local response cache (default: 'cache' in config.json or INSTANTLY_CACHE=1)",
+    ),
+    refresh: bool = typer.Option(False, "--refresh", help="Skip cached reads but store the fresh responses"),
+    output_format: Optional[str] = typer.Option(
+        None, "--output", "-o", help="Output format: json, ndjson, csv or table (default: json; NDJSON for streamed lists)",
+    ),
+    fields: Optional[str] = typer.Option(
+        None, help="Comma-separated fields to keep, e.g. 'id,subject,from=from_address_email,body.text'",
+    ),
+    stream: Optional[bool] = typer.Option(
+        None,
+        "--stream/--no-stream",
+        help="Decode --all listings item by item as they download (default: 'stream' in config.json or INSTANTLY_STREAM=1)",
+    ),
+    trace: bool = typer.Option(False, "--trace", help="Print per-endpoint latency, retries and rate-limit waits on exit"),
+    trace_file: Optional[str] = typer.Option(None, help="Append one NDJSON span per API call to this file"),
+    profile: Optional[str] = typer.Option(
+        None, "--profile", help="Use the API key saved under this profile (default: INSTANTLY_PROFILE)",
+    ),
+):
+    """CLI for the Instantly API v2."""
+    from instantly import client, output
+
+    if output_format is not None and output_format not in output.FORMATS:
+        print(f"Error: --output must be one of {', '.join(output.FORMATS)}.")
+        raise typer.Exit(code=1)
+    client.settings["cache"] = cache
+    client.settings["refresh"] = refresh
+    client.settings["stream"] = stream
+    client.settings["profile"] = profile
+    if trace or trace_file:
+        from instantly import trace as tracing
+
+        tracing.enable(summary=trace, path=trace_file)
+    output.settings["output"] = output_format
+    output.settings["fields"] = output.parse_fields(fields)
 
 
 @app.command()
 def configure(
     api_key: str = typer.Option(..., prompt="Instantly API key", help="Your Instantly API key"),
+    profile: Optional[str] = typer.Option(
+        None, help="Save the key as a named profile, for --profile and --workspaces (default: global --profile)",
+    ),
 ):
     """Save your Instantly API key to ~/.instantly/config.json."""
-    save_api_key(api_key)
-    print("API key saved. You can now use all commands without setting INSTANTLY_API_KEY.")
+    from instantly.client import save_api_key, settings
+
+    profile = profile or settings["profile"]
+    save_api_key(api_key, profile)
+    if profile:
+        print(f"API key saved as profile '{profile}'. Use it with --profile {profile} or --workspaces.")
+    else:
+        print("API key saved. You can now use all commands without setting INSTANTLY_API_KEY.")
+
+
+@app.command()
+def batch(
+    file: Optional[str] = typer.Option(None, help="NDJSON file of operations (default: stdin); .gz is fine"),
+    workers: int = typer.Option(8, help="Operations run concurrently", min=1, max=50),
+    ordered: bool = typer.Option(
+        True, "--ordered/--unordered", help="Emit results in input order, or as soon as each finishes",
+    ),
+):
+    """Run many commands from NDJSON lines like {"command": "campaigns pause", "args": ["<id>"]}."""
+    from instantly.commands.batch import run_file
+
+    run_file(file, workers, ordered)
+
+
+@app.command()
+def serve(
+    pool_size: int = typer.Option(20, help="Connections kept open to the API", min=1),
+    idle_timeout: float = typer.Option(0, help="Exit after this many seconds without requests (0: run until stopped)"),
+):
+    """Keep a warm API client running; other commands forward their requests to it automatically."""
+    from instantly.daemon import serve as run_daemon
+
+    run_daemon(pool_size=pool_size, idle_timeout=idle_timeout)
+
+
+def main():
+    try:
+        app()
+    except Exception as exc:
+        # Only a loaded client can raise InstantlyError; importing it up front would defeat lazy loading
+        client = sys.modules.get("instantly.client")
+        if client is None or not isinstance(exc, client.InstantlyError):
+            raise
+        print(str(exc), file=sys.stderr)
+        sys.exit(1)
 
 
 if __name__ == "__main__":
-    app()
+    main()
@@ -2,66 +2,533 @@ from __future__ import annotations
 
 import json
 import os
+import random
+import re
 import sys
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
+from typing import TYPE_CHECKING, Iterator
 
-import requests
+from instantly import trace
+from instantly.ratelimit import RateLimiter, blocked_until_from_headers
+
+if TYPE_CHECKING:
+    from instantly.cache import ResponseCache
 
 CONFIG_DIR = Path.home() / ".instantly"
 CONFIG_FILE = CONFIG_DIR / "config.json"
 
+# Process-wide overrides set from global CLI flags (--cache/--no-cache, --refresh, --stream, --profile)
+settings = {"cache": None, "refresh": False, "stream": None, "profile": None}
+
+# Profile a --workspaces fan-out assigns to one worker thread; it wins over settings["profile"]
+_thread_profile = threading.local()
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "DELETE", "PATCH"}
+# POST endpoints that only read, so they are as safe to retry as a GET
+IDEMPOTENT_POSTS = {"POST /api/v2/leads/list"}
+
+_ID_SEGMENT = re.compile(r"^[a-z][a-z-]*$")
+
+
+def load_config() -> dict:
+    """Load ~/.instantly/config.json, or an empty config if it does not exist."""
+    if CONFIG_FILE.exists():
+        return json.loads(CONFIG_FILE.read_text())
+    return {}
+
+
+def current_profile() -> str | None:
+    """The named profile in effect: this thread's fan-out workspace, else --profile, else INSTANTLY_PROFILE."""
+    return getattr(_thread_profile, "name", None) or settings["profile"] or os.environ.get("INSTANTLY_PROFILE") or None
+
+
+@contextmanager
+def use_profile(name: str | None) -> Iterator[None]:
+    """Make clients created on this thread inside the block use the given profile."""
+    previous = getattr(_thread_profile, "name", None)
+    _thread_profile.name = name
+    try:
+        yield
+    finally:
+        _thread_profile.name = previous
+
+
+def profile_names() -> list:
+    """Names of the profiles saved in config.json."""
+    return sorted(load_config().get("profiles", {}))
+
 
 def load_api_key() -> str:
-    """Load API key from env var, falling back to config file."""
+    """Load the API key of the profile in effect; without one, from the env var, falling back to config file."""
+    profile = current_profile()
+    if profile:
+        config = load_config()
+        entry = config.get("profiles", {}).get(profile)
+        if entry is None and profile == "default":
+            # "default" names the top-level key when no profile takes that name
+            return config.get("api_key", "")
+        if entry is None:
+            raise InstantlyError(f"Error: unknown profile {profile!r}. Add it with 'instantly configure --profile {profile}'.")
+        return entry.get("api_key", "")
     key = os.environ.get("INSTANTLY_API_KEY", "")
     if key:
         return key
-    if CONFIG_FILE.exists():
-        data = json.loads(CONFIG_FILE.read_text())
-        key = data.get("api_key", "")
-        if key:
-            return key
-    return ""
+    return load_config().get("api_key", "")
 
 
-def save_api_key(api_key: str) -> None:
-    """Save API key to ~/.instantly/config.json."""
+def save_api_key(api_key: str, profile: str | None = None) -> None:
+    """Save API key to ~/.instantly/config.json (under profiles.<profile> if given), keeping any other settings."""
     CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-    CONFIG_FILE.write_text(json.dumps({"api_key": api_key}))
+    config = load_config()
+    if profile:
+        config.setdefault("profiles", {}).setdefault(profile, {})["api_key"] = api_key
+    else:
+        config["api_key"] = api_key
+    CONFIG_FILE.write_text(json.dumps(config))
+
+
+def endpoint_key(method: str, path: str) -> str:
+    """Collapse IDs in a path so requests to the same endpoint share a key, e.g. "GET /api/v2/emails/{id}"."""
+    segments = path.split("/")
+    template = [seg if i <= 2 or _ID_SEGMENT.match(seg) else "{id}" for i, seg in enumerate(segments)]
+    return f"{method.upper()} {'/'.join(template)}"
+
+
+class InstantlyError(Exception):
+    """Base class for errors raised by InstantlyClient; str() is the message shown to the user."""
+
+
+class APIError(InstantlyError):
+    def __init__(self, status: int, text: str):
+        super().__init__(f"Error {status}: {text}")
+        self.status = status
+        self.text = text
+
+
+class CircuitOpenError(InstantlyError):
+    pass
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter: attempt n sleeps uniform(0, min(backoff_max, backoff * 2**n))."""
+
+    def __init__(self, max_retries: int = 3, backoff: float = 0.5, backoff_max: float = 30.0):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """Fail fast after `threshold` consecutive server failures, then let one trial request through per cooldown."""
+
+    def __init__(self, threshold: int = 5, cooldown: float = 30.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self._trial_in_flight or time.monotonic() - self.opened_at < self.cooldown:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._trial_in_flight or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+def _from_config(cls, section: str, values):
+    """Build cls from a config.json section, naming any key its constructor does not take."""
+    import inspect
+
+    allowed = list(inspect.signature(cls).parameters)
+    if not isinstance(values, dict):
+        raise InstantlyError(f"Error: '{section}' in config.json must be an object with keys {', '.join(allowed)}.")
+    for key in values:
+        if key not in allowed:
+            raise InstantlyError(
+                f"Error: unknown key {key!r} in '{section}' in config.json; expected one of {', '.join(allowed)}."
+            )
+    return cls(**values)
 
 
 class InstantlyClient:
     BASE_URL = "https://api.instantly.ai"
 
-    def __init__(self):
+    def __init__(
+        self,
+        pool_size: int = 10,
+        rate_limits: dict | None = None,
+        retry: RetryPolicy | None = None,
+        breaker: CircuitBreaker | None = None,
+        daemon: bool = False,
+    ):
         self.api_key = load_api_key()
         if not self.api_key:
             print("Error: No API key found. Run 'instantly configure' or set INSTANTLY_API_KEY.", file=sys.stderr)
             sys.exit(1)
-        self.session = requests.Session()
-        self.session.headers.update({
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        })
-
-    def _handle_response(self, resp: requests.Response) -> dict:
-        if not resp.ok:
-            print(f"Error {resp.status_code}: {resp.text}", file=sys.stderr)
-            sys.exit(1)
-        return resp.json()
+        import hashlib  # loads OpenSSL, which --help never needs
+
+        config = load_config()
+        # e.g. the local mock server in benchmarks/
+        base_url = os.environ.get("INSTANTLY_BASE_URL")
+        if base_url:
+            self.BASE_URL = base_url.rstrip("/")
+        # Per-workspace state (rate-limit buckets, ...) lives under a hash of the key
+        self.data_dir = CONFIG_DIR / "workspaces" / hashlib.sha256(self.api_key.encode()).hexdigest()[:12]
+        # Forward to a running `instantly serve` unless this client is the daemon's own
+        self.daemon_socket: Path | None = None
+        if not daemon and not os.environ.get("INSTANTLY_NO_DAEMON"):
+            socket_path = self.data_dir / "daemon.sock"
+            if socket_path.exists():
+                self.daemon_socket = socket_path
+        try:
+            self.limiter = RateLimiter(
+                self.data_dir / "ratelimit.json",
+                rate_limits if rate_limits is not None else config.get("rate_limits"),
+            )
+        except ValueError as exc:
+            raise InstantlyError(f"Error: invalid 'rate_limits' in config.json: {exc}") from exc
+        self.retry = retry or _from_config(RetryPolicy, "retry", config.get("retry", {}))
+        self.breaker = breaker or _from_config(CircuitBreaker, "circuit_breaker", config.get("circuit_breaker", {}))
+        self._cache_config = config.get("cache", False)
+        self._stream_config = config.get("stream", False)
+        self.cache_reads = False
+        self.cache = None if self.daemon_socket else self._open_cache(self._cache_config, keep_open=daemon)
+        self._pool_size = pool_size
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._transport_errors: tuple = ()
+
+    @property
+    def session(self):
+        """The pooled requests.Session, created on first use.
+
+        requests and urllib3 take longer to import than the rest of the CLI, so
+        --help, argument errors and calls forwarded to the daemon never load them.
+        """
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+
+                    self._transport_errors = (requests.ConnectionError, requests.Timeout)
+                    session = requests.Session()
+                    # Size the connection pool so worker threads can share one session
+                    adapter = requests.adapters.HTTPAdapter(
+                        pool_connections=self._pool_size, pool_maxsize=self._pool_size,
+                    )
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    session.headers.update({
+                        "Authorization": f"Bearer {self.api_key}",
+                        "Content-Type": "application/json",
+                    })
+                    self._session = session
+        return self._session
+
+    def _open_cache(self, cache_config: bool | dict, keep_open: bool = False) -> ResponseCache | None:
+        if not isinstance(cache_config, dict):
+            cache_config = {"enabled": bool(cache_config)}
+        enabled = settings["cache"]
+        if enabled is None:
+            enabled = cache_config.get("enabled", False) or os.environ.get("INSTANTLY_CACHE") == "1"
+        self.cache_reads = enabled
+        cache_file = self.data_dir / "cache.db"
+        # Keep invalidating on writes even when reads bypass the cache, so entries never go stale.
+        # The daemon always keeps it open, since each caller decides whether to read from it.
+        if not enabled and not keep_open and not cache_file.exists():
+            return None
+        from instantly.cache import ResponseCache
+
+        return ResponseCache(
+            cache_file,
+            ttls=cache_config.get("ttl"),
+            max_mb=cache_config.get("max_mb", 50),
+        )
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        params: dict | None = None,
+        json: dict | None = None,
+        idempotent: bool | None = None,
+        cache_reads: bool | None = None,
+        refresh: bool | None = None,
+    ) -> dict:
+        """Send a request and return the decoded JSON body, raising InstantlyError on failure.
+
+        GETs are served from the response cache when it is enabled and the
+        endpoint has a TTL; successful writes invalidate what they touched.
+        cache_reads and refresh override --cache and --refresh for this call.
+        """
+        if cache_reads is None:
+            cache_reads = settings["cache"]
+        if refresh is None:
+            refresh = settings["refresh"]
+        if self.daemon_socket is not None:
+            from instantly.daemon import DaemonUnavailable
+
+            try:
+                with trace.span(endpoint_key(method, path), source="daemon"):
+                    return self._forward(method, path, params, json, idempotent, cache_reads, refresh)
+            except DaemonUnavailable:
+                # Stale socket: the daemon is gone, so make this and later calls directly
+                self.daemon_socket = None
+                self.cache = self._open_cache(self._cache_config)
+
+        key = endpoint_key(method, path)
+        reads = self.cache_reads if cache_reads is None else cache_reads
+        cacheable = self.cache is not None and reads and method.upper() == "GET"
+        if cacheable and not refresh:
+            cached = self.cache.get(path, params)
+            if cached is not None:
+                with trace.span(key, source="cache"):
+                    return cached
+        result = self._send(method, path, key, params, json, idempotent)
+        if cacheable:
+            self.cache.set(path, params, key, result)
+        elif self.cache is not None and method.upper() != "GET" and key not in IDEMPOTENT_POSTS:
+            self.cache.invalidate(path, key)
+        return result
+
+    def _forward(self, method, path, params, json, idempotent, cache_reads, refresh) -> dict:
+        """Hand the call to the daemon, raising what it raised there."""
+        from instantly.daemon import decode_error, forward
+
+        payload = {
+            "method": method, "path": path, "params": params, "json": json,
+            "idempotent": idempotent, "cache": cache_reads, "refresh": refresh,
+        }
+        reply = forward(self.daemon_socket, payload)
+        if "error" in reply:
+            raise decode_error(reply["error"])
+        return reply["result"]
+
+    def _send(
+        self,
+        method: str,
+        path: str,
+        key: str,
+        params: dict | None,
+        json: dict | None,
+        idempotent: bool | None,
+        stream: bool = False,
+    ):
+        """Send one request through the rate limiter and circuit breaker, retrying where safe.
+
+        429s are always retried once the rate limiter lets us through again;
+        5xx responses and connection errors are retried with backoff only for
+        idempotent requests, so a POST that may have been applied is not resent.
+        With stream=True the successful response is returned with its body unread.
+        """
+        session = self.session  # created (and requests imported) outside the timed span
+        with trace.span(key) as span:
+            if idempotent is None:
+                idempotent = method.upper() in IDEMPOTENT_METHODS or key in IDEMPOTENT_POSTS
+            attempt = 0
+            while True:
+                if not self.breaker.allow():
+                    raise CircuitOpenError(
+                        f"Error: {self.breaker.failures} consecutive server failures; "
+                        f"not calling the API for {self.breaker.cooldown:.0f}s"
+                    )
+                waited = self.limiter.acquire(key)
+                if span is not None:
+                    span.attempt(waited)
+                try:
+                    resp = session.request(method, f"{self.BASE_URL}{path}", params=params, json=json, stream=stream)
+                except self._transport_errors as exc:
+                    self.breaker.record_failure()
+                    if idempotent and attempt < self.retry.max_retries:
+                        time.sleep(self.retry.delay(attempt))
+                        attempt += 1
+                        continue
+                    raise InstantlyError(f"Error: request to {path} failed ({exc})") from exc
+
+                self.limiter.observe(key, resp.status_code, resp.headers)
+                if span is not None:
+                    span.response(resp, streamed=stream)
+                if resp.status_code >= 500:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                if resp.ok:
+                    return resp if stream else resp.json()
+
+                retryable = resp.status_code == 429 or (resp.status_code >= 500 and idempotent)
+                if not retryable or attempt >= self.retry.max_retries:
+                    raise APIError(resp.status_code, resp.text)
+                # For 429 the limiter already holds the bucket until Retry-After
+                if resp.status_code != 429:
+                    time.sleep(self.retry.delay(attempt))
+                elif not self.limiter.buckets_for(key):
+                    # ...unless every bucket for this endpoint is disabled in config: wait it out here
+                    now = time.time()
+                    time.sleep(max(0.0, blocked_until_from_headers(429, resp.headers, now) - now))
+                attempt += 1
 
     def get(self, path: str, params: dict | None = None) -> dict:
-        resp = self.session.get(f"{self.BASE_URL}{path}", params=params)
-        return self._handle_response(resp)
+        return self.request("GET", path, params=params)
 
-    def post(self, path: str, json: dict | None = None) -> dict:
-        resp = self.session.post(f"{self.BASE_URL}{path}", json=json if json is not None else {})
-        return self._handle_response(resp)
+    def post(self, path: str, json: dict | None = None, idempotent: bool | None = None) -> dict:
+        return self.request("POST", path, json=json if json is not None else {}, idempotent=idempotent)
 
     def patch(self, path: str, json: dict | None = None) -> dict:
-        resp = self.session.patch(f"{self.BASE_URL}{path}", json=json)
-        return self._handle_response(resp)
+        return self.request("PATCH", path, json=json)
 
     def delete(self, path: str, json: dict | None = None) -> dict:
-        resp = self.session.delete(f"{self.BASE_URL}{path}", json=json)
-        return self._handle_response(resp)
+        return self.request("DELETE", path, json=json)
+
+    def iter_pages(
+        self, method: str, path: str, params: dict | None = None, page_size: int = 100, prefetch: bool = True,
+    ) -> Iterator[dict]:
+        """Yield successive pages of a cursor-paginated list endpoint.
+
+        Filters go in the query string for GET and in the JSON body for POST
+        (e.g. /api/v2/leads/list). While the caller works on one page, the next
+        one is already being fetched in a background thread. Callers that
+        usually stop after the first page pass prefetch=False, so a page is
+        only requested once they ask for it.
+        """
+        params = dict(params or {})
+        params.setdefault("limit", page_size)
+
+        def fetch(cursor: str | None) -> dict:
+            page_params = dict(params)
+            if cursor:
+                page_params["starting_after"] = cursor
+            if method.upper() == "GET":
+                return self.get(path, params=page_params)
+            return self.post(path, json=page_params)
+
+        if not prefetch:
+            cursor = params.get("starting_after")
+            while True:
+                page = fetch(cursor)
+                yield page
+                cursor = page.get("next_starting_after")
+                if not cursor or len(page.get("items", [])) < params["limit"]:
+                    return
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=1) as prefetcher:
+            future = prefetcher.submit(fetch, params.get("starting_after"))
+            while future is not None:
+                page = future.result()
+                items = page.get("items", [])
+                cursor = page.get("next_starting_after")
+                future = None
+                if cursor and len(items) >= params["limit"]:
+                    future = prefetcher.submit(fetch, cursor)
+                yield page
+
+    def paginate(self, method: str, path: str, params: dict | None = None, page_size: int = 100) -> Iterator[dict]:
+        """Yield every item of a cursor-paginated list endpoint, following next_starting_after.
+
+        With --stream (or "stream": true in config.json, or INSTANTLY_STREAM=1)
+        each page is decoded item by item as it downloads instead of whole.
+        """
+        if not self.streaming:
+            for page in self.iter_pages(method, path, params, page_size):
+                yield from page.get("items", [])
+            return
+        params = dict(params or {})
+        params.setdefault("limit", page_size)
+        while True:
+            meta: dict = {}
+            count = 0
+            if method.upper() == "GET":
+                items = self.stream_items(method, path, params=params, meta=meta)
+            else:
+                items = self.stream_items(method, path, json=params, meta=meta)
+            for item in items:
+                count += 1
+                yield item
+            cursor = meta.get("next_starting_after")
+            if not cursor or count < params["limit"]:
+                return
+            params = {**params, "starting_after": cursor}
+
+    @property
+    def streaming(self) -> bool:
+        if settings["stream"] is not None:
+            return settings["stream"]
+        return bool(self._stream_config) or os.environ.get("INSTANTLY_STREAM") == "1"
+
+    def stream_items(
+        self,
+        method: str,
+        path: str,
+        params: dict | None = None,
+        json: dict | None = None,
+        meta: dict | None = None,
+    ) -> Iterator[dict]:
+        """Yield the items of one list response as each is decoded from the body, never holding the whole page.
+
+        The response's other keys (next_starting_after, ...) are put in meta
+        once read. Streams go straight to the API, past the daemon and the
+        response cache, which both deal in whole responses. Only opening the
+        stream is retried: once items have been yielded, a failure is raised.
+        """
+        import codecs
+
+        import requests
+
+        from instantly.readers import iter_list_items
+
+        resp = self._send(method, path, endpoint_key(method, path), params, json, None, stream=True)
+        decoder = codecs.getincrementaldecoder(resp.encoding or "utf-8")()
+        chunks = (decoder.decode(chunk) for chunk in resp.iter_content(STREAM_CHUNK_SIZE))
+        try:
+            yield from iter_list_items(chunks, meta)
+        except requests.RequestException as exc:
+            raise InstantlyError(f"Error: reading the response from {path} failed ({exc})") from exc
+        except ValueError as exc:
+            raise InstantlyError(f"Error: malformed response from {path} ({exc})") from exc
+        finally:
+            resp.close()
+
+
+_shared_clients: dict = {}
+_shared_lock = threading.Lock()
+
+
+def get_client(pool_size: int = 10) -> InstantlyClient:
+    """The process-wide client, so every command run in this process (e.g. by `batch`) shares one session.
+
+    There is one per profile, so a --workspaces fan-out gives each workspace
+    its own session and rate-limit budget. pool_size only applies to the
+    call that creates it.
+    """
+    profile = current_profile()
+    with _shared_lock:
+        client = _shared_clients.get(profile)
+        if client is None:
+            client = _shared_clients[profile] = InstantlyClient(pool_size=pool_size)
+        return client
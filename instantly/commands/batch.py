@@ -0,0 +1,247 @@
+"""`instantly batch`: run many subcommands from an NDJSON operation stream in one process.
+
+Each input line names a command and its arguments the way the command line
+would take them, either as raw arguments or as a params object keyed by
+option name:
+
+    {"id": "a", "command": "leads update-interest", "args": ["--lead-email", "x@y.com", "--interest-value", "1"]}
+    {"id": "b", "command": "emails mark-read", "params": {"thread_id": "..."}}
+
+Operations run on a bounded worker pool. They share one client, so they
+also share one connection pool and the rate limiter. Each one's printed
+output is captured and returned as its result.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import sys
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Optional, Tuple
+
+import typer
+
+from instantly import output
+from instantly.client import InstantlyError, get_client
+
+# Commands that make no sense inside a batch: they prompt, run forever or recurse
+EXCLUDED_COMMANDS = {"batch", "configure", "serve"}
+# Commands that poll until interrupted unless the named flag makes them return
+UNTIL_INTERRUPTED = {"emails watch": "once"}
+# NDJSON listings end with a line of keys that belong to the listing, not to an item
+TRAILER_KEYS = {"next_starting_after"}
+
+
+class _ThreadStream:
+    """Stands in for sys.stdout/sys.stdin so each worker thread can be pointed at its own buffer."""
+
+    def __init__(self, default):
+        self._default = default
+        self._local = threading.local()
+
+    def redirect(self, stream) -> None:
+        self._local.stream = stream
+
+    def __getattr__(self, name):
+        return getattr(getattr(self._local, "stream", None) or self._default, name)
+
+
+def _resolve(root: typer.Context, command: Any):
+    """Find the click command for "leads update" (or ["leads", "update"])."""
+    names = command.split() if isinstance(command, str) else list(command or [])
+    if not names or names[0] in EXCLUDED_COMMANDS:
+        raise ValueError(f"unsupported command {' '.join(names) or '(none)'!r}")
+    found = root.command
+    for name in names:
+        found = found.get_command(root, name) if hasattr(found, "get_command") else None
+        if found is None:
+            raise ValueError(f"unknown command {' '.join(names)!r}")
+    if hasattr(found, "get_command"):
+        raise ValueError(f"{' '.join(names)!r} is a command group; name one of its subcommands")
+    return found
+
+
+def _argv(command, params: dict) -> List[str]:
+    """Turn {"campaign_id": "...", "first_name": "Ann", "is_unread": false} into command-line arguments."""
+    by_name = {}
+    for param in command.params:
+        by_name[param.name] = param
+        for opt in getattr(param, "opts", []):
+            by_name[opt.lstrip("-").replace("-", "_")] = param
+    options: List[str] = []
+    positional: List[str] = []
+    for key, value in params.items():
+        param = by_name.get(key.lstrip("-").replace("-", "_"))
+        if param is None:
+            raise ValueError(f"unknown parameter {key!r}")
+        values = value if isinstance(value, list) and (param.multiple or param.nargs != 1) else [value]
+        if param.param_type_name == "argument":
+            positional.extend(str(v) for v in values)
+        elif getattr(param, "is_flag", False):
+            if value:
+                options.append(param.opts[0])
+            elif param.secondary_opts:
+                options.append(param.secondary_opts[0])
+        else:
+            for v in values:
+                options += [param.opts[0], json.dumps(v) if isinstance(v, (dict, list)) else str(v)]
+    return options + (["--", *positional] if positional else [])
+
+
+def _parse_output(text: str) -> Any:
+    """A command's captured output as JSON: one document, NDJSON lines as a list, or the raw text.
+
+    NDJSON ending in a trailer line ({"next_starting_after": ...}) comes back
+    the way JSON output puts it: {"items": [...], "next_starting_after": ...}.
+    """
+    text = text.strip()
+    if not text:
+        return None
+    try:
+        rows = [json.loads(text)]
+    except ValueError:
+        try:
+            rows = [json.loads(line) for line in text.splitlines() if line.strip()]
+        except ValueError:
+            return text
+    else:
+        if not _is_trailer(rows[0]):
+            return rows[0]
+    if _is_trailer(rows[-1]):
+        return {"items": rows[:-1], **rows[-1]}
+    return rows
+
+
+def _is_trailer(value: Any) -> bool:
+    return isinstance(value, dict) and bool(value) and value.keys() <= TRAILER_KEYS
+
+
+@contextmanager
+def captured_streams() -> Iterator[Tuple[_ThreadStream, _ThreadStream]]:
+    """Swap sys.stdout/sys.stdin for per-thread streams; meanwhile commands print plain JSON.
+
+    Read output.settings before entering: they are cleared inside the block
+    and restored on the way out.
+    """
+    fmt, fields = output.settings["output"], output.settings["fields"]
+    output.settings.update(output=None, fields=None)
+    stdout, stdin = _ThreadStream(sys.stdout), _ThreadStream(sys.stdin)
+    sys.stdout, sys.stdin = stdout, stdin
+    try:
+        yield stdout, stdin
+    finally:
+        sys.stdout, sys.stdin = stdout._default, stdin._default
+        output.settings.update(output=fmt, fields=fields)
+
+
+def run_operation(command, index: int, op: dict, stdout: _ThreadStream, stdin: _ThreadStream) -> dict:
+    """Run one resolved operation with its output captured, and describe how it went."""
+    result: dict = {"index": index}
+    if "id" in op:
+        result["id"] = op["id"]
+    name = op.get("command")
+    result["command"] = " ".join(name) if isinstance(name, list) else name
+    if isinstance(command, Exception):
+        return {**result, "ok": False, "error": str(command)}
+    captured = io.StringIO()
+    stdout.redirect(captured)
+    stdin.redirect(io.StringIO())  # never let an operation consume the batch input
+    try:
+        args = [str(arg) for arg in op.get("args", [])] + _argv(command, op.get("params") or {})
+        with command.make_context(result["command"], args) as ctx:
+            flag = UNTIL_INTERRUPTED.get(" ".join(result["command"].split()))
+            if flag and not ctx.params.get(flag):
+                raise ValueError(f"{result['command']!r} runs until interrupted; pass --{flag} inside a batch")
+            command.invoke(ctx)
+        exit_code = 0
+    except typer.Exit as exc:
+        exit_code = exc.exit_code
+    except (InstantlyError, ValueError) as exc:
+        return {**result, "ok": False, "error": str(exc)}
+    except SystemExit as exc:
+        exit_code = exc.code if isinstance(exc.code, int) else 1
+    except Exception as exc:
+        # Usage errors carry a readable message in format_message()
+        message = exc.format_message() if hasattr(exc, "format_message") else f"{type(exc).__name__}: {exc}"
+        return {**result, "ok": False, "error": message}
+    finally:
+        stdout.redirect(None)
+        stdin.redirect(None)
+    text = captured.getvalue()
+    if exit_code:
+        # Commands report their own failures as "Error: ..." on stdout before exiting
+        return {**result, "ok": False, "error": text.strip() or f"exit code {exit_code}"}
+    return {**result, "ok": True, "result": _parse_output(text)}
+
+
+def run_batch(ops: Iterator[Any], workers: int = 8, ordered: bool = True) -> bool:
+    """Run operations and stream one result per operation; return True if every one succeeded."""
+    from instantly.cli import app
+
+    root = typer.Context(typer.main.get_command(app))
+    get_client(pool_size=workers)  # created up front so the connection pool fits the workers
+
+    # Results are written with the caller's --output/--fields; the operations themselves print plain JSON
+    fmt, fields = output.settings["output"], output.settings["fields"]
+    failed = []
+
+    def results(stdout: _ThreadStream, stdin: _ThreadStream) -> Iterator[dict]:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending: deque = deque()
+            for index, op in enumerate(ops):
+                if not isinstance(op, dict):
+                    op, command = {}, ValueError("operation must be a JSON object")
+                else:
+                    # Resolved here, not in the workers: the first lookup of a group imports its module
+                    try:
+                        command = _resolve(root, op.get("command"))
+                    except ValueError as exc:
+                        command = exc
+                pending.append(pool.submit(run_operation, command, index, op, stdout, stdin))
+                # Bound the work in flight so a huge input streams instead of queueing up
+                while len(pending) >= workers * 2:
+                    yield from _drain(pending, ordered)
+            while pending:
+                yield from _drain(pending, ordered)
+
+    def tally(rows: Iterator[dict]) -> Iterator[dict]:
+        for row in rows:
+            if not row["ok"]:
+                failed.append(row["index"])
+            yield row
+
+    with captured_streams() as (stdout, stdin):
+        output.emit_items(tally(results(stdout, stdin)), fmt=fmt, fields=fields)
+    return not failed
+
+
+def _drain(pending: deque, ordered: bool) -> Iterator[dict]:
+    """Yield finished results: the oldest one (waiting for it) when ordered, otherwise whatever is done."""
+    if ordered:
+        yield pending.popleft().result()
+        return
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    for future in list(pending):
+        if future in done:
+            pending.remove(future)
+            yield future.result()
+
+
+def run_file(file: Optional[str], workers: int, ordered: bool) -> None:
+    """Entry point for the `batch` command: read operations from file (or stdin) and run them."""
+    from instantly.readers import open_records
+
+    try:
+        fmt, ops = open_records(file)
+    except FileNotFoundError as exc:
+        print(f"Error: {exc}")
+        raise typer.Exit(code=1)
+    if fmt == "csv":
+        print("Error: batch operations must be NDJSON (or a JSON array), one object per operation.")
+        raise typer.Exit(code=1)
+    if not run_batch(ops, workers=workers, ordered=ordered):
+        raise typer.Exit(code=1)
@@ -1,13 +1,18 @@
 import json
+import os
 import sys
+import time
+from itertools import islice
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Iterator, List, Optional, Tuple
 
 import typer
 
-from instantly.client import InstantlyClient
+from instantly.client import CONFIG_DIR, InstantlyClient, InstantlyError, get_client, load_config, settings
+from instantly.commands.common import WORKSPACES_HELP, fan_out, print_many, read_ids
+from instantly.output import emit, emit_items
 
-campaigns_app = typer.Typer(no_args_is_help=True)
+campaigns_app = typer.Typer(no_args_is_help=True, rich_markup_mode=None)
 
 SUPPORTED_CSV_LEAD_FIELDS = {
     "email",
@@ -20,49 +25,40 @@ SUPPORTED_CSV_LEAD_FIELDS = {
 }
 
 
-def _parse_json_leads(raw: str, source_label: str) -> list:
-    leads = json.loads(raw)
-    if not isinstance(leads, list):
-        print(f"Error: {source_label} must contain a JSON array of lead objects.")
+def _lead_from_row(row: dict) -> dict:
+    """Map a CSV row to a lead; columns outside the lead schema become custom variables."""
+    lead = {}
+    custom_variables = {}
+    for header, value in row.items():
+        header = header.strip()
+        value = value.strip()
+        if header in SUPPORTED_CSV_LEAD_FIELDS:
+            lead[header] = value
+        elif header and value:
+            custom_variables[header] = value
+    if custom_variables:
+        lead["custom_variables"] = custom_variables
+    return lead
+
+
+def _iter_leads(fmt: str, records: Iterator[dict]) -> Iterator[dict]:
+    for record in records:
+        if fmt == "csv":
+            yield _lead_from_row(record)
+        elif isinstance(record, dict):
+            yield record
+        else:
+            raise json.JSONDecodeError("Expected lead objects", json.dumps(record), 0)
+
+
+def _load_leads_input(file: Optional[str]) -> Iterator[dict]:
+    """Stream leads from a .csv/.json/.ndjson file (optionally .gz) or from stdin."""
+    from instantly.readers import open_records
+
+    if not file and sys.stdin.isatty():
+        print("Error: provide --file (.json, .ndjson or .csv), or pipe leads through stdin.")
         raise typer.Exit(code=1)
-    return leads
-
-
-def _parse_csv_leads(raw: str) -> list:
-    lines = [line.strip() for line in raw.split("\n")]
-    lines = [line for line in lines if line]
-    if not lines:
-        return []
-
-    headers = [header.strip().rstrip("\r") for header in lines[0].split(",")]
-    leads = []
-    for line in lines[1:]:
-        values = [value.strip().rstrip("\r") for value in line.split(",")]
-        lead = {}
-        for idx, header in enumerate(headers):
-            if header not in SUPPORTED_CSV_LEAD_FIELDS:
-                continue
-            lead[header] = values[idx] if idx < len(values) else ""
-        leads.append(lead)
-    return leads
-
-
-def _load_leads_input(file: Optional[str]) -> list:
-    if not file:
-        if sys.stdin.isatty():
-            print("Error: provide --file (.json or .csv), or pipe a JSON array through stdin.")
-            raise typer.Exit(code=1)
-        return _parse_json_leads(sys.stdin.read(), "stdin")
-
-    raw = Path(file).read_text(encoding="utf-8")
-    normalized_path = str(file).lower()
-    if normalized_path.endswith(".csv"):
-        return _parse_csv_leads(raw)
-    if normalized_path.endswith(".json"):
-        return _parse_json_leads(raw, "file")
-
-    print("Error: file extension must be .json or .csv.")
-    raise typer.Exit(code=1)
+    return _iter_leads(*open_records(file))
 
 
 STATUS_LABELS = {
@@ -76,17 +72,42 @@ STATUS_LABELS = {
     -99: "Account Suspended",
 }
 
+INTEREST_LABELS = {
+    None: "Lead",
+    0: "Out of Office",
+    1: "Interested",
+    2: "Meeting Booked",
+    3: "Meeting Completed",
+    4: "Won",
+    -1: "Not Interested",
+    -2: "Wrong Person",
+    -3: "Lost",
+}
+
 
 @campaigns_app.command("list")
 def list_campaigns(
+    ctx: typer.Context,
     limit: int = typer.Option(10, help="Number of campaigns to return", min=1, max=100),
     search: Optional[str] = typer.Option(None, help="Filter by campaign name"),
     status: Optional[int] = typer.Option(None, help="Filter by campaign status (0, 1, 2, 3)", min=0, max=3),
     starting_after: Optional[str] = typer.Option(None, help="Pagination cursor"),
     sort: str = typer.Option("newest", help="Sort order: newest or oldest (by timestamp_created)"),
     brief: bool = typer.Option(False, "--brief", help="Token-efficient output: id, name, status, created"),
+    all_pages: bool = typer.Option(
+        False, "--all", help="Stream every matching campaign as NDJSON in API order (ignores --limit and --sort)",
+    ),
+    use_index: bool = typer.Option(
+        False, "--index/--no-index",
+        help="Answer from the local campaign index: new campaigns are fetched incrementally, but status "
+             "changes made outside this CLI only show after the next full sync (hourly by default)",
+    ),
+    workspaces: Optional[str] = typer.Option(None, help=WORKSPACES_HELP),
 ):
     """List campaigns, sorted newest-first by default."""
+    if workspaces:
+        fan_out(ctx, workspaces)
+        return
     params = {"limit": limit}
     if search is not None:
         params["search"] = search
@@ -95,50 +116,140 @@ def list_campaigns(
     if starting_after is not None:
         params["starting_after"] = starting_after
 
-    client = InstantlyClient()
+    client = get_client()
+    newest = sort != "oldest"
+
+    if use_index and not all_pages and starting_after is None:
+        from instantly.campaign_index import CampaignIndex
+
+        index_config = load_config().get("campaign_index", {})
+        index = CampaignIndex(client.data_dir / "campaigns.db")
+        index.refresh(
+            client,
+            max_age=index_config.get("max_age", 30),
+            full_sync_every=index_config.get("full_sync_every", 3600),
+            force=settings["refresh"],
+        )
+        result = {"items": index.top(limit, newest=newest, search=search, status=status)}
+    else:
+        # Fetch all campaigns across pages so sorting is global, not per-page
+        fetch_params = {k: v for k, v in params.items() if k != "limit"}
+        campaigns = client.paginate("GET", "/api/v2/campaigns", params=fetch_params, page_size=100)
+
+        if all_pages:
+            emit_items(_brief_campaign(c) if brief else c for c in campaigns)
+            return
 
-    # Fetch all campaigns across pages so sorting is global, not per-page
-    all_items = []
-    fetch_params = {k: v for k, v in params.items() if k != "limit"}
-    fetch_params["limit"] = 100
-    next_cursor = params.get("starting_after")
-    while True:
-        if next_cursor:
-            fetch_params["starting_after"] = next_cursor
-        page = client.get("/api/v2/campaigns", params=fetch_params)
-        items = page.get("items", [])
-        all_items.extend(items)
-        next_cursor = page.get("next_starting_after")
-        if not next_cursor or len(items) < 100:
-            break
-
-    reverse = sort != "oldest"
-    all_items = sorted(all_items, key=lambda c: c.get("timestamp_created", ""), reverse=reverse)
-    result = {"items": all_items[:limit]}
+        import heapq
+
+        select = heapq.nlargest if newest else heapq.nsmallest
+        result = {"items": select(limit, campaigns, key=lambda c: c.get("timestamp_created", ""))}
 
     if brief:
-        items = [
-            {
-                "id": c["id"],
-                "name": c["name"],
-                "status": STATUS_LABELS.get(c.get("status"), c.get("status")),
-                "created": c.get("timestamp_created", ""),
-            }
-            for c in result.get("items", [])
-        ]
-        print(json.dumps(items))
+        items = [_brief_campaign(c) for c in result.get("items", [])]
+        emit(items, compact=True)
     else:
-        print(json.dumps(result, indent=2))
+        emit(result)
+
+
+def _record_write(client: InstantlyClient, campaign_id: str, result: dict) -> None:
+    """Keep the local campaign index in step with a write made through this CLI."""
+    from instantly.campaign_index import CampaignIndex
+
+    index_file = client.data_dir / "campaigns.db"
+    if index_file.exists():
+        CampaignIndex(index_file).record_write(campaign_id, result)
+
+
+def _brief_campaign(c: dict) -> dict:
+    return {
+        "id": c["id"],
+        "name": c["name"],
+        "status": STATUS_LABELS.get(c.get("status"), c.get("status")),
+        "created": c.get("timestamp_created", ""),
+    }
+
+
+@campaigns_app.command()
+def report(
+    by: str = typer.Option(
+        "campaign,eaccount", help="Comma-separated grouping: any of campaign, eaccount, interest, day",
+    ),
+    since: Optional[str] = typer.Option(None, help="First day to report (ISO date; default: 7 days ago)"),
+    until: Optional[str] = typer.Option(None, help="Last day to report (ISO date; default: today)"),
+    campaign_id: Optional[str] = typer.Option(None, help="Only this campaign"),
+    eaccount: Optional[str] = typer.Option(None, help="Only this sending account"),
+    sync: bool = typer.Option(True, help="Fetch emails created since the last run before reporting"),
+    rebuild: bool = typer.Option(False, help="Discard the stored counts and re-read every email from --since"),
+):
+    """Report sent emails, replies and reply rate per campaign, sending account, interest status or day."""
+    from datetime import datetime, timedelta, timezone
+
+    from instantly.campaign_index import CampaignIndex
+    from instantly.export import format_timestamp, parse_timestamp
+    from instantly.report import GROUPS, ReplyStore
+
+    group_by = [name.strip() for name in by.split(",") if name.strip()]
+    unknown = [name for name in group_by if name not in GROUPS]
+    if unknown:
+        print(f"Error: unknown --by {', '.join(unknown)}; choose from {', '.join(GROUPS)}.")
+        raise typer.Exit(code=1)
+    try:
+        start = parse_timestamp(since) if since else datetime.now(timezone.utc) - timedelta(days=7)
+        end = parse_timestamp(until) if until else None
+    except ValueError as exc:
+        print(f"Error: {exc}")
+        raise typer.Exit(code=1)
+    # Counts are per day, so the store always starts at midnight
+    start = start.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    client = get_client()
+    store = ReplyStore(client.data_dir / "report.db")
+    if sync:
+        covered = store.covered_from
+        if rebuild or not covered or parse_timestamp(covered) > start:
+            if covered and not rebuild:
+                print(f"Stored counts start at {covered[:10]}; re-reading emails from {start.date()}.", file=sys.stderr)
+            store.reset(format_timestamp(start))
+        new = store.sync(client)
+        if new:
+            print(f"Counted {new} new emails.", file=sys.stderr)
+    elif not store.covered_from or parse_timestamp(store.covered_from) > start:
+        print("Error: the stored counts do not reach back to --since; run without --no-sync.")
+        raise typer.Exit(code=1)
+
+    rows = store.query(
+        group_by, start.date().isoformat(), end.date().isoformat() if end else None, campaign_id, eaccount,
+    )
+    names = {}
+    index_file = client.data_dir / "campaigns.db"
+    if "campaign" in group_by and index_file.exists():
+        names = CampaignIndex(index_file).names(sorted({row["campaign_id"] for row in rows}))
+    items = []
+    for row in rows:
+        item = {}
+        if "campaign_id" in row:
+            item["campaign_id"] = row["campaign_id"]
+            item["campaign"] = names.get(row["campaign_id"], "")
+        if "eaccount" in row:
+            item["eaccount"] = row["eaccount"]
+        if "i_status" in row:
+            item["interest"] = INTEREST_LABELS.get(row["i_status"], row["i_status"])
+        if "day" in row:
+            item["day"] = row["day"]
+        item["sent"], item["replies"] = row["sent"], row["received"]
+        item["reply_rate"] = round(row["received"] / row["sent"], 4) if row["sent"] else None
+        items.append(item)
+    emit({"items": items})
 
 
 @campaigns_app.command()
 def get(
-    id: str = typer.Argument(help="UUID of the campaign to retrieve"),
+    ids: Optional[List[str]] = typer.Argument(None, help="UUID(s) of the campaign(s) to retrieve; reads stdin if omitted"),
+    concurrency: int = typer.Option(10, help="Max requests in flight when fetching several IDs", min=1, max=50),
 ):
-    """Get a single campaign by ID."""
-    client = InstantlyClient()
-    result = client.get(f"/api/v2/campaigns/{id}")
-    print(json.dumps(result, indent=2))
+    """Get one or more campaigns by ID. Several IDs are fetched concurrently and printed as NDJSON."""
+    print_many("/api/v2/campaigns/{id}", read_ids(ids), concurrency)
 
 
 @campaigns_app.command()
@@ -146,9 +257,10 @@ def activate(
     id: str = typer.Argument(help="UUID of the campaign to activate"),
 ):
     """Activate a campaign."""
-    client = InstantlyClient()
+    client = get_client()
     result = client.post(f"/api/v2/campaigns/{id}/activate")
-    print(json.dumps(result, indent=2))
+    _record_write(client, id, result)
+    emit(result)
 
 
 @campaigns_app.command()
@@ -156,9 +268,10 @@ def pause(
     id: str = typer.Argument(help="UUID of the campaign to pause"),
 ):
     """Pause a campaign."""
-    client = InstantlyClient()
+    client = get_client()
     result = client.post(f"/api/v2/campaigns/{id}/pause")
-    print(json.dumps(result, indent=2))
+    _record_write(client, id, result)
+    emit(result)
 
 
 @campaigns_app.command()
@@ -168,9 +281,10 @@ def duplicate(
 ):
     """Duplicate a campaign."""
     payload = {"name": name} if name else None
-    client = InstantlyClient()
+    client = get_client()
     result = client.post(f"/api/v2/campaigns/{id}/duplicate", json=payload)
-    print(json.dumps(result, indent=2))
+    _record_write(client, result.get("id", ""), result)
+    emit(result)
 
 
 @campaigns_app.command()
@@ -242,9 +356,66 @@ def update(
         print("Error: provide at least one field to update.")
         raise typer.Exit(code=1)
 
-    client = InstantlyClient()
+    client = get_client()
     result = client.patch(f"/api/v2/campaigns/{id}", json=payload)
-    print(json.dumps(result, indent=2))
+    _record_write(client, id, result)
+    emit(result)
+
+
+ADD_LEADS_BATCH_LIMIT = 1000
+
+# Counters that describe the workspace rather than the batch; keep the latest value
+NON_ADDITIVE_ADD_LEADS_FIELDS = {"remaining_in_plan"}
+
+
+def _default_checkpoint_path(campaign_id: str, file: Optional[str]) -> Path:
+    import hashlib
+
+    source = str(Path(file).resolve()) if file else "stdin"
+    digest = hashlib.sha1(f"{campaign_id}:{source}".encode()).hexdigest()[:12]
+    return CONFIG_DIR / "checkpoints" / f"add-leads-{campaign_id}-{digest}.json"
+
+
+def _load_checkpoint(path: Path, campaign_id: str, batch_size: int, preflight: dict) -> dict:
+    state = json.loads(path.read_text())
+    if state.get("campaign_id") != campaign_id or state.get("batch_size") != batch_size:
+        print(f"Error: checkpoint {path} was written for a different campaign or --batch-size.")
+        raise typer.Exit(code=1)
+    # Checkpoints from before the pre-flight stage numbered batches over the raw input
+    written = {key: value for key, value in state.get("preflight", {"dedupe": False}).items() if key != "as_of"}
+    if written != preflight:
+        print(f"Error: checkpoint {path} was written with other pre-flight options ({json.dumps(written)}).")
+        raise typer.Exit(code=1)
+    return state
+
+
+def _save_checkpoint(path: Path, state: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state))
+    os.replace(tmp, path)
+
+
+def _merge_counts(totals: dict, result: dict) -> None:
+    """Add the numeric counters of one /leads/add response into the running totals."""
+    for key, value in result.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        if key in NON_ADDITIVE_ADD_LEADS_FIELDS:
+            totals[key] = value
+        else:
+            totals[key] = totals.get(key, 0) + value
+
+
+def _iter_batches(leads: Iterable[dict], batch_size: int) -> Iterator[Tuple[int, list]]:
+    iterator = iter(leads)
+    index = 0
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield index, batch
+        index += 1
 
 
 @campaigns_app.command("add-leads")
@@ -252,32 +423,144 @@ def add_leads(
     campaign_id: str = typer.Argument(help="UUID of the campaign to add leads to"),
     file: Optional[str] = typer.Option(
         None,
-        help="Path to a JSON or CSV file with leads; if omitted, reads JSON array from stdin",
+        help="Path to a .csv, .json or .ndjson file (optionally .gz) with leads; if omitted, reads stdin",
     ),
     verify: bool = typer.Option(False, help="Verify leads on import"),
     skip_workspace: bool = typer.Option(False, help="Skip leads already in workspace"),
     skip_campaign: bool = typer.Option(False, help="Skip leads already in any campaign"),
     skip_list: bool = typer.Option(False, help="Skip leads already in any list"),
+    batch_size: int = typer.Option(
+        ADD_LEADS_BATCH_LIMIT, help="Leads per request", min=1, max=ADD_LEADS_BATCH_LIMIT,
+    ),
+    workers: int = typer.Option(4, help="Number of batches uploaded concurrently", min=1, max=32),
+    checkpoint: Optional[str] = typer.Option(
+        None,
+        help="Progress file (default: ~/.instantly/checkpoints/add-leads-<campaign>-<hash>.json)",
+    ),
+    resume: bool = typer.Option(False, help="Only send batches not marked done in the checkpoint"),
+    dedupe: bool = typer.Option(
+        True, help="Normalize emails and drop rows with invalid or duplicate emails before uploading",
+    ),
+    strip_plus: Optional[bool] = typer.Option(
+        None,
+        "--strip-plus/--no-strip-plus",
+        help="Treat jane+tag@acme.com as jane@acme.com when deduplicating (default: config dedupe.strip_plus)",
+    ),
+    bloom_capacity: Optional[int] = typer.Option(
+        None,
+        help="Deduplicate with a Bloom filter sized for this many rows instead of an exact set (bounded memory, "
+        "~0.1% of unique rows may be dropped as duplicates)",
+        min=1,
+    ),
+    skip_known: Optional[bool] = typer.Option(
+        None,
+        "--skip-known/--no-skip-known",
+        help="Drop leads the local email index knows are in the workspace (default: on with --skip-workspace)",
+    ),
 ):
-    """Add leads to a campaign."""
+    """Add leads to a campaign, uploading them in concurrent batches."""
+    import csv
+    import gzip
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    from instantly.dedup import KNOWN_TTL_DAYS, EmailIndex, Preflight, uploaded_emails
+
+    dedupe_config = load_config().get("dedupe", {})
+    if strip_plus is None:
+        strip_plus = bool(dedupe_config.get("strip_plus", False))
+    if skip_known is None:
+        skip_known = skip_workspace
+    skip_known = dedupe and skip_known
+    options = {"dedupe": False}
+    if dedupe:
+        options = {"dedupe": True, "strip_plus": strip_plus, "bloom_capacity": bloom_capacity, "skip_known": skip_known}
+
+    checkpoint_path = Path(checkpoint) if checkpoint else _default_checkpoint_path(campaign_id, file)
+    state = {"campaign_id": campaign_id, "batch_size": batch_size, "completed": [], "totals": {}}
+    if resume and checkpoint_path.exists():
+        state = _load_checkpoint(checkpoint_path, campaign_id, batch_size, options)
+    completed = set(state["completed"])
+    totals = state["totals"]
+
     try:
         leads = _load_leads_input(file)
     except FileNotFoundError as exc:
         print(f"Error: {exc}")
         raise typer.Exit(code=1)
-    except json.JSONDecodeError as exc:
-        print(f"Error: invalid JSON input ({exc})")
+
+    client = InstantlyClient(pool_size=workers)
+    index = None
+    if skip_known:
+        index = EmailIndex(client.data_dir / "emails.db", dedupe_config.get("known_ttl_days", KNOWN_TTL_DAYS))
+        index.import_mirror(client.data_dir / "leads.db")
+    preflight = None
+    if dedupe:
+        # A resumed run checks the index as it was when the import started, so batches keep their numbers
+        as_of = state.get("preflight", {}).get("as_of") or time.time()
+        state["preflight"] = {**options, "as_of": as_of}
+        preflight = Preflight(strip_plus, bloom_capacity, index, as_of)
+        leads = preflight.filter(leads)
+
+    def upload(batch: list) -> dict:
+        payload = {
+            "campaign_id": campaign_id,
+            "leads": batch,
+            "verify_leads_on_import": verify,
+            "skip_if_in_workspace": skip_workspace,
+            "skip_if_in_campaign": skip_campaign,
+            "skip_if_in_list": skip_list,
+        }
+        result = client.post("/api/v2/leads/add", json=payload)
+        if index is not None:
+            # Recorded here rather than in drain() so the index write overlaps other batches' requests
+            index.add(uploaded_emails(batch, result), "add-leads")
+        return result
+
+    failed = []
+    pending = {}
+
+    def drain() -> None:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            number = pending.pop(future)
+            try:
+                result = future.result()
+            except InstantlyError as exc:
+                print(f"Batch {number} failed: {exc}", file=sys.stderr)
+                failed.append(number)
+                continue
+            completed.add(number)
+            _merge_counts(totals, result)
+            print(f"Batch {number} uploaded ({len(completed)} done).", file=sys.stderr)
+        _save_checkpoint(checkpoint_path, {**state, "completed": sorted(completed), "totals": totals})
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            try:
+                for number, batch in _iter_batches(leads, batch_size):
+                    if number in completed:
+                        continue
+                    pending[pool.submit(upload, batch)] = number
+                    # Bound in-flight batches so the whole input is never held in memory
+                    if len(pending) >= workers * 2:
+                        drain()
+            finally:
+                # Record batches already in flight even if reading the input failed
+                while pending:
+                    drain()
+    except (json.JSONDecodeError, csv.Error, UnicodeDecodeError, EOFError, gzip.BadGzipFile) as exc:
+        print(f"Error: invalid lead input ({exc}). Fix it and re-run with --resume (checkpoint: {checkpoint_path}).")
         raise typer.Exit(code=1)
 
-    payload = {
-        "campaign_id": campaign_id,
-        "leads": leads,
-        "verify_leads_on_import": verify,
-        "skip_if_in_workspace": skip_workspace,
-        "skip_if_in_campaign": skip_campaign,
-        "skip_if_in_list": skip_list,
-    }
+    result = {"batches_completed": len(completed), "failed_batches": sorted(failed), **totals}
+    if preflight is not None:
+        skipped = preflight.skipped
+        result["skipped_locally"] = {
+            "total": sum(skipped.values()),
+            **{reason: skipped[reason] for reason in ("invalid_email", "duplicate_in_file", "known_in_workspace")},
+        }
+    emit(result)
+    if failed:
+        print(f"Error: {len(failed)} batch(es) failed. Re-run with --resume to retry them (checkpoint: {checkpoint_path}).")
+        raise typer.Exit(code=1)
 
-    client = InstantlyClient()
-    result = client.post("/api/v2/leads/add", json=payload)
-    print(json.dumps(result, indent=2))
@@ -0,0 +1,117 @@
+import sys
+from typing import List, Optional
+
+import typer
+
+from instantly.client import InstantlyError, get_client, profile_names, use_profile
+from instantly.output import emit, emit_items
+
+WORKSPACES_HELP = "Run in several workspaces concurrently: 'all' profiles, or comma-separated profile names"
+MAX_WORKSPACE_WORKERS = 32
+
+
+def read_ids(ids: Optional[List[str]]) -> List[str]:
+    """IDs from the command line, or whitespace-separated from stdin when none are given (or "-")."""
+    if ids and ids != ["-"]:
+        return ids
+    piped = [] if sys.stdin.isatty() else sys.stdin.read().split()
+    if not piped:
+        print("Error: provide at least one ID, or pipe IDs through stdin.")
+        raise typer.Exit(code=1)
+    return piped
+
+
+def print_many(path_template: str, ids: List[str], concurrency: int) -> None:
+    """Fetch path_template.format(id=...) for every ID concurrently.
+
+    A single ID prints the object as before; several print one NDJSON line
+    each, in input order, with {"id", "error"} lines for failures.
+    """
+    if len(ids) == 1:
+        emit(get_client().get(path_template.format(id=ids[0])))
+        return
+
+    from instantly.async_client import get_many  # asyncio is only needed for several IDs
+
+    failed = []
+    results = get_many([path_template.format(id=id) for id in ids], concurrency=concurrency)
+
+    def rows():
+        for id, result in zip(ids, results):
+            if isinstance(result, InstantlyError):
+                failed.append(id)
+                result = {"id": id, "error": str(result)}
+            yield result
+
+    emit_items(rows())
+    if failed:
+        raise typer.Exit(code=1)
+
+
+def _workspace_names(spec: str) -> List[str]:
+    configured = profile_names()
+    if spec.strip() == "all":
+        names = configured
+    else:
+        names = list(dict.fromkeys(name.strip() for name in spec.split(",") if name.strip()))
+    if not names:
+        print("Error: no profiles configured. Add one with 'instantly configure --profile <name>'.")
+        raise typer.Exit(code=1)
+    unknown = [name for name in names if name not in configured and name != "default"]
+    if unknown:
+        print(f"Error: unknown profile(s) {', '.join(unknown)}; configured: {', '.join(configured) or 'none'}.")
+        raise typer.Exit(code=1)
+    return names
+
+
+def fan_out(ctx: typer.Context, workspaces: str) -> None:
+    """Re-run the invoked command in every named workspace at once and emit the results merged.
+
+    Each workspace runs on its own thread with its own client, so its own
+    session and rate-limit budget. Output is captured the way `batch` does
+    it, and every item is tagged with "workspace". Keys next to "items"
+    (such as next_starting_after) become {workspace: value} maps. A failing
+    workspace is reported on stderr and makes the exit code 1.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from instantly.commands.batch import captured_streams, run_operation
+
+    names = _workspace_names(workspaces)
+    params = {key: value for key, value in ctx.params.items() if key != "workspaces" and value is not None}
+    op = {"command": " ".join(ctx.command_path.split()[1:]), "params": params}
+
+    with captured_streams() as (stdout, stdin):
+
+        def run(name: str) -> dict:
+            with use_profile(name):
+                return run_operation(ctx.command, 0, op, stdout, stdin)
+
+        with ThreadPoolExecutor(max_workers=min(len(names), MAX_WORKSPACE_WORKERS)) as pool:
+            outcomes = list(pool.map(run, names))
+
+    rows: list = []
+    rest: dict = {}
+    failed = []
+    for name, outcome in zip(names, outcomes):
+        if not outcome["ok"]:
+            error = outcome["error"].removeprefix("Error: ")
+            print(f"Error: workspace {name}: {error}", file=sys.stderr)
+            failed.append(name)
+            continue
+        result = outcome["result"]
+        # Listings (JSON, or NDJSON with a next_starting_after line) arrive as {"items": [...], ...}
+        if isinstance(result, dict) and isinstance(result.get("items"), list):
+            items, extra = result["items"], {key: value for key, value in result.items() if key != "items"}
+        else:
+            items, extra = (result if isinstance(result, list) else [result]), {}
+        rows.extend({"workspace": name, **item} for item in items if isinstance(item, dict))
+        for key, value in extra.items():
+            rest.setdefault(key, {})[name] = value
+
+    if params.get("all_pages"):
+        emit_items(rows, trailer=rest or None)
+    else:
+        emit({"items": rows, **rest})
+    if failed:
+        raise typer.Exit(code=1)
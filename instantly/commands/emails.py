@@ -1,10 +1,13 @@
 import json
+import sys
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 import typer
 
-from instantly.client import InstantlyClient
+from instantly.client import InstantlyClient, get_client, load_config, settings
+from instantly.commands.common import WORKSPACES_HELP, fan_out, print_many, read_ids
+from instantly.output import emit, emit_items
 
 
 def _resolve_body(body_text, body_html, body_text_file, body_html_file):
@@ -21,7 +24,13 @@ def _resolve_body(body_text, body_html, body_text_file, body_html_file):
         body["html"] = html
     return body
 
-emails_app = typer.Typer(no_args_is_help=True)
+emails_app = typer.Typer(no_args_is_help=True, rich_markup_mode=None)
+
+# /leads/list accepts up to 100 contacts per request
+ENRICH_BATCH_SIZE = 100
+ENRICH_WORKERS = 4
+ENRICH_TTL = 24 * 3600
+ENRICH_MISS_TTL = 3600
 
 
 @emails_app.command()
@@ -55,9 +64,9 @@ def forward(
     if assigned_to:
         payload["assigned_to"] = assigned_to
 
-    client = InstantlyClient()
+    client = get_client()
     client.post("/api/v2/emails/forward", json=payload)
-    print(json.dumps({"success": True}))
+    emit({"success": True}, compact=True)
 
 
 @emails_app.command()
@@ -92,13 +101,185 @@ def reply(
     if assigned_to:
         payload["assigned_to"] = assigned_to
 
-    client = InstantlyClient()
+    client = get_client()
     client.post("/api/v2/emails/reply", json=payload)
-    print(json.dumps({"success": True}))
+    emit({"success": True}, compact=True)
+
+
+def _reply_variables(row: dict) -> dict:
+    """Template variables for a row: its own fields, then its variables / custom_variables objects."""
+    variables = {key: value for key, value in row.items() if not isinstance(value, (dict, list))}
+    for nested in ("custom_variables", "variables"):
+        if isinstance(row.get(nested), dict):
+            variables.update(row[nested])
+    return variables
+
+
+def _re_subject(subject: str) -> str:
+    return subject if subject[:3].lower() == "re:" else f"Re: {subject}"
+
+
+def _reply_payload(row: dict, template: Optional[str], templates_dir: str, subject: Optional[str]) -> dict:
+    """Render one input row into an /emails/reply payload; raises ValueError when it cannot be.
+
+    Without a subject template the reply takes the row's subject column, or
+    leaves "subject" out for the sender to fill in from the original email.
+    """
+    from instantly.templating import compile_string, find_template, load_template
+
+    reply_to_uuid = row.get("reply_to_uuid") or row.get("id")
+    if not reply_to_uuid or not row.get("eaccount"):
+        raise ValueError("reply_to_uuid (or id) and eaccount are required")
+    name = row.get("template") or template
+    if not name:
+        raise ValueError("no template: add a template column or pass --template")
+    variables = _reply_variables(row)
+    payload: dict = {
+        "reply_to_uuid": reply_to_uuid,
+        "eaccount": row["eaccount"],
+        "body": load_template(find_template(name, templates_dir)).render(variables),
+    }
+    subject = row.get("reply_subject") or subject
+    if subject:
+        payload["subject"] = compile_string(subject).render_text(variables)
+    elif row.get("subject"):
+        payload["subject"] = _re_subject(str(row["subject"]))
+    if row.get("cc"):
+        payload["cc_address_email_list"] = row["cc"]
+    if row.get("bcc"):
+        payload["bcc_address_email_list"] = row["bcc"]
+    return payload
+
+
+@emails_app.command("reply-bulk")
+def reply_bulk(
+    file: Optional[str] = typer.Option(
+        None, help="CSV/NDJSON rows with reply_to_uuid (or id), eaccount and template variables; default stdin",
+    ),
+    template: Optional[str] = typer.Option(None, help="Template name or path for rows without a template column"),
+    templates_dir: str = typer.Option("templates", help="Where template names are looked up"),
+    subject: Optional[str] = typer.Option(
+        None,
+        help="Subject template (rows may override with reply_subject); default: 'Re: ' and the row's subject "
+        "column, or the original email's subject",
+    ),
+    account_rate: str = typer.Option(
+        "10/60/1", help="Replies allowed per sending account, as count/seconds[/burst]; the default spaces them out",
+    ),
+    workers: int = typer.Option(8, help="Replies sent concurrently", min=1, max=32),
+    dry_run: bool = typer.Option(False, help="Render every row and print the payloads without sending"),
+):
+    """Reply to many emails from templates, throttled per sending account."""
+    import time
+    from collections import deque
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+    from itertools import chain
+
+    from instantly.client import InstantlyError
+    from instantly.ratelimit import Rate, RateLimiter
+    from instantly.readers import read_records
+
+    try:
+        rate = Rate.parse(account_rate)
+    except ValueError as exc:
+        print(f"Error: {exc}")
+        raise typer.Exit(code=1)
+
+    # Render every row up front: template and variable problems surface before anything is sent
+    queues: dict = {}
+    results: list = []
+    try:
+        for index, row in enumerate(read_records(file)):
+            outcome = {
+                "index": index,
+                "reply_to_uuid": row.get("reply_to_uuid") or row.get("id"),
+                "eaccount": row.get("eaccount"),
+            }
+            try:
+                payload = _reply_payload(row, template, templates_dir, subject)
+            except (ValueError, OSError) as exc:
+                results.append({**outcome, "ok": False, "error": str(exc)})
+                continue
+            queues.setdefault(row["eaccount"], deque()).append((outcome, payload))
+    except FileNotFoundError as exc:
+        print(f"Error: {exc}")
+        raise typer.Exit(code=1)
+    if dry_run:
+        rendered = (
+            {**outcome, "ok": True, "payload": payload} for queue in queues.values() for outcome, payload in queue
+        )
+        emit_items(chain(results, rendered))
+        if results:
+            raise typer.Exit(code=1)
+        return
+
+    client = get_client(pool_size=workers)
+    # One bucket per sending account, shared with other processes through the state file
+    limiter = RateLimiter(
+        client.data_dir / "eaccounts.json", {f"eaccount:{account}": rate for account in queues}, defaults={},
+    )
+
+    def send(outcome: dict, payload: dict) -> dict:
+        try:
+            if "subject" not in payload:
+                original = client.get(f"/api/v2/emails/{payload['reply_to_uuid']}")
+                payload = {**payload, "subject": _re_subject(original.get("subject") or "")}
+            client.post("/api/v2/emails/reply", json=payload)
+        except InstantlyError as exc:
+            return {**outcome, "ok": False, "error": str(exc)}
+        return {**outcome, "ok": True}
+
+    def sends():
+        """Round-robin over accounts, starting a send whenever its account has a token and a worker is free."""
+        ready_at = dict.fromkeys(queues, 0.0)
+        pending: set = set()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while queues or pending:
+                now = time.monotonic()
+                for account in list(queues):
+                    if len(pending) >= workers:
+                        break
+                    if ready_at[account] > now:
+                        continue
+                    wait_s = limiter.reserve(f"eaccount:{account}")
+                    if wait_s > 0:
+                        ready_at[account] = now + wait_s
+                        continue
+                    pending.add(pool.submit(send, *queues[account].popleft()))
+                    if not queues[account]:
+                        del queues[account]
+                # Sleep until a send finishes or the next throttled account may go again
+                waiting = [ready_at[account] for account in queues]
+                timeout = max(0.0, min(waiting) - time.monotonic()) if waiting and len(pending) < workers else None
+                if pending:
+                    done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        pending.discard(future)
+                        yield future.result()
+                elif timeout:
+                    time.sleep(timeout)
+
+    failed = 0
+
+    def tally(rows):
+        nonlocal failed
+        for result in rows:
+            failed += not result["ok"]
+            yield result
+
+    total = len(results) + sum(len(queue) for queue in queues.values())
+    started = time.monotonic()
+    emit_items(tally(chain(results, sends())))
+    elapsed = time.monotonic() - started
+    sent = total - failed
+    print(f"{sent} sent, {failed} failed in {elapsed:.1f}s ({sent / elapsed if elapsed else 0:.1f}/s).", file=sys.stderr)
+    if failed:
+        raise typer.Exit(code=1)
 
 
 @emails_app.command("list")
 def list_emails(
+    ctx: typer.Context,
     limit: Optional[int] = typer.Option(None, help="Number of items to return (1-100)"),
     starting_after: Optional[str] = typer.Option(None, help="ID of last item from previous page (pagination)"),
     search: Optional[str] = typer.Option(None, help="Search by email address or 'thread:<thread_id>'"),
@@ -121,8 +302,15 @@ def list_emails(
     max_timestamp_created: Optional[str] = typer.Option(None, help="Filter emails created before this ISO timestamp"),
     brief: bool = typer.Option(False, help="Output compact summary instead of full JSON"),
     enrich: bool = typer.Option(False, help="Add first_name and company_name from leads API (use with --brief)"),
+    all_pages: bool = typer.Option(
+        False, "--all", help="Follow the cursor through every page, streaming items as NDJSON (--limit sets page size)",
+    ),
+    workspaces: Optional[str] = typer.Option(None, help=WORKSPACES_HELP),
 ):
     """List emails (Unibox). Rate limited to 20 req/min."""
+    if workspaces:
+        fan_out(ctx, workspaces)
+        return
     params: dict = {}
     if limit is not None:
         params["limit"] = limit
@@ -165,73 +353,303 @@ def list_emails(
     if max_timestamp_created is not None:
         params["max_timestamp_created"] = max_timestamp_created
 
-    client = InstantlyClient()
+    client = get_client()
+
+    if all_pages:
+        if not (brief and enrich):
+            items = client.paginate("GET", "/api/v2/emails", params=params)
+            emit_items((_brief_email(item, {}, False) for item in items) if brief else items)
+            return
+        # Enrichment looks leads up a page at a time
+        for page in client.iter_pages("GET", "/api/v2/emails", params=params):
+            items = page.get("items", [])
+            lead_info = _lookup_leads(client, items)
+            emit_items(_brief_email(item, lead_info, enrich) for item in items)
+        return
+
     result = client.get("/api/v2/emails", params=params)
 
     if brief:
         items = result.get("items", [])
 
         # Build lead lookup if --enrich is set
-        lead_info: dict = {}
-        if enrich and items:
-            lead_emails = list({item.get("lead") for item in items if item.get("lead")})
-            if lead_emails:
-                leads_result = client.post("/api/v2/leads/list", json={"contacts": lead_emails, "limit": 100})
-                for ld in leads_result.get("items", []):
-                    email = ld.get("email")
-                    if email:
-                        lead_info[email] = {
-                            "first_name": ld.get("first_name") or "",
-                            "company_name": ld.get("company_name") or "",
-                        }
-
-        for item in items:
-            text = (item.get("body") or {}).get("text", "")
-            # Strip to first reply boundary for cleaner output
-            for marker in ["\nOn ", "\n>", "\n---", "\n___", "\nFrom:"]:
-                idx = text.find(marker)
-                if idx > 0:
-                    text = text[:idx]
-            text = " ".join(text.split())
-            brief_item = {
-                "id": item.get("id"),
-                "thread_id": item.get("thread_id"),
-                "from": item.get("from_address_email"),
-                "to": item.get("to_address_email_list"),
-                "eaccount": item.get("eaccount"),
-                "lead": item.get("lead"),
-                "subject": item.get("subject"),
-                "date": item.get("timestamp_email"),
-                "body_preview": text[:500],
-            }
-            if enrich:
-                info = lead_info.get(item.get("lead"), {})
-                brief_item["first_name"] = info.get("first_name", "")
-                brief_item["company_name"] = info.get("company_name", "")
-            print(json.dumps(brief_item, ensure_ascii=False))
+        lead_info = _lookup_leads(client, items) if enrich else {}
+
         nsa = result.get("next_starting_after")
-        if nsa:
-            print(json.dumps({"next_starting_after": nsa}))
+        emit_items(
+            (_brief_email(item, lead_info, enrich) for item in items),
+            trailer={"next_starting_after": nsa} if nsa else None,
+        )
     else:
-        print(json.dumps(result, indent=2))
+        emit(result)
+
+
+def _lookup_leads(client: InstantlyClient, items: list) -> dict:
+    """Map lead email -> first_name/company_name, from the enrichment cache or batched lead lookups."""
+    lead_emails = {item.get("lead") for item in items if item.get("lead")}
+    if not lead_emails:
+        return {}
+    from concurrent.futures import ThreadPoolExecutor
+
+    from instantly.cache import Cache
+
+    cache = None
+    if settings["cache"] is not False:
+        enrich_config = load_config().get("enrich_cache", {})
+        cache = Cache(client.data_dir / "enrich.db", max_bytes=int(enrich_config.get("max_mb", 10) * 1024 * 1024))
+        ttl = enrich_config.get("ttl", ENRICH_TTL)
+
+    lead_info: dict = {}
+    missing = []
+    for email in lead_emails:
+        cached = cache.get(f"lead:{email.lower()}") if cache and not settings["refresh"] else None
+        if cached is None:
+            missing.append(email)
+        else:
+            lead_info[email] = cached
+
+    batches = [missing[i:i + ENRICH_BATCH_SIZE] for i in range(0, len(missing), ENRICH_BATCH_SIZE)]
+    with ThreadPoolExecutor(max_workers=ENRICH_WORKERS) as pool:
+        for leads in pool.map(_fetch_lead_batch, [client] * len(batches), batches):
+            for ld in leads:
+                email = ld.get("email")
+                if email:
+                    lead_info[email] = {
+                        "first_name": ld.get("first_name") or "",
+                        "company_name": ld.get("company_name") or "",
+                    }
+
+    if cache:
+        for email in missing:
+            # Cache misses too, so unknown senders are not looked up on every page
+            info = lead_info.get(email, {"first_name": "", "company_name": ""})
+            cache.set(f"lead:{email.lower()}", info, ttl if email in lead_info else ENRICH_MISS_TTL)
+    return lead_info
+
+
+def _fetch_lead_batch(client: InstantlyClient, emails: list) -> list:
+    # A contact can be a lead in several campaigns, so follow the cursor instead of trusting one page
+    return list(client.paginate("POST", "/api/v2/leads/list", params={"contacts": emails}, page_size=100))
+
+
+def _brief_email(item: dict, lead_info: dict, enrich: bool) -> dict:
+    from instantly.extract import preview
+
+    brief_item = {
+        "id": item.get("id"),
+        "thread_id": item.get("thread_id"),
+        "from": item.get("from_address_email"),
+        "to": item.get("to_address_email_list"),
+        "eaccount": item.get("eaccount"),
+        "lead": item.get("lead"),
+        "subject": item.get("subject"),
+        "date": item.get("timestamp_email"),
+        "body_preview": preview(item.get("body") or {}),
+    }
+    if enrich:
+        info = lead_info.get(item.get("lead"), {})
+        brief_item["first_name"] = info.get("first_name", "")
+        brief_item["company_name"] = info.get("company_name", "")
+    return brief_item
+
+
+@emails_app.command()
+def watch(
+    campaign_id: Optional[str] = typer.Option(None, help="Filter by campaign UUID"),
+    eaccount: Optional[str] = typer.Option(None, help="Filter by sender account (comma-separated for multiple)"),
+    email_type: Optional[str] = typer.Option(None, help="Filter by type: received, sent, manual"),
+    i_status: Optional[int] = typer.Option(None, help="Filter by interest status"),
+    since: Optional[str] = typer.Option(None, help="ISO timestamp to start from when there is no saved mark (default: now)"),
+    name: Optional[str] = typer.Option(None, help="Name of the saved high-water mark (default: one per filter set)"),
+    once: bool = typer.Option(False, help="Fetch what is new since the mark, then exit (for cron)"),
+    min_interval: float = typer.Option(5, help="Seconds between polls while new emails keep arriving", min=3),
+    max_interval: float = typer.Option(60, help="Longest wait between polls while the inbox is quiet"),
+    brief: bool = typer.Option(False, help="Output compact summaries instead of full emails"),
+):
+    """Stream new emails as NDJSON, continuing from where the last watch stopped."""
+    import hashlib
+    import time
+
+    from instantly.watch import PollInterval, Watermark
+
+    params: dict = {"sort_order": "asc"}
+    if campaign_id is not None:
+        params["campaign_id"] = campaign_id
+    if eaccount is not None:
+        params["eaccount"] = eaccount
+    if email_type is not None:
+        params["email_type"] = email_type
+    if i_status is not None:
+        params["i_status"] = i_status
+
+    client = get_client()
+    if name is None:
+        name = hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()[:12]
+    try:
+        mark = Watermark(client.data_dir / "watch" / f"{name}.json", since=since)
+    except ValueError as exc:
+        print(f"Error: invalid --since: {exc}")
+        raise typer.Exit(code=1)
+    interval = PollInterval(min_interval, max_interval)
+
+    def poll() -> tuple:
+        """Emit everything new since the mark; return (emails found, requests made)."""
+        found = requests = 0
+        cursor = None
+        # The filter stays fixed while paging; the mark only moves the next poll's starting point
+        base = {**params, **mark.begin(), "limit": 100}
+        while True:
+            page_params = dict(base)
+            if cursor:
+                page_params["starting_after"] = cursor
+            # Never answer from the response cache: the point is to see what changed
+            page = client.request("GET", "/api/v2/emails", params=page_params, cache_reads=False)
+            requests += 1
+            items = page.get("items", [])
+            new = mark.advance(items)
+            if new:
+                emit_items((_brief_email(item, {}, False) for item in new) if brief else new, fmt="ndjson")
+                sys.stdout.flush()
+                mark.save()
+                found += len(new)
+            cursor = page.get("next_starting_after")
+            if not cursor or len(items) < page_params["limit"]:
+                return found, requests
+
+    try:
+        while True:
+            found, requests = poll()
+            mark.save()
+            if once:
+                return
+            time.sleep(interval.next(found, requests))
+    except KeyboardInterrupt:
+        pass
+
+
+@emails_app.command()
+def export(
+    out: str = typer.Option(..., help="Directory for the partition files and _manifest.json"),
+    since: str = typer.Option(..., help="Export emails created at or after this ISO date/timestamp"),
+    until: Optional[str] = typer.Option(None, help="...and before this one (default: now)"),
+    window: str = typer.Option("1d", help="Partition size: 30m, 6h, 1d, 1w, ..."),
+    fmt: str = typer.Option("jsonl", "--format", help="jsonl (gzipped) or parquet (needs pyarrow)"),
+    workers: int = typer.Option(4, help="Windows paged concurrently (all share the 20 req/min budget)", min=1, max=16),
+    campaign_id: Optional[str] = typer.Option(None, help="Filter by campaign UUID"),
+    eaccount: Optional[str] = typer.Option(None, help="Filter by sender account (comma-separated for multiple)"),
+    email_type: Optional[str] = typer.Option(None, help="Filter by type: received, sent, manual"),
+):
+    """Export emails in a date range to time-partitioned files; re-runs skip finished windows."""
+    import time
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from datetime import datetime, timezone
+
+    from instantly import export as exporter
+    from instantly.client import InstantlyError
+
+    if fmt not in exporter.FORMATS:
+        print(f"Error: --format must be one of {', '.join(exporter.FORMATS)}.")
+        raise typer.Exit(code=1)
+    if fmt == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            print("Error: --format parquet needs pyarrow (pip install pyarrow).")
+            raise typer.Exit(code=1)
+    now = datetime.now(timezone.utc)
+    try:
+        step = exporter.parse_duration(window)
+        start = exporter.parse_timestamp(since)
+        end = exporter.parse_timestamp(until) if until else now
+    except ValueError as exc:
+        print(f"Error: {exc}")
+        raise typer.Exit(code=1)
+
+    filters: dict = {}
+    if campaign_id is not None:
+        filters["campaign_id"] = campaign_id
+    if eaccount is not None:
+        filters["eaccount"] = eaccount
+    if email_type is not None:
+        filters["email_type"] = email_type
+
+    directory = Path(out)
+    directory.mkdir(parents=True, exist_ok=True)
+    try:
+        manifest = exporter.Manifest(directory, filters, fmt, step)
+    except ValueError as exc:
+        print(f"Error: {exc}")
+        raise typer.Exit(code=1)
+
+    client = get_client(pool_size=workers)
+    write = exporter.write_jsonl if fmt == "jsonl" else exporter.write_parquet
+
+    def export_window(bounds: tuple) -> int:
+        params = {**filters, "min_timestamp_created": bounds[0], "max_timestamp_created": bounds[1]}
+        pages = client.iter_pages("GET", "/api/v2/emails", params=params)
+        items = (item for page in pages for item in page.get("items", []))
+        return write(directory / exporter.partition_name(bounds, fmt), exporter.in_window(items, bounds))
+
+    todo, skipped = [], 0
+    for bounds in exporter.windows(start, end, step):
+        if manifest.done(exporter.partition_name(bounds, fmt)):
+            skipped += 1
+        else:
+            todo.append(bounds)
+
+    exported, failed = 0, []
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(export_window, bounds): bounds for bounds in todo}
+        for future in as_completed(futures):
+            bounds = futures[future]
+            try:
+                count = future.result()
+            except InstantlyError as exc:
+                print(f"Window {bounds[0]} .. {bounds[1]} failed: {exc}", file=sys.stderr)
+                failed.append(bounds[0])
+                continue
+            exported += count
+            # A window still open at the time of the export can gain emails; fetch it again next run
+            if exporter.parse_timestamp(bounds[1]) <= now:
+                manifest.complete(exporter.partition_name(bounds, fmt), bounds, count)
+            print(f"Window {bounds[0]} .. {bounds[1]}: {count} emails.", file=sys.stderr)
+
+    elapsed = time.monotonic() - started
+    emit({
+        "windows": len(todo) + skipped,
+        "skipped": skipped,
+        "exported": exported,
+        "failed_windows": sorted(failed),
+        "seconds": round(elapsed, 1),
+        "directory": str(directory),
+    })
+    if failed:
+        print(f"Error: {len(failed)} window(s) failed. Re-run the same command to retry them.")
+        raise typer.Exit(code=1)
 
 
 @emails_app.command()
 def get(
-    id: str = typer.Argument(help="UUID of the email to retrieve"),
+    ids: Optional[List[str]] = typer.Argument(None, help="UUID(s) of the email(s) to retrieve; reads stdin if omitted"),
+    concurrency: int = typer.Option(10, help="Max requests in flight when fetching several IDs", min=1, max=50),
 ):
-    """Get a single email by ID."""
-    client = InstantlyClient()
-    result = client.get(f"/api/v2/emails/{id}")
-    print(json.dumps(result, indent=2))
+    """Get one or more emails by ID. Several IDs are fetched concurrently and printed as NDJSON."""
+    print_many("/api/v2/emails/{id}", read_ids(ids), concurrency)
 
 
 @emails_app.command("unread-count")
-def unread_count():
+def unread_count(
+    ctx: typer.Context,
+    workspaces: Optional[str] = typer.Option(None, help=WORKSPACES_HELP),
+):
     """Get the count of unread emails."""
-    client = InstantlyClient()
+    if workspaces:
+        fan_out(ctx, workspaces)
+        return
+    client = get_client()
     result = client.get("/api/v2/emails/unread/count")
-    print(json.dumps(result, indent=2))
+    emit(result)
 
 
 @emails_app.command("mark-read")
@@ -239,9 +657,9 @@ def mark_read(
     thread_id: str = typer.Argument(help="UUID of the thread to mark as read"),
 ):
     """Mark all emails in a thread as read."""
-    client = InstantlyClient()
+    client = get_client()
     result = client.post(f"/api/v2/emails/threads/{thread_id}/mark-as-read")
-    print(json.dumps(result, indent=2))
+    emit(result)
 
 
 @emails_app.command()
@@ -261,6 +679,6 @@ def update(
         print("Error: at least one of --is-unread or --reminder-ts is required.")
         raise typer.Exit(code=1)
 
-    client = InstantlyClient()
+    client = get_client()
     client.patch(f"/api/v2/emails/{id}", json=payload)
-    print(json.dumps({"success": True}))
+    emit({"success": True}, compact=True)
@@ -1,11 +1,17 @@
 import json
-from typing import Optional
+import sys
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
 import typer
 
-from instantly.client import InstantlyClient
+from instantly.client import get_client
+from instantly.commands.common import print_many, read_ids
+from instantly.output import emit, emit_items
 
-leads_app = typer.Typer(no_args_is_help=True)
+if TYPE_CHECKING:
+    from instantly.lead_mirror import LeadMirror
+
+leads_app = typer.Typer(no_args_is_help=True, rich_markup_mode=None)
 
 
 @leads_app.command()
@@ -71,19 +77,18 @@ def create(
     if custom_variables is not None:
         payload["custom_variables"] = json.loads(custom_variables)
 
-    client = InstantlyClient()
+    client = get_client()
     result = client.post("/api/v2/leads", json=payload)
-    print(json.dumps(result, indent=2))
+    emit(result)
 
 
 @leads_app.command()
 def get(
-    id: str = typer.Argument(help="UUID of the lead to retrieve"),
+    ids: Optional[List[str]] = typer.Argument(None, help="UUID(s) of the lead(s) to retrieve; reads stdin if omitted"),
+    concurrency: int = typer.Option(10, help="Max requests in flight when fetching several IDs", min=1, max=50),
 ):
-    """Get a single lead by ID."""
-    client = InstantlyClient()
-    result = client.get(f"/api/v2/leads/{id}")
-    print(json.dumps(result, indent=2))
+    """Get one or more leads by ID. Several IDs are fetched concurrently and printed as NDJSON."""
+    print_many("/api/v2/leads/{id}", read_ids(ids), concurrency)
 
 
 @leads_app.command("list")
@@ -107,8 +112,29 @@ def list_leads(
     esg_code: Optional[str] = typer.Option(None, help="ESG code (0=In Queue, 1=Barracuda, 2=Mimecast, etc.)"),
     queries: Optional[str] = typer.Option(None, help="Query filters as JSON array string"),
     assigned_to: Optional[str] = typer.Option(None, help="Assigned user UUID"),
+    all_pages: bool = typer.Option(
+        False, "--all", help="Follow the cursor through every page, streaming leads as NDJSON (--limit sets page size)",
+    ),
+    local: bool = typer.Option(
+        False, "--local", help="Answer from the local mirror (see 'leads sync'); supports search, campaign, list_id, ids, contacts",
+    ),
 ):
     """List leads. Note: this is a POST endpoint due to complex filtering."""
+    if local:
+        unsupported = {
+            "--filter": filter, "--in-campaign": in_campaign, "--in-list": in_list,
+            "--excluded-ids": excluded_ids, "--organization-user-ids": organization_user_ids,
+            "--smart-view-id": smart_view_id, "--is-website-visitor": is_website_visitor,
+            "--distinct-contacts": distinct_contacts, "--enrichment-status": enrichment_status,
+            "--esg-code": esg_code, "--queries": queries, "--assigned-to": assigned_to,
+        }
+        used = [flag for flag, value in unsupported.items() if value is not None]
+        if used:
+            print(f"Error: {', '.join(used)} cannot be answered from the local mirror; drop --local.")
+            raise typer.Exit(code=1)
+        _list_local(search, campaign, list_id, ids, contacts, limit, starting_after, all_pages)
+        return
+
     payload: dict = {}
     if search is not None:
         payload["search"] = search
@@ -149,9 +175,51 @@ def list_leads(
     if assigned_to is not None:
         payload["assigned_to"] = assigned_to
 
-    client = InstantlyClient()
+    client = get_client()
+    if all_pages:
+        emit_items(client.paginate("POST", "/api/v2/leads/list", params=payload))
+        return
+
     result = client.post("/api/v2/leads/list", json=payload)
-    print(json.dumps(result, indent=2))
+    emit(result)
+
+
+def _split(value: Optional[str]) -> Optional[List[str]]:
+    return [s.strip() for s in value.split(",")] if value is not None else None
+
+
+def _list_local(search, campaign, list_id, ids, contacts, limit, starting_after, all_pages) -> None:
+    from instantly.lead_mirror import LeadMirror
+
+    client = get_client()
+    mirror = LeadMirror(client.data_dir / "leads.db")
+    if not mirror.synced:
+        print("Error: the local lead mirror is empty. Run 'instantly leads sync' first.")
+        raise typer.Exit(code=1)
+    filters = dict(search=search, campaign=campaign, list_id=list_id, ids=_split(ids), contacts=_split(contacts))
+    if all_pages:
+        emit_items(mirror.query(**filters, starting_after=starting_after))
+        return
+
+    page_size = limit or 100
+    items = list(mirror.query(**filters, starting_after=starting_after, limit=page_size))
+    result: dict = {"items": items}
+    if len(items) == page_size:
+        result["next_starting_after"] = items[-1]["id"]
+    emit(result)
+
+
+@leads_app.command()
+def sync(
+    full: bool = typer.Option(False, "--full", help="Re-read every lead to pick up edits and deletions"),
+):
+    """Mirror workspace leads into a local SQLite database for 'leads list --local'."""
+    from instantly.lead_mirror import LeadMirror
+
+    client = get_client()
+    mirror = LeadMirror(client.data_dir / "leads.db")
+    result = mirror.sync(client, full=full)
+    emit(result)
 
 
 @leads_app.command()
@@ -195,22 +263,202 @@ def update(
         print("Error: at least one field to update is required.")
         raise typer.Exit(code=1)
 
-    client = InstantlyClient()
+    client = get_client()
     result = client.patch(f"/api/v2/leads/{id}", json=payload)
-    print(json.dumps(result, indent=2))
+    emit(result)
+
+
+INTEREST_PATH = "/api/v2/leads/update-interest-status"
+PROGRESS_EVERY = 1000  # bulk updates between progress lines on stderr
+
+
+def _interest_value(raw) -> Optional[int]:
+    """An interest value from a CSV cell or JSON field; null (or "null") resets the lead to 'Lead'."""
+    if raw is None or (isinstance(raw, str) and raw.strip().lower() in ("null", "none")):
+        return None
+    if isinstance(raw, bool) or not str(raw).strip().lstrip("-").isdigit():
+        raise ValueError(f"invalid interest_value {raw!r}")
+    return int(raw)
+
+
+def _interest_rows(records, default_campaign: Optional[str]) -> Tuple[dict, dict]:
+    """Collapse input rows to one update per (email, campaign), last row winning.
+
+    Returns the updates keyed by (lower-cased email, campaign) and the counts
+    of rows read, duplicates dropped and invalid rows (reported on stderr).
+    """
+    updates: dict = {}
+    counts = {"rows": 0, "duplicates": 0, "invalid": 0}
+    for number, record in enumerate(records, 1):
+        counts["rows"] += 1
+        email = str(record.get("email") or record.get("lead_email") or "").strip()
+        campaign = record.get("campaign_id") or record.get("campaign") or default_campaign
+        try:
+            if not email:
+                raise ValueError("missing email")
+            if "interest_value" not in record:
+                raise ValueError("missing interest_value")
+            if isinstance(record["interest_value"], str) and not record["interest_value"].strip():
+                raise ValueError("empty interest_value (use null to reset)")
+            value = _interest_value(record["interest_value"])
+        except ValueError as exc:
+            print(f"Row {number} skipped: {exc}", file=sys.stderr)
+            counts["invalid"] += 1
+            continue
+        key = (email.lower(), campaign or None)
+        if key in updates:
+            counts["duplicates"] += 1
+            del updates[key]  # re-inserted below so the order follows the winning row
+        updates[key] = {"email": email, "campaign_id": campaign or None, "interest_value": value}
+    return updates, counts
+
+
+def _open_mirror(client) -> Optional["LeadMirror"]:
+    """The lead mirror if `leads sync` has created one; interest updates are applied to it as they succeed."""
+    from instantly.lead_mirror import LeadMirror
+
+    path = client.data_dir / "leads.db"
+    return LeadMirror(path) if path.exists() else None
+
+
+def _unchanged(updates: dict, mirror: "LeadMirror") -> List[tuple]:
+    """Keys whose leads the mirror already shows at the requested interest value."""
+    current = mirror.interest_statuses(sorted({email for email, _ in updates}))
+    unchanged = []
+    for key, row in updates.items():
+        email, campaign = key
+        matching = [status for lead_campaign, status in current.get(email, []) if campaign in (None, lead_campaign)]
+        if matching and all(status == row["interest_value"] for status in matching):
+            unchanged.append(key)
+    return unchanged
+
+
+def _bulk_update_interest(
+    file: str,
+    campaign_id: Optional[str],
+    extra: dict,
+    workers: int,
+    skip_unchanged: bool,
+    failed_out: Optional[str],
+) -> None:
+    import time
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    from instantly.client import InstantlyError
+    from instantly.readers import read_records
+
+    try:
+        updates, counts = _interest_rows(read_records(None if file == "-" else file), campaign_id)
+    except FileNotFoundError as exc:
+        print(f"Error: {exc}")
+        raise typer.Exit(code=1)
+    except (ValueError, UnicodeDecodeError, EOFError) as exc:
+        print(f"Error: invalid input ({exc}).")
+        raise typer.Exit(code=1)
+
+    client = get_client(pool_size=workers)
+    counts["unchanged"] = 0
+    mirror = _open_mirror(client)
+    if skip_unchanged and mirror is not None:
+        if mirror.synced:
+            for key in _unchanged(updates, mirror):
+                del updates[key]
+                counts["unchanged"] += 1
+
+    def send(row: dict) -> dict:
+        payload = {"lead_email": row["email"], "interest_value": row["interest_value"], **extra}
+        if row["campaign_id"]:
+            payload["campaign_id"] = row["campaign_id"]
+        return client.post(INTEREST_PATH, json=payload)
+
+    failures = []
+    updated = 0
+    pending: dict = {}
+    started = time.monotonic()
+
+    def drain() -> None:
+        nonlocal updated
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            row = pending.pop(future)
+            try:
+                future.result()
+            except InstantlyError as exc:
+                print(f"{row['email']} failed: {exc}", file=sys.stderr)
+                failures.append({**row, "error": str(exc)})
+                continue
+            updated += 1
+            if mirror is not None:
+                mirror.set_interest_status(row["email"], row["campaign_id"], row["interest_value"])
+            if updated % PROGRESS_EVERY == 0:
+                rate = updated / max(time.monotonic() - started, 1e-9)
+                print(f"{updated}/{len(updates)} updated ({rate:.1f}/s).", file=sys.stderr)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for row in updates.values():
+            pending[pool.submit(send, row)] = row
+            if len(pending) >= workers * 2:
+                drain()
+        while pending:
+            drain()
+    elapsed = time.monotonic() - started
+
+    if failed_out and failures:
+        with open(failed_out, "w", encoding="utf-8") as f:
+            for row in failures:
+                f.write(json.dumps(row) + "\n")
+    emit({
+        **counts,
+        "updated": updated,
+        "failed": len(failures),
+        "seconds": round(elapsed, 2),
+        "per_second": round(updated / elapsed, 1) if elapsed else None,
+    })
+    if failures or counts["invalid"]:
+        hint = f" Failed rows were written to {failed_out}; pass it back with --file to retry." if failed_out and failures else ""
+        print(f"Error: {len(failures)} update(s) failed and {counts['invalid']} row(s) were invalid.{hint}")
+        raise typer.Exit(code=1)
 
 
 @leads_app.command("update-interest")
 def update_interest(
-    lead_email: str = typer.Option(..., help="Email of the lead to update"),
+    lead_email: Optional[str] = typer.Option(None, help="Email of the lead to update"),
     interest_value: Optional[int] = typer.Option(None, help="Interest status value (null resets to 'Lead')"),
     reset_interest: bool = typer.Option(False, help="Reset interest to null (moves lead to 'Lead' status)"),
-    campaign_id: Optional[str] = typer.Option(None, help="Campaign UUID"),
+    campaign_id: Optional[str] = typer.Option(None, help="Campaign UUID (with --file: for rows without one)"),
     ai_interest_value: Optional[int] = typer.Option(None, help="AI interest value"),
     disable_auto_interest: Optional[bool] = typer.Option(None, help="Disable auto interest"),
     list_id: Optional[str] = typer.Option(None, help="List UUID"),
+    file: Optional[str] = typer.Option(
+        None, help="Bulk mode: CSV/NDJSON rows of email,interest_value[,campaign_id] (\"-\" reads stdin)",
+    ),
+    workers: int = typer.Option(8, help="Bulk mode: updates sent concurrently", min=1, max=32),
+    skip_unchanged: bool = typer.Option(
+        False,
+        help="Bulk mode: skip leads the local mirror already shows at that value. Only as current as the last "
+        "'leads sync --full' and this CLI's own updates; changes made elsewhere are not seen",
+    ),
+    failed_out: Optional[str] = typer.Option(None, help="Bulk mode: write failed rows here as NDJSON for a retry"),
 ):
-    """Update the interest status of a lead."""
+    """Update the interest status of a lead, or of many leads from a file."""
+    extra: dict = {}
+    if ai_interest_value is not None:
+        extra["ai_interest_value"] = ai_interest_value
+    if disable_auto_interest is not None:
+        extra["disable_auto_interest"] = disable_auto_interest
+    if list_id is not None:
+        extra["list_id"] = list_id
+
+    if file is not None:
+        if lead_email is not None or interest_value is not None or reset_interest:
+            print("Error: with --file, emails and interest values come from the file.")
+            raise typer.Exit(code=1)
+        _bulk_update_interest(file, campaign_id, extra, workers, skip_unchanged, failed_out)
+        return
+    if lead_email is None:
+        print("Error: provide --lead-email, or --file for bulk updates.")
+        raise typer.Exit(code=1)
+
     payload: dict = {
         "lead_email": lead_email,
     }
@@ -224,13 +472,11 @@ def update_interest(
 
     if campaign_id is not None:
         payload["campaign_id"] = campaign_id
-    if ai_interest_value is not None:
-        payload["ai_interest_value"] = ai_interest_value
-    if disable_auto_interest is not None:
-        payload["disable_auto_interest"] = disable_auto_interest
-    if list_id is not None:
-        payload["list_id"] = list_id
+    payload.update(extra)
 
-    client = InstantlyClient()
-    result = client.post("/api/v2/leads/update-interest-status", json=payload)
-    print(json.dumps(result, indent=2))
+    client = get_client()
+    result = client.post(INTEREST_PATH, json=payload)
+    mirror = _open_mirror(client)
+    if mirror is not None:
+        mirror.set_interest_status(lead_email, campaign_id, payload["interest_value"])
+    emit(result)
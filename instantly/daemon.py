@@ -0,0 +1,163 @@
+"""`instantly serve`: a long-running process that keeps one warm client per workspace behind a Unix socket.
+
+CLI invocations forward their API calls to the daemon when its socket
+exists, so they skip importing the HTTP stack, reading config and the TLS
+handshake; the daemon's pooled session, rate limiter, circuit breaker and
+response cache are shared by every caller. The protocol is one JSON object
+per line in each direction:
+
+    -> {"method": "GET", "path": "/api/v2/emails", "params": {...}, "json": null,
+        "idempotent": null, "cache": null, "refresh": false}
+    <- {"result": {...}}  or  {"error": {"type": "APIError", "status": 429, "text": "..."}}
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+from pathlib import Path
+
+SOCKET_NAME = "daemon.sock"
+CONNECT_TIMEOUT = 1.0
+
+
+class DaemonUnavailable(Exception):
+    """The socket exists but nothing accepts connections on it (e.g. the daemon was killed)."""
+
+
+def forward(socket_path: Path, payload: dict) -> dict:
+    """Send one request to the daemon and return its reply object."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        try:
+            sock.connect(str(socket_path))
+        except OSError as exc:
+            raise DaemonUnavailable(str(exc)) from exc
+        # Requests can legitimately wait a long time on the rate limiter
+        sock.settimeout(None)
+        sock.sendall(json.dumps(payload).encode() + b"\n")
+        line = sock.makefile("rb").readline()
+    finally:
+        sock.close()
+    if not line:
+        from instantly.client import InstantlyError
+
+        # The request may already have been sent to the API, so it is not retried directly
+        raise InstantlyError(f"Error: the daemon at {socket_path} exited before replying")
+    return json.loads(line)
+
+
+def encode_error(exc: Exception) -> dict:
+    from instantly.client import APIError
+
+    if isinstance(exc, APIError):
+        return {"type": "APIError", "status": exc.status, "text": exc.text}
+    return {"type": type(exc).__name__, "message": str(exc)}
+
+
+def decode_error(error: dict) -> Exception:
+    from instantly.client import APIError, CircuitOpenError, InstantlyError
+
+    if error.get("type") == "APIError":
+        return APIError(error["status"], error["text"])
+    if error.get("type") == "CircuitOpenError":
+        return CircuitOpenError(error["message"])
+    return InstantlyError(error.get("message", "Error: daemon request failed"))
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            with self.server.lock:
+                self.server.in_flight += 1
+            try:
+                call = json.loads(line)
+                result = self.server.client.request(
+                    call["method"],
+                    call["path"],
+                    params=call.get("params"),
+                    json=call.get("json"),
+                    idempotent=call.get("idempotent"),
+                    cache_reads=call.get("cache"),
+                    refresh=call.get("refresh", False),
+                )
+                reply = {"result": result}
+            except Exception as exc:  # every failure goes back to the caller, never kills the daemon
+                reply = {"error": encode_error(exc)}
+            finally:
+                with self.server.lock:
+                    self.server.in_flight -= 1
+                    self.server.last_active = time.monotonic()
+            self.wfile.write(json.dumps(reply).encode() + b"\n")
+            self.wfile.flush()
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def _already_running(socket_path: Path) -> bool:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(str(socket_path))
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+def serve(pool_size: int = 20, idle_timeout: float = 0) -> None:
+    """Run the daemon for the configured workspace until interrupted (or idle for idle_timeout seconds)."""
+    from instantly.client import InstantlyClient, InstantlyError
+
+    client = InstantlyClient(pool_size=pool_size, daemon=True)
+    socket_path = client.data_dir / SOCKET_NAME
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    if socket_path.exists():
+        if _already_running(socket_path):
+            raise InstantlyError(f"Error: a daemon is already serving {socket_path}")
+        socket_path.unlink()  # left behind by a daemon that did not exit cleanly
+
+    # The socket carries the workspace's API access: only the owner may connect
+    umask = os.umask(0o177)
+    try:
+        server = _Server(str(socket_path), _Handler)
+    finally:
+        os.umask(umask)
+    server.client = client
+    server.lock = threading.Lock()
+    server.in_flight = 0
+    server.last_active = time.monotonic()
+
+    def stop(*_):
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    if idle_timeout > 0:
+        def watch_idle():
+            while server.in_flight or time.monotonic() - server.last_active < idle_timeout:
+                time.sleep(min(idle_timeout, 1.0))
+            stop()
+
+        threading.Thread(target=watch_idle, daemon=True).start()
+
+    print(f"Serving on {socket_path} (Ctrl-C to stop)", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        try:
+            socket_path.unlink()
+        except FileNotFoundError:
+            pass
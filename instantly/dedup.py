@@ -0,0 +1,227 @@
+"""Pre-flight stage for `campaigns add-leads`: normalize emails, drop duplicates and leads already known locally.
+
+Emails are trimmed and lower-cased before upload. Duplicates within the
+input are found on a dedupe key: the normalized email, with any +tag cut
+from the local part when plus-address stripping is on. The seen-set is
+exact by default; a Bloom filter bounds memory on very large inputs, at
+the cost of rarely dropping a unique lead as a duplicate.
+
+The known-email index (emails.db next to the lead mirror) is used only
+with --skip-known. It records the leads an import confirmed as uploaded,
+plus the emails in the lead mirror when it has been synced. Entries expire
+after KNOWN_TTL_DAYS (config dedupe.known_ttl_days) unless seen again, so
+leads deleted upstream are eventually forgotten. Mirror entries missing
+from a fully synced mirror are dropped at once. A resumed import only
+checks against entries added before the first run, so the leads it
+uploaded itself do not shift the batch numbering.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import re
+import threading
+import time
+from collections import Counter
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+
+from instantly.db import LOOKUP_CHUNK, META_SCHEMA, connect, get_meta, set_meta, transaction
+
+BLOOM_ERROR_RATE = 0.001
+KNOWN_TTL_DAYS = 30
+
+# One @, no whitespace, and a domain with a dot that neither starts nor ends it
+_EMAIL = re.compile(r"[^@\s]+@[^@\s.][^@\s]*\.[^@\s]*[^@\s.]")
+
+# added_at: first recorded (what a resumed import compares with); seen_at: last confirmed (what expires)
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS emails (
+    email TEXT PRIMARY KEY,
+    plain TEXT NOT NULL,
+    source TEXT NOT NULL,
+    added_at REAL NOT NULL,
+    seen_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS emails_plain ON emails (plain, added_at);
+"""
+
+
+def normalize_email(value) -> Optional[str]:
+    """Trimmed, lower-cased email, or None when the value does not look like one."""
+    if not isinstance(value, str):
+        return None
+    email = value.strip().lower()
+    return email if _EMAIL.fullmatch(email) else None
+
+
+def strip_plus(email: str) -> str:
+    """Drop the +tag of the local part: "jane+news@acme.com" -> "jane@acme.com"."""
+    local, _, domain = email.partition("@")
+    base = local.split("+", 1)[0]
+    return f"{base or local}@{domain}"
+
+
+class BloomFilter:
+    """Fixed-size set membership with false positives but no false negatives."""
+
+    def __init__(self, capacity: int, error_rate: float = BLOOM_ERROR_RATE):
+        bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.size = bits
+        self.hashes = max(1, round(bits / capacity * math.log(2)))
+        self._bits = bytearray((bits + 7) // 8)
+
+    def add(self, key: str) -> bool:
+        """Add key; return True if it was (probably) present already."""
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        # Double hashing: k positions from two 64-bit halves
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        present = True
+        for i in range(self.hashes):
+            position = (first + i * second) % self.size
+            byte, mask = position >> 3, 1 << (position & 7)
+            if not self._bits[byte] & mask:
+                present = False
+                self._bits[byte] |= mask
+        return present
+
+
+class _ExactSet:
+    def __init__(self):
+        self._seen: Set[str] = set()
+
+    def add(self, key: str) -> bool:
+        if key in self._seen:
+            return True
+        self._seen.add(key)
+        return False
+
+
+class EmailIndex:
+    """Emails known to be in the workspace, keyed by normalized email and by its plus-stripped form."""
+
+    def __init__(self, path: Path, ttl_days: float = KNOWN_TTL_DAYS):
+        self._conn = connect(Path(path))
+        self._conn.executescript(META_SCHEMA + _SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(emails)")}
+        if "seen_at" not in columns:
+            # Indexes written before entries could expire
+            self._conn.execute("ALTER TABLE emails ADD COLUMN seen_at REAL NOT NULL DEFAULT 0")
+            self._conn.execute("UPDATE emails SET seen_at = added_at")
+        self.ttl = ttl_days * 86400
+        self._lock = threading.Lock()
+
+    def add(self, emails: Iterable[str], source: str, now: Optional[float] = None) -> None:
+        """Record normalized emails, or confirm them again."""
+        now = time.time() if now is None else now
+        rows = [(email, strip_plus(email), source, now, now) for email in emails]
+        with self._lock, transaction(self._conn):
+            self._conn.executemany(
+                "INSERT INTO emails VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (email) DO UPDATE SET seen_at = excluded.seen_at, source = excluded.source",
+                rows,
+            )
+
+    def import_mirror(self, mirror_path: Path) -> int:
+        """Add the emails of a synced lead mirror, if it changed since the last import; return how many were read."""
+        from instantly.lead_mirror import LeadMirror
+
+        if not Path(mirror_path).exists():
+            return 0
+        mirror = LeadMirror(mirror_path)
+        synced_at = mirror.synced_at
+        if not synced_at or synced_at == get_meta(self._conn, "mirror_synced_at"):
+            return 0
+        started = time.time()
+        read = 0
+        emails = filter(None, (normalize_email(email) for email in mirror.emails()))
+        while True:
+            chunk = list(islice(emails, 10000))
+            if not chunk:
+                break
+            self.add(chunk, "mirror", now=started)
+            read += len(chunk)
+        if mirror.generation != get_meta(self._conn, "mirror_generation"):
+            # A full sync ran since the last import: mirror entries it no longer has were deleted upstream
+            self._conn.execute("DELETE FROM emails WHERE source = 'mirror' AND seen_at < ?", (started,))
+        set_meta(self._conn, mirror_synced_at=synced_at, mirror_generation=mirror.generation)
+        return read
+
+    def known(self, keys: List[str], plain: bool, as_of: float) -> Set[str]:
+        """The subset of keys recorded at or before as_of and not expired; plain keys are compared plus-stripped."""
+        column = "plain" if plain else "email"
+        found: Set[str] = set()
+        for start in range(0, len(keys), LOOKUP_CHUNK):
+            chunk = keys[start:start + LOOKUP_CHUNK]
+            sql = (
+                f"SELECT {column} FROM emails WHERE {column} IN ({', '.join('?' * len(chunk))}) "
+                "AND added_at <= ? AND seen_at >= ?"
+            )
+            found.update(row[0] for row in self._conn.execute(sql, [*chunk, as_of, as_of - self.ttl]))
+        return found
+
+
+def uploaded_emails(batch: List[dict], result: dict) -> List[str]:
+    """Normalized emails of the leads a /leads/add response confirms were uploaded.
+
+    Uses created_leads when the response lists it. Otherwise the whole batch
+    counts, but only if leads_uploaded covers every lead in it: a batch the
+    server partly skipped or rejected does not say which leads made it.
+    """
+    created = result.get("created_leads") if isinstance(result, dict) else None
+    if isinstance(created, list):
+        candidates = [lead.get("email") for lead in created if isinstance(lead, dict)]
+    elif isinstance(result, dict) and result.get("leads_uploaded") == len(batch):
+        candidates = [lead.get("email") for lead in batch]
+    else:
+        return []
+    return [email for email in map(normalize_email, candidates) if email]
+
+
+class Preflight:
+    """Filter a lead stream before upload, counting what was dropped in `skipped` by reason."""
+
+    def __init__(self, strip_plus: bool = False, bloom_capacity: Optional[int] = None,
+                 index: Optional[EmailIndex] = None, as_of: float = 0.0):
+        self.strip_plus = strip_plus
+        self.seen = BloomFilter(bloom_capacity) if bloom_capacity else _ExactSet()
+        self.index = index
+        self.as_of = as_of
+        self.skipped: Counter = Counter()
+
+    def _key(self, email: str) -> str:
+        return strip_plus(email) if self.strip_plus else email
+
+    def _unique(self, leads: Iterable[dict]) -> Iterator[Tuple[str, dict]]:
+        for lead in leads:
+            email = normalize_email(lead.get("email"))
+            if email is None:
+                self.skipped["invalid_email"] += 1
+                continue
+            key = self._key(email)
+            if self.seen.add(key):
+                self.skipped["duplicate_in_file"] += 1
+                continue
+            if lead["email"] != email:
+                lead = {**lead, "email": email}
+            yield key, lead
+
+    def filter(self, leads: Iterable[dict]) -> Iterator[dict]:
+        unique = self._unique(leads)
+        if self.index is None:
+            for _, lead in unique:
+                yield lead
+            return
+        # Look known emails up a chunk at a time rather than one query per lead
+        while True:
+            chunk = list(islice(unique, LOOKUP_CHUNK))
+            if not chunk:
+                return
+            known = self.index.known([key for key, _ in chunk], self.strip_plus, self.as_of)
+            for key, lead in chunk:
+                if key in known:
+                    self.skipped["known_in_workspace"] += 1
+                else:
+                    yield lead
@@ -0,0 +1,175 @@
+"""Time-sharded export for `emails export`: one partition file per timestamp_created window.
+
+The range is cut into windows that are paged independently, so several
+cursors run at once within the shared rate limit. A finished window is
+written to a temporary file, renamed into place and recorded in
+_manifest.json; re-runs skip windows the manifest lists as complete.
+Windows that end in the future are never recorded as complete, since more
+email can still arrive in them.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import re
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterable, Iterator, List, Tuple
+
+from instantly.output import dumps
+
+MANIFEST = "_manifest.json"
+FORMATS = ("jsonl", "parquet")
+
+_DURATION = re.compile(r"^(\d+)([mhdw])$")
+_UNITS = {"m": "minutes", "h": "hours", "d": "days", "w": "weeks"}
+
+
+def parse_duration(spec: str) -> timedelta:
+    """Parse "30m", "6h", "1d" or "2w"."""
+    match = _DURATION.match(spec.strip().lower())
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(f"invalid window {spec!r}, expected e.g. 6h, 1d or 1w")
+    return timedelta(**{_UNITS[match.group(2)]: int(match.group(1))})
+
+
+def parse_timestamp(value: str) -> datetime:
+    """An ISO date or timestamp, taken as UTC when it has no offset."""
+    parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def format_timestamp(moment: datetime) -> str:
+    return moment.astimezone(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def windows(start: datetime, end: datetime, step: timedelta) -> List[Tuple[str, str]]:
+    """Consecutive [start, end) windows covering the range, as API timestamps."""
+    bounds = []
+    while start < end:
+        bounds.append((format_timestamp(start), format_timestamp(min(start + step, end))))
+        start += step
+    return bounds
+
+
+def partition_name(window: Tuple[str, str], fmt: str) -> str:
+    start, end = (re.sub(r"[-:.]", "", stamp) for stamp in window)
+    return f"emails-{start}-{end}." + ("jsonl.gz" if fmt == "jsonl" else "parquet")
+
+
+def in_window(items: Iterable[dict], window: Tuple[str, str]) -> Iterator[dict]:
+    """Drop items outside [start, end): the API's bounds may be inclusive at both ends."""
+    start, end = (parse_timestamp(stamp) for stamp in window)
+    for item in items:
+        created = item.get("timestamp_created")
+        if not created or start <= parse_timestamp(created) < end:
+            yield item
+
+
+class Manifest:
+    """Which windows of an export directory are complete, for which filters, format and window size."""
+
+    def __init__(self, directory: Path, filters: dict, fmt: str, step: timedelta):
+        self.path = Path(directory) / MANIFEST
+        self._lock = threading.Lock()
+        seconds = int(step.total_seconds())
+        try:
+            state = json.loads(self.path.read_text())
+        except FileNotFoundError:
+            state = {"filters": filters, "format": fmt, "window_seconds": seconds, "windows": {}}
+        if "window_seconds" not in state:
+            # Manifests written before the window size was recorded: the longest window is a full one
+            state["window_seconds"] = max(
+                (int((parse_timestamp(w["end"]) - parse_timestamp(w["start"])).total_seconds())
+                 for w in state.get("windows", {}).values()),
+                default=seconds,
+            )
+        if state.get("filters") != filters or state.get("format") != fmt:
+            raise ValueError(f"{self.path} belongs to an export with other filters or format; use another --out")
+        if state["window_seconds"] != seconds:
+            raise ValueError(
+                f"{self.path} belongs to an export with {state['window_seconds']}s windows, not {seconds}s; "
+                "use the same --window or another --out"
+            )
+        self.state = state
+
+    def done(self, name: str) -> bool:
+        window = self.state["windows"].get(name)
+        # Empty Parquet windows are recorded without a file
+        return window is not None and (window["count"] == 0 or (self.path.parent / name).exists())
+
+    def complete(self, name: str, window: Tuple[str, str], count: int) -> None:
+        with self._lock:
+            self.state["windows"][name] = {"start": window[0], "end": window[1], "count": count}
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self.state, indent=2))
+            os.replace(tmp, self.path)
+
+
+def write_jsonl(path: Path, items: Iterable[dict]) -> int:
+    """Stream items into a gzipped JSONL file via a temporary name; return how many were written."""
+    tmp = path.with_name(path.name + ".part")
+    count = 0
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        for item in items:
+            f.write(dumps(item) + "\n")
+            count += 1
+    os.replace(tmp, path)
+    return count
+
+
+# Email fields the API leaves out when unset: typed up front so every shard has them with the same type
+PARQUET_TYPES = {
+    "ue_type": "int64",
+    "i_status": "int64",
+    "is_unread": "int64",
+    "is_auto_reply": "int64",
+    "ai_interest_value": "float64",
+    "reminder_ts": "string",
+}
+
+
+def _parquet_table(pa, rows: List[dict]):
+    """A table with a column for every key of any row (missing values are null), not only those of the first."""
+    keys = [key for key in dict.fromkeys(key for row in rows for key in row) if key not in PARQUET_TYPES]
+    keys += PARQUET_TYPES  # last, in a fixed order
+    fields, columns = [], []
+    for key in keys:
+        values = [row.get(key) for row in rows]
+        column = None
+        if key in PARQUET_TYPES:
+            try:
+                column = pa.array(values, type=getattr(pa, PARQUET_TYPES[key])())
+            except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+                pass  # not the type the API documents: keep what the data says
+        if column is None:
+            try:
+                column = pa.array(values)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                # Mixed types across rows: store the column as text
+                column = pa.array([v if v is None or isinstance(v, str) else dumps(v) for v in values])
+            if pa.types.is_null(column.type):
+                column = column.cast(pa.string())
+        fields.append(pa.field(key, column.type))
+        columns.append(column)
+    return pa.Table.from_arrays(columns, schema=pa.schema(fields))
+
+
+def write_parquet(path: Path, items: Iterable[dict]) -> int:
+    """Write items as one Parquet file; nested values (body, to/cc lists, ...) are stored as JSON strings."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    rows = [
+        {key: dumps(value) if isinstance(value, (dict, list)) else value for key, value in item.items()}
+        for item in items
+    ]
+    if not rows:
+        return 0
+    tmp = path.with_name(path.name + ".part")
+    pq.write_table(_parquet_table(pa, rows), tmp, compression="zstd")
+    os.replace(tmp, path)
+    return len(rows)
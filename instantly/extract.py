@@ -0,0 +1,124 @@
+"""Body previews for `emails list --brief`: the lead's own words, without quoted replies, signatures or HTML."""
+
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from html.parser import HTMLParser
+
+PREVIEW_LIMIT = 500
+
+# Raw characters past the scanned window that may still complete a boundary match
+# starting inside it ("On <date>, <name> <address> wrote:" spans lines)
+_LOOKAHEAD = 400
+
+# One alternation for every reply/quote/signature boundary, so the body is scanned once.
+# Each alternative must start at a line break, as the old per-marker search did.
+_BOUNDARY = r"""
+    \n[ \t]*(?:
+        >                                           # quoted line
+      | -{3,}                                       # "---" separators, -----Original Message-----
+      | --[ \t]*(?:\r?\n|$)                         # "-- " signature delimiter
+      | _{3,}                                       # Outlook rule above the header block
+      | (?:From|De|Von|Da|Van|Fra|Från|Od)[ \t]?:  # Outlook header block, localised
+      | On[ \t].{0,300}?\bwrote\b                   # English
+      | Le[ \t].{0,300}?a[ \t]écrit                 # French
+      | Am[ \t].{0,300}?schrieb                     # German
+      | El[ \t].{0,300}?escribió                    # Spanish
+      | Il[ \t].{0,300}?ha[ \t]scritto              # Italian
+      | Em[ \t].{0,300}?escreveu                    # Portuguese
+      | Op[ \t].{0,300}?schreef                     # Dutch
+      | Den[ \t].{0,300}?skrev                      # Swedish / Danish / Norwegian
+      | Sent[ \t]from[ \t]my                        # mobile signatures
+    )
+"""
+
+
+@lru_cache(maxsize=None)
+def _boundary() -> re.Pattern:
+    # Compiled on first use: it takes longer than the rest of CLI startup together
+    return re.compile(_BOUNDARY, re.VERBOSE | re.DOTALL)
+
+
+_SKIP_TAGS = {"head", "style", "script", "title"}
+_BLOCK_TAGS = {"p", "div", "br", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6", "table", "ul", "ol", "hr"}
+# Containers mail clients wrap quoted history in; nothing after them belongs to the reply
+_QUOTE_MARKERS = ("gmail_quote", "yahoo_quoted", "divrplyfwdmsg", "appendonsend", "moz-cite-prefix")
+
+
+class _TextExtractor(HTMLParser):
+    """Streaming HTML-to-text conversion that stops at the first quoted-history container."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: list = []
+        self.length = 0
+        self.done = False
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "blockquote" or any(
+            marker in (value or "").lower() for name, value in attrs if name in ("class", "id") for marker in _QUOTE_MARKERS
+        ):
+            self.done = True
+        elif tag in _SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in _BLOCK_TAGS:
+            self._append("\n")
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in _BLOCK_TAGS:
+            self._append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag in _BLOCK_TAGS:
+            self._append("\n")
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self._append(data)
+
+    def _append(self, text: str) -> None:
+        if not self.done:
+            self.parts.append(text)
+            self.length += len(text)
+
+
+def html_to_text(html: str, limit: int = PREVIEW_LIMIT, chunk_size: int = 4096) -> str:
+    """Convert HTML to text, stopping at quoted history or once enough text for a preview is collected."""
+    parser = _TextExtractor()
+    budget = (limit + _LOOKAHEAD) * 4
+    for start in range(0, len(html), chunk_size):
+        parser.feed(html[start:start + chunk_size])
+        if parser.done or parser.length >= budget:
+            break
+    return "".join(parser.parts)
+
+
+def strip_reply(text: str, limit: int = PREVIEW_LIMIT) -> str:
+    """Return the whitespace-collapsed text before the first reply boundary, at most `limit` characters.
+
+    Only a window large enough to fill the preview is scanned (growing it
+    for whitespace-heavy bodies), so the cost does not depend on how long
+    the quoted thread below the reply is.
+    """
+    window = limit * 8
+    while True:
+        end = min(len(text), window)
+        boundary = _boundary().search(text, 1, min(len(text), end + _LOOKAHEAD))
+        if boundary is not None and boundary.start() < end:
+            return " ".join(text[:boundary.start()].split())[:limit]
+        collapsed = " ".join(text[:end].split())
+        if len(collapsed) > limit or end == len(text):
+            return collapsed[:limit]
+        window *= 4
+
+
+def preview(body: dict, limit: int = PREVIEW_LIMIT) -> str:
+    """Preview an email body, falling back to its HTML part when there is no plain text."""
+    text = body.get("text") or ""
+    if not text.strip() and body.get("html"):
+        text = html_to_text(body["html"], limit)
+    return strip_reply(text, limit)
@@ -0,0 +1,277 @@
+"""Local SQLite mirror of workspace leads with a full-text index for offline `leads list --local`."""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from instantly.db import LOOKUP_CHUNK, META_SCHEMA, connect, get_meta, set_meta, transaction
+
+PAGE_SIZE = 100
+FTS_COLUMNS = ("email", "first_name", "last_name", "company_name")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS leads (
+    id TEXT PRIMARY KEY,
+    email TEXT NOT NULL DEFAULT '',
+    first_name TEXT NOT NULL DEFAULT '',
+    last_name TEXT NOT NULL DEFAULT '',
+    company_name TEXT NOT NULL DEFAULT '',
+    campaign TEXT,
+    list_id TEXT,
+    lt_interest_status INTEGER,
+    timestamp_created TEXT NOT NULL DEFAULT '',
+    timestamp_updated TEXT NOT NULL DEFAULT '',
+    generation INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS leads_email ON leads (email COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS leads_campaign ON leads (campaign);
+CREATE INDEX IF NOT EXISTS leads_list ON leads (list_id);
+CREATE INDEX IF NOT EXISTS leads_interest ON leads (lt_interest_status);
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS leads_fts USING fts5(
+    email, first_name, last_name, company_name, content='leads', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS leads_ai AFTER INSERT ON leads BEGIN
+    INSERT INTO leads_fts (rowid, email, first_name, last_name, company_name)
+    VALUES (new.rowid, new.email, new.first_name, new.last_name, new.company_name);
+END;
+CREATE TRIGGER IF NOT EXISTS leads_ad AFTER DELETE ON leads BEGIN
+    INSERT INTO leads_fts (leads_fts, rowid, email, first_name, last_name, company_name)
+    VALUES ('delete', old.rowid, old.email, old.first_name, old.last_name, old.company_name);
+END;
+CREATE TRIGGER IF NOT EXISTS leads_au AFTER UPDATE ON leads BEGIN
+    INSERT INTO leads_fts (leads_fts, rowid, email, first_name, last_name, company_name)
+    VALUES ('delete', old.rowid, old.email, old.first_name, old.last_name, old.company_name);
+    INSERT INTO leads_fts (rowid, email, first_name, last_name, company_name)
+    VALUES (new.rowid, new.email, new.first_name, new.last_name, new.company_name);
+END;
+"""
+
+_UPSERT = """
+INSERT INTO leads (id, email, first_name, last_name, company_name, campaign, list_id,
+                   lt_interest_status, timestamp_created, timestamp_updated, generation, data)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET
+    email = excluded.email,
+    first_name = excluded.first_name,
+    last_name = excluded.last_name,
+    company_name = excluded.company_name,
+    campaign = excluded.campaign,
+    list_id = excluded.list_id,
+    lt_interest_status = excluded.lt_interest_status,
+    timestamp_created = excluded.timestamp_created,
+    timestamp_updated = excluded.timestamp_updated,
+    generation = excluded.generation,
+    data = excluded.data
+"""
+
+
+def _fts_query(search: str) -> str:
+    # Every term must match as a prefix; quoting keeps @ and . from being FTS syntax
+    terms = search.split()
+    return " ".join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+
+
+class LeadMirror:
+    """Leads mirrored from /api/v2/leads/list, indexed by campaign, list, interest status and full text.
+
+    A full sync re-reads everything to pick up edits, drops leads deleted
+    upstream, and records the order the API listed leads in. Later syncs
+    only fetch what is new: for newest-first listings they read from the top
+    until passing the timestamp_created watermark (leads created in the same
+    second as the mark are read again, which the upsert absorbs); for
+    oldest-first listings they continue from the last lead seen. When the
+    order could not be told, every sync is a full one.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._conn = connect(self.path)
+        self._conn.executescript(META_SCHEMA + _SCHEMA)
+        try:
+            self._conn.executescript(_FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5: fall back to LIKE scans
+            self.has_fts = False
+
+    def upsert(self, leads: List[dict], generation: Optional[int] = None) -> None:
+        if generation is None:
+            generation = int(get_meta(self._conn, "generation", "0"))
+        self._conn.executemany(
+            _UPSERT,
+            [
+                (
+                    lead["id"],
+                    lead.get("email") or "",
+                    lead.get("first_name") or "",
+                    lead.get("last_name") or "",
+                    lead.get("company_name") or "",
+                    lead.get("campaign"),
+                    lead.get("list_id"),
+                    lead.get("lt_interest_status"),
+                    lead.get("timestamp_created") or "",
+                    lead.get("timestamp_updated") or "",
+                    generation,
+                    json.dumps(lead),
+                )
+                for lead in leads
+            ],
+        )
+
+    def sync(self, client, full: bool = False) -> dict:
+        """Fetch new leads (or all of them with full=True) and return counts for the report."""
+        generation = int(get_meta(self._conn, "generation", "0"))
+        order = get_meta(self._conn, "order")
+        full = full or not self.synced or order not in ("asc", "desc")
+        if full:
+            generation += 1
+            params = None
+        elif order == "asc":
+            params = {"starting_after": get_meta(self._conn, "cursor")}
+        else:
+            params = None
+        watermark = "" if full else get_meta(self._conn, "watermark")
+
+        fetched = 0
+        ascending = descending = True
+        first = last = None
+        # A newest-first incremental sync usually stops on page one: fetch the next only when needed
+        newest_first = order == "desc" and not full
+        pages = client.iter_pages("POST", "/api/v2/leads/list", params=params, page_size=PAGE_SIZE,
+                                  prefetch=not newest_first)
+        for page in pages:
+            items = page.get("items", [])
+            if newest_first:
+                fresh = [lead for lead in items if (lead.get("timestamp_created") or "") >= watermark]
+            else:
+                fresh = items
+            for lead in fresh:
+                created = lead.get("timestamp_created") or ""
+                if last is not None:
+                    ascending = ascending and created >= last
+                    descending = descending and created <= last
+                first = created if first is None else first
+                last = created
+            if fresh:
+                with transaction(self._conn):
+                    self.upsert(fresh, generation)
+                    set_meta(self._conn, cursor=fresh[-1]["id"])
+                fetched += len(fresh)
+            if len(fresh) < len(items):
+                break  # newest-first: the rest is at or below the watermark
+
+        removed = 0
+        values = {"generation": generation, "synced_at": time.time()}
+        if full:
+            # The walk completed: anything not seen in this generation was deleted upstream
+            removed = self._conn.execute("DELETE FROM leads WHERE generation < ?", (generation,)).rowcount
+            if ascending and first is not None and first < last:
+                values["order"] = "asc"
+            elif descending and first is not None and first > last:
+                values["order"] = "desc"
+            else:
+                values["order"] = ""
+        if first is not None:
+            values["watermark"] = max(watermark, first, last)
+        set_meta(self._conn, **values)
+        total = self._conn.execute("SELECT COUNT(*) FROM leads").fetchone()[0]
+        return {"fetched": fetched, "removed": removed, "total": total, "full": full}
+
+    @property
+    def synced(self) -> bool:
+        return bool(get_meta(self._conn, "synced_at"))
+
+    @property
+    def synced_at(self) -> str:
+        return get_meta(self._conn, "synced_at")
+
+    @property
+    def generation(self) -> str:
+        """Bumped by every full sync."""
+        return get_meta(self._conn, "generation", "0")
+
+    def emails(self) -> Iterator[str]:
+        for (email,) in self._conn.execute("SELECT email FROM leads WHERE email != ''"):
+            yield email
+
+    def query(
+        self,
+        search: Optional[str] = None,
+        campaign: Optional[str] = None,
+        list_id: Optional[str] = None,
+        ids: Optional[List[str]] = None,
+        contacts: Optional[List[str]] = None,
+        interest_status: Optional[int] = None,
+        starting_after: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[dict]:
+        """Yield mirrored leads matching every given filter, ordered by lead ID."""
+        clauses = []
+        args: list = []
+        if search:
+            if self.has_fts:
+                clauses.append("rowid IN (SELECT rowid FROM leads_fts WHERE leads_fts MATCH ?)")
+                args.append(_fts_query(search))
+            else:
+                like = " OR ".join(f"{column} LIKE ?" for column in FTS_COLUMNS)
+                clauses.append(f"({like})")
+                args.extend([f"%{search}%"] * len(FTS_COLUMNS))
+        if campaign is not None:
+            clauses.append("campaign = ?")
+            args.append(campaign)
+        if list_id is not None:
+            clauses.append("list_id = ?")
+            args.append(list_id)
+        # Passed as one JSON array so any number of values stays within SQLite's bound-parameter limit
+        if ids:
+            clauses.append("id IN (SELECT value FROM json_each(?))")
+            args.append(json.dumps(ids))
+        if contacts:
+            clauses.append("email COLLATE NOCASE IN (SELECT value FROM json_each(?))")
+            args.append(json.dumps(contacts))
+        if interest_status is not None:
+            clauses.append("lt_interest_status = ?")
+            args.append(interest_status)
+        if starting_after:
+            clauses.append("id > ?")
+            args.append(starting_after)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = f"SELECT data FROM leads {where} ORDER BY id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(limit)
+        for (data,) in self._conn.execute(sql, args):
+            yield json.loads(data)
+
+    def set_interest_status(self, email: str, campaign: Optional[str], status: Optional[int]) -> None:
+        """Apply an accepted interest update to the mirrored leads of email (in campaign, if given)."""
+        sql = (
+            "UPDATE leads SET lt_interest_status = ?, data = json_set(data, '$.lt_interest_status', ?) "
+            "WHERE email COLLATE NOCASE = ?"
+        )
+        args: list = [status, status, email]
+        if campaign:
+            sql += " AND campaign = ?"
+            args.append(campaign)
+        self._conn.execute(sql, args)
+
+    def interest_statuses(self, emails: List[str]) -> Dict[str, List[Tuple[Optional[str], Optional[int]]]]:
+        """Map each mirrored email (lower-cased) to the (campaign, lt_interest_status) of each of its leads."""
+        found: Dict[str, list] = {}
+        for start in range(0, len(emails), LOOKUP_CHUNK):
+            chunk = emails[start:start + LOOKUP_CHUNK]
+            sql = (
+                "SELECT email, campaign, lt_interest_status FROM leads "
+                f"WHERE email COLLATE NOCASE IN ({', '.join('?' * len(chunk))})"
+            )
+            for email, campaign, status in self._conn.execute(sql, chunk):
+                found.setdefault(email.lower(), []).append((campaign, status))
+        return found
@@ -0,0 +1,230 @@
+"""Output formatting shared by every command: JSON, NDJSON, CSV or a text table, with --fields projection.
+
+Commands hand their result to emit(), or an iterator of items to
+emit_items(), instead of printing JSON themselves. Items are written as
+they arrive, so streaming commands never hold the full output in memory.
+orjson is used for encoding when it is installed.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import sys
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Iterable, List, Optional, Tuple
+
+FORMATS = ("json", "ndjson", "csv", "table")
+
+# Set once per process by the global --output/--fields options (see cli.global_options)
+settings: dict = {"output": None, "fields": None}
+
+TABLE_SAMPLE = 100  # rows used to size table columns before the rest are streamed
+TABLE_MAX_WIDTH = 40
+
+
+@lru_cache(maxsize=None)
+def _orjson():
+    """The orjson module, or None; imported on first use so parsing and --help don't pay for it."""
+    try:
+        import orjson
+    except ImportError:  # optional speed-up
+        return None
+    return orjson
+
+
+def dumps(value: Any, pretty: bool = False) -> str:
+    """Encode value as JSON, with orjson when available (non-ASCII is written as-is)."""
+    orjson = _orjson()
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_INDENT_2 if pretty else 0).decode()
+        except TypeError:
+            pass  # e.g. integers wider than 64 bits: let the stdlib handle it
+    return json.dumps(value, indent=2 if pretty else None, ensure_ascii=False)
+
+
+def _write_json(value: Any, pretty: bool) -> None:
+    if _orjson() is not None:
+        sys.stdout.write(dumps(value, pretty) + "\n")
+        return
+    # The stdlib encoder can write in chunks instead of building one large string
+    json.dump(value, sys.stdout, indent=2 if pretty else None, ensure_ascii=False)
+    sys.stdout.write("\n")
+
+
+def parse_fields(spec: Optional[str]) -> Optional[List[Tuple[str, Tuple[str, ...]]]]:
+    """Parse "id,subject,from=from_address_email,body.text" into (output name, key path) pairs."""
+    if not spec:
+        return None
+    fields = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, path = part.partition("=")
+        name = name.strip()
+        fields.append((name, tuple((path.strip() or name).split("."))))
+    return fields or None
+
+
+def _lookup(item: Any, path: Tuple[str, ...]) -> Any:
+    for key in path:
+        if isinstance(item, dict):
+            item = item.get(key)
+        elif isinstance(item, list) and key.isdigit() and int(key) < len(item):
+            item = item[int(key)]
+        else:
+            return None
+    return item
+
+
+def project(item: Any, fields: Optional[list] = None) -> Any:
+    """Keep only the selected fields of an item (all of it when no --fields were given)."""
+    fields = fields if fields is not None else settings["fields"]
+    if not fields or not isinstance(item, dict):
+        return item
+    return {name: _lookup(item, path) for name, path in fields}
+
+
+def _split_result(result: Any) -> Tuple[list, dict]:
+    """Separate a list response into its items and the remaining keys (e.g. next_starting_after)."""
+    if isinstance(result, dict) and isinstance(result.get("items"), list):
+        return result["items"], {k: v for k, v in result.items() if k != "items"}
+    if isinstance(result, list):
+        return result, {}
+    return [result], {}
+
+
+def emit(result: Any, compact: bool = False) -> None:
+    """Write a command's result in the selected format (pretty JSON by default, one line if compact)."""
+    fmt = settings["output"] or "json"
+    if fmt == "json":
+        if settings["fields"]:
+            items, rest = _split_result(result)
+            projected = [project(item) for item in items]
+            if isinstance(result, dict) and isinstance(result.get("items"), list):
+                result = {"items": projected, **rest}
+            else:
+                result = projected if isinstance(result, list) else projected[0]
+        _write_json(result, pretty=not compact)
+        return
+    items, rest = _split_result(result)
+    emit_items(items, trailer=rest or None)
+
+
+def emit_items(
+    items: Iterable[Any],
+    default: str = "ndjson",
+    trailer: Optional[dict] = None,
+    fmt: Optional[str] = None,
+    fields: Optional[list] = None,
+) -> None:
+    """Stream items in the selected format; NDJSON unless --output says otherwise.
+
+    trailer holds keys that belong to the listing rather than to any item,
+    such as next_starting_after. NDJSON writes it as a final line, JSON as
+    keys next to "items", and CSV/table (which have no place for it) on stderr.
+    fmt and fields override --output and --fields.
+    """
+    fmt = fmt or settings["output"] or default
+    fields = fields if fields is not None else settings["fields"]
+    rows = (project(item, fields) for item in items)
+    if fmt == "ndjson":
+        for row in rows:
+            sys.stdout.write(dumps(row) + "\n")
+        if trailer:
+            sys.stdout.write(dumps(trailer) + "\n")
+    elif fmt == "json":
+        _write_json_array(rows, trailer)
+    else:
+        columns = [name for name, _ in fields] if fields else None
+        if fmt == "csv":
+            _write_csv(rows, columns)
+        else:
+            _write_table(rows, columns)
+        if trailer:
+            print(dumps(trailer), file=sys.stderr)
+
+
+def _write_json_array(rows: Iterable[Any], trailer: Optional[dict]) -> None:
+    out = sys.stdout
+    indent = "    " if trailer else "  "
+    out.write('{\n  "items": [' if trailer else "[")
+    first = True
+    for row in rows:
+        out.write("\n" if first else ",\n")
+        out.write(indent + dumps(row, pretty=True).replace("\n", "\n" + indent))
+        first = False
+    if trailer:
+        out.write("\n  ]" if not first else "]")
+        for key, value in trailer.items():
+            out.write(",\n  " + dumps(key) + ": " + dumps(value, pretty=True).replace("\n", "\n  "))
+        out.write("\n}\n")
+    else:
+        out.write("\n]\n" if not first else "]\n")
+
+
+def _columns(first: Any) -> List[str]:
+    return list(first) if isinstance(first, dict) else ["value"]
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return dumps(value)
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def _values(row: Any, columns: List[str]) -> List[str]:
+    if not isinstance(row, dict):
+        row = {"value": row}
+    return [_cell(row.get(column)) for column in columns]
+
+
+def _write_csv(rows: Iterable[Any], columns: Optional[List[str]] = None) -> None:
+    """CSV with columns from --fields, or from the first row's keys; nested values are JSON-encoded."""
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        return
+    columns = columns or _columns(first)
+    writer = csv.writer(sys.stdout, lineterminator="\n")
+    writer.writerow(columns)
+    writer.writerow(_values(first, columns))
+    for row in rows:
+        writer.writerow(_values(row, columns))
+
+
+def _write_table(rows: Iterable[Any], columns: Optional[List[str]] = None) -> None:
+    """Aligned columns sized from the first TABLE_SAMPLE rows; later rows are streamed and clipped to fit."""
+    rows = iter(rows)
+    sample = list(islice(rows, TABLE_SAMPLE))
+    if not sample:
+        return
+    columns = columns or _columns(sample[0])
+    widths = [min(len(column), TABLE_MAX_WIDTH) for column in columns]
+    sampled = [_values(row, columns) for row in sample]
+    for values in sampled:
+        widths = [min(max(w, len(v)), TABLE_MAX_WIDTH) for w, v in zip(widths, values)]
+
+    def line(values: List[str]) -> str:
+        cells = []
+        for value, width in zip(values, widths):
+            value = value.replace("\n", " ")
+            if len(value) > width:
+                value = value[: width - 1] + "…"
+            cells.append(value.ljust(width))
+        return "  ".join(cells).rstrip() + "\n"
+
+    out = sys.stdout
+    out.write(line(columns))
+    out.write(line(["-" * w for w in widths]))
+    for values in sampled:
+        out.write(line(values))
+    for row in rows:
+        out.write(line(_values(row, columns)))
@@ -0,0 +1,183 @@
+"""Token-bucket rate limiting shared between processes through a lock-protected state file.
+
+Each rule maps an endpoint key such as ``"GET /api/v2/emails"`` (or ``"*"``
+for every request) to a rate like ``"20/60"`` (20 requests per 60 seconds)
+or ``"10/1/5"`` (10 per second with bursts of up to 5). Without a burst a
+bucket holds ``count`` tokens, so ``"10/1"`` lets ten concurrent requests
+start at once and then refills at ten per second. A request takes one
+token from every bucket whose rule matches its key. Bucket levels live in a
+JSON file guarded by an flock, so concurrent CLI invocations against the same
+workspace draw from one budget instead of each assuming they own it.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Mapping, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+DEFAULT_RATE_LIMITS = {
+    "*": "10/1",
+    "GET /api/v2/emails": "20/60",
+}
+
+
+class Rate:
+    def __init__(self, count: int, period: float, burst: Optional[int] = None):
+        if count <= 0 or period <= 0 or (burst is not None and burst <= 0):
+            raise ValueError("rate count, period and burst must be positive")
+        self.count = count
+        self.period = period
+        self.burst = count if burst is None else burst
+
+    @classmethod
+    def parse(cls, spec: str) -> "Rate":
+        """Parse "count/period[/burst]", e.g. "20/60" or "10/1/5"; the burst defaults to count."""
+        parts = str(spec).split("/")
+        if len(parts) not in (2, 3):
+            raise ValueError(f"invalid rate {spec!r}, expected count/period[/burst]")
+        burst = int(parts[2]) if len(parts) == 3 else None
+        return cls(int(parts[0]), float(parts[1]), burst)
+
+    @property
+    def per_second(self) -> float:
+        return self.count / self.period
+
+
+def _parse_retry_after(value: str, now: float) -> Optional[float]:
+    try:
+        return now + float(value)
+    except ValueError:
+        pass
+    from email.utils import parsedate_to_datetime  # rarely needed and slow to import
+
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def blocked_until_from_headers(status: int, headers: Mapping[str, str], now: float) -> Optional[float]:
+    """Work out until when the server wants us to hold off, from Retry-After and X-RateLimit-* headers."""
+    retry_after = headers.get("Retry-After")
+    if retry_after:
+        until = _parse_retry_after(retry_after, now)
+        if until is not None:
+            return until
+
+    remaining = headers.get("X-RateLimit-Remaining")
+    reset = headers.get("X-RateLimit-Reset")
+    if remaining is not None and reset is not None:
+        try:
+            if int(float(remaining)) <= 0:
+                reset_value = float(reset)
+                # Servers send either an epoch timestamp or seconds until reset
+                return reset_value if reset_value > 1e9 else now + reset_value
+        except ValueError:
+            pass
+
+    if status == 429:
+        return now + 1.0
+    return None
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        state_file: Path,
+        rules: Mapping[str, str | Rate | None] | None = None,
+        defaults: Mapping[str, str] = DEFAULT_RATE_LIMITS,
+    ):
+        self.state_file = Path(state_file)
+        self.lock_file = self.state_file.with_suffix(".lock")
+        merged = dict(defaults)
+        merged.update(rules or {})
+        # A rule set to None in the config disables it
+        self.rules = {
+            pattern: spec if isinstance(spec, Rate) else Rate.parse(spec)
+            for pattern, spec in merged.items()
+            if spec is not None
+        }
+        self._thread_lock = threading.Lock()
+
+    def buckets_for(self, key: str) -> list:
+        return [pattern for pattern in self.rules if pattern == "*" or pattern == key]
+
+    @contextmanager
+    def _locked_state(self) -> Iterator[dict]:
+        with self._thread_lock:
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.lock_file, "a") as lock:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_EX)
+                try:
+                    try:
+                        state = json.loads(self.state_file.read_text())
+                    except (FileNotFoundError, ValueError):
+                        state = {}
+                    original = json.dumps(state, sort_keys=True)
+                    yield state
+                    if json.dumps(state, sort_keys=True) != original:
+                        tmp = self.state_file.with_suffix(".tmp")
+                        tmp.write_text(json.dumps(state))
+                        os.replace(tmp, self.state_file)
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def reserve(self, key: str) -> float:
+        """Take a token from every bucket matching key; return 0, or the seconds to wait before retrying."""
+        buckets = self.buckets_for(key)
+        if not buckets:
+            return 0.0
+        with self._locked_state() as state:
+            now = time.time()
+            wait = 0.0
+            levels = {}
+            for name in buckets:
+                rate = self.rules[name]
+                bucket = state.get(name, {})
+                tokens = bucket.get("tokens", rate.burst)
+                elapsed = max(0.0, now - bucket.get("updated", now))
+                tokens = min(rate.burst, tokens + elapsed * rate.per_second)
+                levels[name] = tokens
+                wait = max(wait, bucket.get("blocked_until", 0.0) - now)
+                if tokens < 1:
+                    wait = max(wait, (1 - tokens) / rate.per_second)
+            if wait > 0:
+                return wait
+            for name, tokens in levels.items():
+                state[name] = {"tokens": tokens - 1, "updated": now}
+            return 0.0
+
+    def acquire(self, key: str) -> float:
+        """Block until a request to key is allowed; return the total time spent waiting."""
+        waited = 0.0
+        while True:
+            wait = self.reserve(key)
+            if wait <= 0:
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+    def observe(self, key: str, status: int, headers: Mapping[str, str]) -> None:
+        """Feed a response back so Retry-After / rate-limit headers pause every process sharing the bucket."""
+        now = time.time()
+        until = blocked_until_from_headers(status, headers, now)
+        if until is None or until <= now:
+            return
+        with self._locked_state() as state:
+            for name in self.buckets_for(key):
+                bucket = state.setdefault(name, {"tokens": 0.0, "updated": now})
+                bucket["tokens"] = 0.0
+                bucket["updated"] = now
+                bucket["blocked_until"] = max(bucket.get("blocked_until", 0.0), until)
@@ -0,0 +1,191 @@
+"""Streaming readers for record files (CSV, JSON arrays, NDJSON), optionally gzipped."""
+
+from __future__ import annotations
+
+import csv
+import gzip
+import io
+import json
+import re
+import sys
+from typing import BinaryIO, Iterable, Iterator, Optional, Tuple
+
+CHUNK_SIZE = 64 * 1024
+GZIP_MAGIC = b"\x1f\x8b"
+EXTENSION_FORMATS = {
+    ".csv": "csv",
+    ".json": "json",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+}
+NON_SPACE = re.compile(r"\S")
+
+
+def _open_binary(path: Optional[str]) -> BinaryIO:
+    if not path or path == "-":
+        if sys.stdin.isatty():
+            raise FileNotFoundError("no input file given and nothing piped on stdin")
+        raw = sys.stdin.buffer
+    else:
+        raw = open(path, "rb")
+    stream = raw if isinstance(raw, io.BufferedReader) else io.BufferedReader(raw)
+    # Detect gzip by magic bytes so compressed stdin works too
+    if stream.peek(2)[:2] == GZIP_MAGIC:
+        stream = io.BufferedReader(gzip.GzipFile(fileobj=stream))
+    return stream
+
+
+def _detect_format(path: Optional[str], stream: BinaryIO) -> str:
+    name = (path or "").lower()
+    if name.endswith(".gz"):
+        name = name[:-3]
+    for extension, fmt in EXTENSION_FORMATS.items():
+        if name.endswith(extension):
+            return fmt
+    head = stream.peek(CHUNK_SIZE).lstrip(b"\xef\xbb\xbf \t\r\n")
+    if head.startswith(b"["):
+        return "json"
+    if head.startswith(b"{"):
+        return "ndjson"
+    return "csv"
+
+
+class _TextStream:
+    """A read position over JSON text that arrives in chunks, for the incremental decoders below."""
+
+    def __init__(self, chunks: Iterable[str]):
+        self._chunks = iter(chunks)
+        self._decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+
+    def _more(self) -> bool:
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            return False
+        self.buf, self.pos = self.buf[self.pos:] + chunk, 0
+        return True
+
+    def peek(self) -> str:
+        """The next non-whitespace character, without consuming it ("" at the end of the input)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._more():
+                return ""
+
+    def expect(self, char: str, message: str) -> None:
+        if self.peek() != char:
+            raise json.JSONDecodeError(message, self.buf, self.pos)
+        self.pos += 1
+
+    def value(self, delimiters: str):
+        """Decode the next value once one of the delimiters that may follow it is buffered; "12" may be "12.5"."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buf, self.pos)
+                # Search in place: slicing the rest of the buffer per value is quadratic in its size
+                match = NON_SPACE.search(self.buf, end)
+                following = match.group() if match else ""
+            except json.JSONDecodeError:
+                end, following = None, ""
+            if following and following in delimiters:
+                self.pos = end
+                return value
+            if not self._more():
+                raise json.JSONDecodeError("Unterminated JSON", self.buf, self.pos if end is None else end)
+
+
+def _array_items(stream: _TextStream) -> Iterator:
+    stream.expect("[", "Expected a JSON array")
+    if stream.peek() == "]":
+        stream.pos += 1
+        return
+    while True:
+        yield stream.value(",]")
+        if stream.peek() == ",":
+            stream.pos += 1
+            continue
+        stream.expect("]", "Unterminated JSON array")
+        return
+
+
+def iter_json_array(chunks: Iterable[str]) -> Iterator:
+    """Yield the elements of a JSON array one at a time from a stream of text chunks."""
+    return _array_items(_TextStream(chunks))
+
+
+def iter_list_items(chunks: Iterable[str], meta: Optional[dict] = None) -> Iterator:
+    """Yield the items of a {"items": [...], ...} list response as each one is decoded.
+
+    The other keys (next_starting_after, ...) are stored in meta as they are
+    read; they may come before or after "items". A bare JSON array is
+    streamed the same way.
+    """
+    stream = _TextStream(chunks)
+    meta = {} if meta is None else meta
+    if stream.peek() == "[":
+        yield from _array_items(stream)
+        return
+    stream.expect("{", "Expected a JSON object")
+    if stream.peek() == "}":
+        stream.pos += 1
+        return
+    while True:
+        key = stream.value(":")
+        stream.expect(":", "Expected ':'")
+        if key == "items" and stream.peek() == "[":
+            yield from _array_items(stream)
+        else:
+            meta[key] = stream.value(",}")
+        if stream.peek() == ",":
+            stream.pos += 1
+            continue
+        stream.expect("}", "Unterminated JSON object")
+        return
+
+
+def _iter_ndjson(stream: io.TextIOBase) -> Iterator[dict]:
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def _iter_csv(stream: io.TextIOBase) -> Iterator[dict]:
+    reader = csv.DictReader(stream, restval="")
+    for row in reader:
+        # Values beyond the header row end up under the None key; drop them
+        row.pop(None, None)
+        yield row
+
+
+def _iter_records(stream: io.TextIOBase, fmt: str) -> Iterator[dict]:
+    with stream:
+        if fmt == "csv":
+            yield from _iter_csv(stream)
+        elif fmt == "ndjson":
+            yield from _iter_ndjson(stream)
+        else:
+            yield from iter_json_array(iter(lambda: stream.read(CHUNK_SIZE), ""))
+
+
+def open_records(path: Optional[str]) -> Tuple[str, Iterator[dict]]:
+    """Open a record file (or stdin for None / "-") and return its format and a lazy row iterator.
+
+    The format is taken from the extension (.csv, .json, .ndjson/.jsonl, each
+    optionally .gz) and otherwise sniffed from the first byte. The file is
+    opened immediately so a missing path fails here rather than mid-iteration.
+    """
+    binary = _open_binary(path)
+    fmt = _detect_format(path, binary)
+    text = io.TextIOWrapper(binary, encoding="utf-8-sig", newline="")
+    return fmt, _iter_records(text, fmt)
+
+
+def read_records(path: Optional[str]) -> Iterator[dict]:
+    """Like open_records, for callers that do not care about the format."""
+    return open_records(path)[1]
@@ -0,0 +1,159 @@
+"""Local store of email counts behind `campaigns report`.
+
+Counts of sent and received emails are kept per campaign, sending account,
+interest status and day (of timestamp_created, UTC). Each sync pages
+/api/v2/emails oldest-first from a high-water mark, folds every page into
+the counts, and saves the counts and the moved mark in one transaction. An
+interrupted sync therefore never counts an email twice, and the next run
+reads only what was created after the mark.
+
+An email's interest status is counted as it was when the email was first
+read. Rebuild the store to pick up statuses changed later.
+"""
+
+from __future__ import annotations
+
+import json
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from instantly.db import META_SCHEMA, connect, get_meta, set_meta, transaction
+from instantly.watch import Watermark
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS counts (
+    campaign_id TEXT NOT NULL,
+    eaccount TEXT NOT NULL,
+    i_status TEXT NOT NULL,
+    day TEXT NOT NULL,
+    sent INTEGER NOT NULL DEFAULT 0,
+    received INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (campaign_id, eaccount, i_status, day)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS counts_day ON counts (day);
+"""
+
+_UPSERT = """
+INSERT INTO counts (campaign_id, eaccount, i_status, day, sent, received) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (campaign_id, eaccount, i_status, day) DO UPDATE SET
+    sent = sent + excluded.sent,
+    received = received + excluded.received
+"""
+
+PAGE_SIZE = 100
+GROUPS = {"campaign": "campaign_id", "eaccount": "eaccount", "interest": "i_status", "day": "day"}
+
+# ue_type: 1 sent from a campaign, 2 received, 3 sent manually, 4 scheduled
+_SENT_TYPES = {1, 3}
+_RECEIVED_TYPES = {2}
+
+Key = Tuple[str, str, str, str]
+
+
+def _direction(item: dict) -> Optional[str]:
+    """"sent", "received", or None for emails that are neither (scheduled)."""
+    ue_type = item.get("ue_type")
+    if ue_type in _SENT_TYPES:
+        return "sent"
+    if ue_type in _RECEIVED_TYPES:
+        return "received"
+    if ue_type is not None:
+        return None
+    # Without ue_type, an email is outgoing when it came from the sending account
+    sender = (item.get("from_address_email") or "").lower()
+    return "sent" if sender and sender == (item.get("eaccount") or "").lower() else "received"
+
+
+def aggregate(items: Iterable[dict]) -> Dict[Key, Counter]:
+    """Fold emails into per-(campaign, account, interest status, day) sent/received counts."""
+    counts: Dict[Key, Counter] = {}
+    for item in items:
+        direction = _direction(item)
+        if direction is None:
+            continue
+        status = item.get("i_status")
+        key = (
+            item.get("campaign_id") or "",
+            (item.get("eaccount") or "").lower(),
+            "" if status is None else str(status),
+            (item.get("timestamp_created") or "")[:10],
+        )
+        counts.setdefault(key, Counter())[direction] += 1
+    return counts
+
+
+class ReplyStore:
+    def __init__(self, path: Path):
+        self._conn = connect(Path(path))
+        self._conn.executescript(META_SCHEMA + _SCHEMA)
+
+    @property
+    def covered_from(self) -> str:
+        """Timestamp the counts start at; empty before the first sync."""
+        return get_meta(self._conn, "covered_from")
+
+    def reset(self, since: str) -> None:
+        """Drop all counts and start over from `since`."""
+        with transaction(self._conn):
+            self._conn.execute("DELETE FROM counts")
+            self._conn.execute("DELETE FROM meta")
+            set_meta(self._conn, covered_from=since)
+
+    def sync(self, client) -> int:
+        """Fold every email created since the mark into the counts; return how many were new."""
+        mark = Watermark(since=self.covered_from, state=json.loads(get_meta(self._conn, "mark", "{}")))
+        params = {**mark.begin(), "sort_order": "asc", "limit": PAGE_SIZE}
+        new = 0
+        while True:
+            # Never answer from the response cache: a cached page would hide new emails
+            page = client.request("GET", "/api/v2/emails", params=params, cache_reads=False)
+            items = page.get("items", [])
+            fresh = mark.advance(items)
+            if fresh:
+                self._commit(aggregate(fresh), mark)
+                new += len(fresh)
+            cursor = page.get("next_starting_after")
+            if not cursor or len(items) < PAGE_SIZE:
+                return new
+            params = {**params, "starting_after": cursor}
+
+    def _commit(self, counts: Dict[Key, Counter], mark: Watermark) -> None:
+        with transaction(self._conn):
+            self._conn.executemany(
+                _UPSERT, [(*key, counter["sent"], counter["received"]) for key, counter in counts.items()]
+            )
+            set_meta(self._conn, mark=json.dumps(mark.state()))
+
+    def query(
+        self,
+        group_by: List[str],
+        since_day: str,
+        until_day: Optional[str] = None,
+        campaign_id: Optional[str] = None,
+        eaccount: Optional[str] = None,
+    ) -> List[dict]:
+        """Sent and received totals per group, for days in [since_day, until_day]."""
+        columns = [GROUPS[name] for name in group_by]
+        clauses = ["day >= ?"]
+        args: list = [since_day]
+        if until_day:
+            clauses.append("day <= ?")
+            args.append(until_day)
+        if campaign_id:
+            clauses.append("campaign_id = ?")
+            args.append(campaign_id)
+        if eaccount:
+            clauses.append("eaccount = ?")
+            args.append(eaccount.lower())
+        select = ", ".join(columns + ["SUM(sent)", "SUM(received)"])
+        group = f"GROUP BY {', '.join(columns)} ORDER BY {', '.join(columns)}" if columns else ""
+        sql = f"SELECT {select} FROM counts WHERE {' AND '.join(clauses)} {group}"
+        rows = []
+        for row in self._conn.execute(sql, args):
+            values = dict(zip(columns, row))
+            if "i_status" in values:
+                values["i_status"] = int(values["i_status"]) if values["i_status"] else None
+            values["sent"], values["received"] = row[-2] or 0, row[-1] or 0
+            rows.append(values)
+        return rows
@@ -0,0 +1,137 @@
+"""Reply templates for `emails reply-bulk`: markdown with {{Variable}} placeholders, compiled once per process.
+
+A template is split into literal text and placeholders when it is loaded,
+and its markdown is converted to HTML at the same time, so rendering a row
+only joins strings. Placeholder names are matched loosely: {{First Name}},
+{{first_name}} and {{first-name}} all read the first_name variable.
+"""
+
+from __future__ import annotations
+
+import html
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Mapping, Optional, Tuple
+
+_PLACEHOLDER = re.compile(r"\{\{\s*([^{}]+?)\s*\}\}")
+# Placeholders stand in as \x00<n>\x00 while the markdown is converted, so no markup rule touches them
+_SLOT = re.compile(r"\x00(\d+)\x00")
+_BOLD = re.compile(r"\*\*(.+?)\*\*")
+_URL = re.compile(r"https?://[^\s<\x00]+[^\s<\x00.,;:!?)]")
+_LIST_ITEM = re.compile(r"^\s*[-*]\s+")
+_TEMPLATE_HEADING = re.compile(r"^##\s+Template\s*$", re.MULTILINE | re.IGNORECASE)
+_NEXT_HEADING = re.compile(r"^##?\s", re.MULTILINE)
+
+
+class MissingVariable(ValueError):
+    """A row lacks a value for one of the template's placeholders."""
+
+
+def variable_key(name: str) -> str:
+    """Normalise "First Name" / "first-name" / "first_name" to first_name."""
+    return re.sub(r"[^0-9a-z]+", "_", name.lower()).strip("_")
+
+
+def _inline(text: str) -> str:
+    text = html.escape(text, quote=False)
+    text = _BOLD.sub(r"<strong>\1</strong>", text)
+    return _URL.sub(lambda m: f'<a href="{m.group(0)}">{m.group(0)}</a>', text)
+
+
+def markdown_to_html(text: str) -> str:
+    """The markdown our templates use: paragraphs, line breaks, "-" lists, **bold** and bare links."""
+    blocks = []
+    for block in re.split(r"\n\s*\n", text.strip()):
+        lines = block.splitlines()
+        if all(_LIST_ITEM.match(line) for line in lines):
+            items = "".join(f"<li>{_inline(_LIST_ITEM.sub('', line))}</li>" for line in lines)
+            blocks.append(f"<ul>{items}</ul>")
+        else:
+            blocks.append("<p>" + "<br>".join(_inline(line) for line in lines) + "</p>")
+    return "\n".join(blocks)
+
+
+def _segments(source: str, keys: List[str]) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Split source with \x00<n>\x00 slots into its literal parts and the variable key for each slot."""
+    parts = _SLOT.split(source)
+    return tuple(parts[0::2]), tuple(keys[int(n)] for n in parts[1::2])
+
+
+class Template:
+    """A compiled template: render() fills in the variables of one row."""
+
+    def __init__(self, source: str, name: str = "<string>"):
+        self.name = name
+        keys: List[str] = []
+
+        def slot(match: re.Match) -> str:
+            keys.append(variable_key(match.group(1)))
+            return f"\x00{len(keys) - 1}\x00"
+
+        marked = _PLACEHOLDER.sub(slot, source.strip())
+        self._text = _segments(marked, keys)
+        self._html = _segments(markdown_to_html(marked), keys)
+        self.variables = frozenset(keys)
+
+    @staticmethod
+    def _join(segments: Tuple[Tuple[str, ...], Tuple[str, ...]], values: Mapping[str, str]) -> str:
+        literals, keys = segments
+        out = [literals[0]]
+        for key, literal in zip(keys, literals[1:]):
+            out.append(values[key])
+            out.append(literal)
+        return "".join(out)
+
+    def _values(self, variables: Mapping) -> dict:
+        values = {}
+        for name, value in variables.items():
+            key = variable_key(str(name))
+            if key in self.variables and value not in (None, ""):
+                values[key] = str(value)
+        missing = sorted(self.variables - values.keys())
+        if missing:
+            raise MissingVariable(f"{self.name}: no value for {', '.join(missing)}")
+        return values
+
+    def render_text(self, variables: Mapping) -> str:
+        return self._join(self._text, self._values(variables))
+
+    def render(self, variables: Mapping) -> dict:
+        """The reply body for one row, as {"text", "html"}; raises MissingVariable if a placeholder has no value."""
+        values = self._values(variables)
+        escaped = {key: html.escape(value, quote=False) for key, value in values.items()}
+        return {"text": self._join(self._text, values), "html": self._join(self._html, escaped)}
+
+
+def template_body(document: str) -> str:
+    """The part of a templates/*.md file under "## Template" (the whole file if it has no such heading)."""
+    heading = _TEMPLATE_HEADING.search(document)
+    if not heading:
+        return document
+    rest = document[heading.end():]
+    following = _NEXT_HEADING.search(rest)
+    return rest[: following.start()] if following else rest
+
+
+@lru_cache(maxsize=None)
+def load_template(path: str) -> Template:
+    """Read and compile a template file; each path is compiled once per process."""
+    return Template(template_body(Path(path).read_text(encoding="utf-8")), name=Path(path).name)
+
+
+@lru_cache(maxsize=None)
+def compile_string(source: str) -> Template:
+    """Compile an inline template such as a subject line, once per distinct string."""
+    return Template(source)
+
+
+def find_template(name: str, directory: Optional[str] = None) -> str:
+    """Resolve a template given as a path, or as a name ("pricing_structure") in the templates directory."""
+    candidates = [Path(name)]
+    if directory:
+        candidates += [Path(directory) / name, Path(directory) / f"{name}.md"]
+    for candidate in candidates:
+        if candidate.is_file():
+            return str(candidate.resolve())
+    raise FileNotFoundError(f"template not found: {name}")
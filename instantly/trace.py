@@ -0,0 +1,165 @@
+"""Per-request instrumentation behind the global --trace / --trace-file options.
+
+Every API call made through InstantlyClient produces one span: the
+endpoint template, status, latency, request and response bytes, retries,
+time spent waiting on the rate limiter and the server's rate-limit headers.
+--trace prints a per-endpoint summary on stderr when the process exits;
+--trace-file appends each span to a file as one NDJSON line as it finishes.
+Nothing is recorded, and the client does no extra work, unless one of them
+is given.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import math
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+RATE_LIMIT_HEADERS = ("X-RateLimit-Limit", "X-RateLimit-Remaining", "X-RateLimit-Reset", "Retry-After")
+
+# Set by enable(); the client checks it before building any span
+tracer: Optional["Tracer"] = None
+
+
+class Span:
+    """One logical API call, including its retries."""
+
+    def __init__(self, key: str, source: str = "api"):
+        # key is the client's endpoint key, e.g. "GET /api/v2/emails/{id}"
+        self.method, _, self.endpoint = key.partition(" ")
+        self.start = time.time()
+        self._started = time.perf_counter()
+        self.attempts = 0
+        self.rate_wait = 0.0
+        self.status: Optional[int] = None
+        self.request_bytes = 0
+        self.response_bytes: Optional[int] = None
+        self.rate_limit: Dict[str, str] = {}
+        self.error: Optional[str] = None
+        self.source = source
+
+    def attempt(self, rate_wait: float) -> None:
+        """Count one try at the request, after rate_wait seconds held back by the rate limiter."""
+        self.attempts += 1
+        self.rate_wait += rate_wait
+
+    def response(self, resp, streamed: bool = False) -> None:
+        """Take status, sizes and rate-limit headers from a requests.Response."""
+        self.status = resp.status_code
+        body = resp.request.body if resp.request is not None else None
+        self.request_bytes = len(body) if body else 0
+        if streamed:
+            length = resp.headers.get("Content-Length")
+            self.response_bytes = int(length) if length and length.isdigit() else None
+        else:
+            self.response_bytes = len(resp.content)
+        self.rate_limit = {name: resp.headers[name] for name in RATE_LIMIT_HEADERS if name in resp.headers}
+
+    def failed(self, exc: BaseException) -> None:
+        self.error = str(exc)
+
+    def to_dict(self, latency_ms: float) -> dict:
+        return {
+            "ts": round(self.start, 3),
+            "method": self.method,
+            "endpoint": self.endpoint,
+            "source": self.source,
+            "status": self.status,
+            "latency_ms": round(latency_ms, 2),
+            "rate_wait_ms": round(self.rate_wait * 1000, 2),
+            "retries": max(self.attempts - 1, 0),
+            "request_bytes": self.request_bytes,
+            "response_bytes": self.response_bytes,
+            "rate_limit": self.rate_limit,
+            "error": self.error,
+        }
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+class Tracer:
+    def __init__(self, summary: bool = True, path: Optional[str] = None):
+        self.summary = summary
+        self._lock = threading.Lock()
+        self._spans: List[dict] = []
+        self._file = open(path, "a", encoding="utf-8") if path else None
+
+    def finish(self, span: Span) -> None:
+        record = span.to_dict((time.perf_counter() - span._started) * 1000)
+        with self._lock:
+            if self.summary:
+                self._spans.append(record)
+            if self._file is not None:
+                self._file.write(json.dumps(record) + "\n")
+                self._file.flush()
+
+    def report(self) -> List[dict]:
+        """Per-endpoint rows: calls, errors, latency percentiles, retries, rate-limit waits and bytes."""
+        groups: Dict[str, List[dict]] = {}
+        for record in self._spans:
+            groups.setdefault(f"{record['method']} {record['endpoint']}", []).append(record)
+        rows = []
+        for name, records in sorted(groups.items(), key=lambda item: -len(item[1])):
+            latencies = sorted(record["latency_ms"] for record in records)
+            rows.append({
+                "endpoint": name,
+                "calls": len(records),
+                "errors": sum(1 for record in records if record["error"]),
+                "p50_ms": round(_percentile(latencies, 50), 1),
+                "p95_ms": round(_percentile(latencies, 95), 1),
+                "p99_ms": round(_percentile(latencies, 99), 1),
+                "retries": sum(record["retries"] for record in records),
+                "rate_wait_ms": round(sum(record["rate_wait_ms"] for record in records), 1),
+                "bytes_out": sum(record["request_bytes"] for record in records),
+                "bytes_in": sum(record["response_bytes"] or 0 for record in records),
+            })
+        return rows
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        if not self.summary or not self._spans:
+            return
+        rows = self.report()
+        columns = list(rows[0])
+        widths = [max(len(column), *(len(str(row[column])) for row in rows)) for column in columns]
+        out = sys.stderr
+        out.write("  ".join(column.ljust(width) for column, width in zip(columns, widths)).rstrip() + "\n")
+        for row in rows:
+            cells = [str(row[column]) for column in columns]
+            # Left-align the endpoint, right-align the numbers
+            line = [cells[0].ljust(widths[0])] + [cell.rjust(width) for cell, width in zip(cells[1:], widths[1:])]
+            out.write("  ".join(line) + "\n")
+
+
+@contextmanager
+def span(key: str, source: str = "api") -> Iterator[Optional[Span]]:
+    """Record the call made inside the block; yields None (and records nothing) when tracing is off."""
+    if tracer is None:
+        yield None
+        return
+    current = Span(key, source)
+    try:
+        yield current
+    except BaseException as exc:
+        current.failed(exc)
+        if getattr(exc, "status", None) is not None:
+            current.status = exc.status
+        raise
+    finally:
+        tracer.finish(current)
+
+
+def enable(summary: bool, path: Optional[str]) -> None:
+    """Start recording spans for the rest of the process; the summary is printed at exit."""
+    global tracer
+    tracer = Tracer(summary=summary, path=path)
+    atexit.register(tracer.close)
@@ -0,0 +1,56 @@
+"""Shared fixtures: the mock Instantly API from benchmarks/ and a CLI runner pointed at it."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+import mock_server  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def api():
+    server = mock_server.start(leads=50, emails=30, campaigns=5)
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def cli(api, tmp_path):
+    """Run `instantly <args>` in a fresh process with its own HOME; returns the CompletedProcess."""
+    home = tmp_path / "home"
+    (home / ".instantly").mkdir(parents=True)
+    # Client-side rate limits off: the mock imposes no budget
+    config = {"rate_limits": {"*": None, "GET /api/v2/emails": None}}
+    (home / ".instantly" / "config.json").write_text(json.dumps(config))
+    env = {
+        **os.environ,
+        "HOME": str(home),
+        "INSTANTLY_API_KEY": "test",
+        "INSTANTLY_BASE_URL": api.url,
+        "INSTANTLY_NO_DAEMON": "1",
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")])),
+    }
+
+    def run(*args, input=None, check=True):
+        proc = subprocess.run(
+            [sys.executable, "-m", "instantly.cli", *map(str, args)],
+            env=env, input=input, capture_output=True, text=True,
+        )
+        if check:
+            assert proc.returncode == 0, proc.stdout + proc.stderr
+        return proc
+
+    run.home = home
+    run.env = env
+    return run
+
+
+def ndjson(text: str) -> list:
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
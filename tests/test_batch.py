@@ -0,0 +1,48 @@
+import json
+
+from conftest import ndjson
+
+from instantly.commands.batch import _parse_output
+
+
+def test_parse_output_json_document():
+    assert _parse_output('{"items": [{"id": 1}], "next_starting_after": "x"}') == {
+        "items": [{"id": 1}], "next_starting_after": "x",
+    }
+    assert _parse_output("[1, 2]") == [1, 2]
+
+
+def test_parse_output_ndjson_trailer_becomes_a_key():
+    text = '{"id": "a"}\n{"id": "b"}\n{"next_starting_after": "b"}\n'
+    assert _parse_output(text) == {"items": [{"id": "a"}, {"id": "b"}], "next_starting_after": "b"}
+
+
+def test_parse_output_trailer_only():
+    assert _parse_output('{"next_starting_after": "b"}') == {"items": [], "next_starting_after": "b"}
+
+
+def test_parse_output_plain_ndjson_and_text():
+    assert _parse_output('{"id": "a"}\n{"id": "b"}') == [{"id": "a"}, {"id": "b"}]
+    assert _parse_output("not json") == "not json"
+    assert _parse_output("  ") is None
+
+
+def test_batch_returns_listing_cursor_next_to_items(cli):
+    ops = json.dumps({"command": "emails list", "args": ["--limit", "2", "--brief"]})
+    (row,) = ndjson(cli("batch", input=ops).stdout)
+
+    assert row["ok"]
+    assert len(row["result"]["items"]) == 2
+    assert row["result"]["next_starting_after"] == row["result"]["items"][-1]["id"]
+
+
+def test_batch_refuses_endless_watch(cli):
+    ops = "\n".join([
+        json.dumps({"id": "forever", "command": "emails watch"}),
+        json.dumps({"id": "once", "command": "emails watch", "args": ["--once", "--since", "2025-01-01"]}),
+    ])
+    rows = {row["id"]: row for row in ndjson(cli("batch", input=ops, check=False).stdout)}
+
+    assert not rows["forever"]["ok"]
+    assert "--once" in rows["forever"]["error"]
+    assert rows["once"]["ok"]
@@ -0,0 +1,81 @@
+import pytest
+
+from instantly.cache import Cache, ResponseCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("instantly.cache.time.time", lambda: now[0])
+    return now
+
+
+def test_entries_expire_after_their_ttl(tmp_path, clock):
+    cache = Cache(tmp_path / "cache.db")
+    cache.set("k", {"a": 1}, ttl=30)
+
+    clock[0] += 29
+    assert cache.get("k") == {"a": 1}
+    clock[0] += 1
+    assert cache.get("k") is None
+
+
+def test_least_recently_used_entries_are_evicted_first(tmp_path, clock):
+    cache = Cache(tmp_path / "cache.db", max_bytes=250)
+    value = "x" * 100
+    cache.set("old", value, ttl=60)
+    clock[0] += 1
+    cache.set("used", value, ttl=60)
+    clock[0] += 1
+    cache.get("old")  # now more recently used than "used"
+    clock[0] += 1
+    cache.set("new", value, ttl=60)
+
+    assert cache.get("used") is None
+    assert cache.get("old") == value
+    assert cache.get("new") == value
+
+
+def test_only_endpoints_with_a_ttl_are_cached(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.db", ttls={"GET /api/v2/leads/{id}": 0})
+    cache.set("/api/v2/campaigns", {"limit": 10}, "GET /api/v2/campaigns", {"items": []})
+    cache.set("/api/v2/leads/l1", None, "GET /api/v2/leads/{id}", {"id": "l1"})
+
+    assert cache.get("/api/v2/campaigns", {"limit": 10}) == {"items": []}
+    assert cache.get("/api/v2/campaigns", {"limit": 20}) is None
+    assert cache.get("/api/v2/leads/l1", None) is None
+
+
+def _filled(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.db")
+    cache.set("/api/v2/campaigns", None, "GET /api/v2/campaigns", {"items": []})
+    cache.set("/api/v2/campaigns/c1", None, "GET /api/v2/campaigns/{id}", {"id": "c1"})
+    cache.set("/api/v2/campaigns/c2", None, "GET /api/v2/campaigns/{id}", {"id": "c2"})
+    cache.set("/api/v2/emails", None, "GET /api/v2/emails", {"items": []})
+    return cache
+
+
+def _cached(cache):
+    paths = ["/api/v2/campaigns", "/api/v2/campaigns/c1", "/api/v2/campaigns/c2", "/api/v2/emails"]
+    return [path for path in paths if cache.get(path, None) is not None]
+
+
+def test_write_to_an_item_drops_it_and_its_collection_pages(tmp_path):
+    cache = _filled(tmp_path)
+    cache.invalidate("/api/v2/campaigns/c1/pause", "POST /api/v2/campaigns/{id}/pause")
+
+    assert _cached(cache) == ["/api/v2/campaigns/c2", "/api/v2/emails"]
+
+
+def test_write_without_an_id_drops_only_list_pages(tmp_path):
+    cache = _filled(tmp_path)
+    cache.invalidate("/api/v2/campaigns", "POST /api/v2/campaigns")
+
+    assert _cached(cache) == ["/api/v2/campaigns/c1", "/api/v2/campaigns/c2", "/api/v2/emails"]
+
+
+def test_nested_id_drops_the_whole_collection(tmp_path):
+    cache = _filled(tmp_path)
+    cache.invalidate("/api/v2/campaigns/threads/t1/mark", "POST /api/v2/campaigns/threads/{id}/mark")
+
+    assert _cached(cache) == ["/api/v2/emails"]
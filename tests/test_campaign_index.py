@@ -0,0 +1,50 @@
+from instantly.campaign_index import CampaignIndex
+from instantly.client import InstantlyClient
+
+
+class FakeClient:
+    """Serves /api/v2/campaigns newest-first through the client's own pagination, recording each request."""
+
+    iter_pages = InstantlyClient.iter_pages
+    paginate = InstantlyClient.paginate
+    streaming = False
+
+    def __init__(self, count):
+        self.campaigns = [
+            {"id": f"c{n:04d}", "name": f"Campaign {n}", "status": 1,
+             "timestamp_created": f"2025-01-01T{n // 60:02d}:{n % 60:02d}:00.000Z"}
+            for n in reversed(range(count))
+        ]
+        self.requests = []
+
+    def get(self, path, params=None):
+        self.requests.append(dict(params))
+        items = self.campaigns
+        if params.get("starting_after"):
+            ids = [c["id"] for c in items]
+            items = items[ids.index(params["starting_after"]) + 1:]
+        page = items[:params["limit"]]
+        return {"items": page, "next_starting_after": page[-1]["id"] if page else None}
+
+
+def test_incremental_sync_with_nothing_new_makes_one_request(tmp_path):
+    client = FakeClient(250)
+    index = CampaignIndex(tmp_path / "campaigns.db")
+    index.refresh(client)
+    assert len(client.requests) == 3
+
+    client.requests.clear()
+    index.refresh(client, force=True)
+
+    assert client.requests == [{"limit": 100}]
+
+
+def test_incremental_sync_picks_up_new_campaigns(tmp_path):
+    client = FakeClient(250)
+    index = CampaignIndex(tmp_path / "campaigns.db")
+    index.refresh(client)
+
+    client.campaigns.insert(0, {"id": "new", "name": "New", "status": 0, "timestamp_created": "2025-02-01T00:00:00.000Z"})
+    index.refresh(client, force=True)
+
+    assert index.top(1)[0]["id"] == "new"
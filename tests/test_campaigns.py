@@ -0,0 +1,55 @@
+import json
+
+LEADS_CSV = "email,first_name\nAnn@Example.com,Ann\nann@example.com,Ann again\nnot-an-email,Bad\nbo+news@example.com,Bo\nbo@example.com,Bo\n"
+
+
+def _add_leads(cli, path, *args):
+    proc = cli("campaigns", "add-leads", "c00001", "--file", path, *args)
+    return json.loads(proc.stdout)
+
+
+def test_add_leads_dedupes_by_default(cli, tmp_path):
+    path = tmp_path / "leads.csv"
+    path.write_text(LEADS_CSV)
+
+    result = _add_leads(cli, path)
+
+    assert result["leads_uploaded"] == 3
+    assert result["skipped_locally"] == {
+        "total": 2, "invalid_email": 1, "duplicate_in_file": 1, "known_in_workspace": 0,
+    }
+
+
+def test_add_leads_strip_plus(cli, tmp_path):
+    path = tmp_path / "leads.csv"
+    path.write_text(LEADS_CSV)
+
+    result = _add_leads(cli, path, "--strip-plus")
+
+    assert result["leads_uploaded"] == 2
+    assert result["skipped_locally"]["duplicate_in_file"] == 2
+
+
+def test_add_leads_no_dedupe_sends_every_row(cli, tmp_path):
+    path = tmp_path / "leads.csv"
+    path.write_text(LEADS_CSV)
+
+    result = _add_leads(cli, path, "--no-dedupe")
+
+    assert result["leads_uploaded"] == 5
+    assert "skipped_locally" not in result
+
+
+def test_known_index_only_with_skip_known(cli, tmp_path):
+    path = tmp_path / "leads.csv"
+    path.write_text(LEADS_CSV)
+
+    _add_leads(cli, path)
+    assert not list(cli.home.rglob("emails.db"))
+
+    first = _add_leads(cli, path, "--skip-known")
+    second = _add_leads(cli, path, "--skip-known")
+
+    assert first["skipped_locally"]["known_in_workspace"] == 0
+    assert second["skipped_locally"]["known_in_workspace"] == 3
+    assert second["batches_completed"] == 0
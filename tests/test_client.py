@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from instantly.client import CircuitBreaker, InstantlyError, RetryPolicy, _from_config
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("instantly.client.time.monotonic", lambda: now[0])
+    return now
+
+
+def test_retry_delay_is_full_jitter_up_to_the_cap(monkeypatch):
+    monkeypatch.setattr("instantly.client.random.uniform", lambda low, high: (low, high))
+    policy = RetryPolicy(backoff=0.5, backoff_max=3.0)
+
+    assert [policy.delay(attempt) for attempt in range(5)] == [(0, 0.5), (0, 1.0), (0, 2.0), (0, 3.0), (0, 3.0)]
+
+
+def test_breaker_opens_after_threshold_consecutive_failures(clock):
+    breaker = CircuitBreaker(threshold=3, cooldown=30)
+    for _ in range(2):
+        breaker.record_failure()
+    breaker.record_success()
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert not breaker.allow()
+    clock[0] += 29.9
+    assert not breaker.allow()
+
+
+def test_breaker_lets_one_trial_through_after_the_cooldown(clock):
+    breaker = CircuitBreaker(threshold=1, cooldown=30)
+    breaker.record_failure()
+
+    clock[0] += 30
+    assert breaker.allow()
+    assert not breaker.allow()  # only one trial at a time
+
+    # A failed trial reopens the circuit for another cooldown
+    breaker.record_failure()
+    assert not breaker.allow()
+    clock[0] += 30
+    assert breaker.allow()
+
+    breaker.record_success()
+    assert breaker.allow() and breaker.allow()
+
+
+def test_config_sections_are_checked_for_unknown_keys():
+    assert _from_config(RetryPolicy, "retry", {"max_retries": 5}).max_retries == 5
+    assert _from_config(CircuitBreaker, "circuit_breaker", {}).threshold == 5
+
+    with pytest.raises(InstantlyError, match="unknown key 'retries' in 'retry'.*max_retries"):
+        _from_config(RetryPolicy, "retry", {"retries": 5})
+    with pytest.raises(InstantlyError, match="'circuit_breaker' in config.json must be an object"):
+        _from_config(CircuitBreaker, "circuit_breaker", 5)
+
+
+def test_bad_config_is_reported_without_a_traceback(cli):
+    config_file = cli.home / ".instantly" / "config.json"
+    config = json.loads(config_file.read_text())
+    config_file.write_text(json.dumps({**config, "retry": {"backof": 1}}))
+
+    proc = cli("campaigns", "list", check=False)
+
+    assert proc.returncode == 1
+    assert "unknown key 'backof' in 'retry'" in proc.stderr
+    assert "Traceback" not in proc.stderr
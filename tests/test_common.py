@@ -0,0 +1,12 @@
+from conftest import ndjson
+
+
+def test_workspaces_merge_listing_cursors(cli):
+    for name in ("a", "b"):
+        cli("configure", "--api-key", f"key-{name}", "--profile", name)
+
+    rows = ndjson(cli("-o", "ndjson", "emails", "list", "--limit", "2", "--brief", "--workspaces", "all").stdout)
+    *items, trailer = rows
+
+    assert [item["workspace"] for item in items] == ["a", "a", "b", "b"]
+    assert trailer == {"next_starting_after": {"a": items[1]["id"], "b": items[3]["id"]}}
@@ -0,0 +1,89 @@
+import hashlib
+import json
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+from instantly.client import APIError, CircuitOpenError, InstantlyError
+from instantly.daemon import decode_error, encode_error
+
+
+@pytest.mark.parametrize("error", [APIError(429, "slow down"), CircuitOpenError("open"), InstantlyError("Error: x")])
+def test_errors_survive_the_socket(error):
+    decoded = decode_error(json.loads(json.dumps(encode_error(error))))
+
+    assert type(decoded) is type(error)
+    assert str(decoded) == str(error)
+
+
+@pytest.fixture
+def env(cli):
+    """The CLI environment without INSTANTLY_NO_DAEMON, under a HOME short enough for a Unix socket path."""
+    home = Path(tempfile.mkdtemp(prefix="ih", dir="/tmp"))
+    shutil.copytree(cli.home / ".instantly", home / ".instantly")
+    yield {**{k: v for k, v in cli.env.items() if k != "INSTANTLY_NO_DAEMON"}, "HOME": str(home)}
+    shutil.rmtree(home, ignore_errors=True)
+
+
+def _workspace(env):
+    key = hashlib.sha256(env["INSTANTLY_API_KEY"].encode()).hexdigest()[:12]
+    return Path(env["HOME"]) / ".instantly" / "workspaces" / key
+
+
+def _run(env, *args):
+    proc = subprocess.run([sys.executable, "-m", "instantly.cli", *map(str, args)], env=env,
+                          capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stdout + proc.stderr
+    return proc
+
+
+@pytest.fixture
+def daemon(env):
+    proc = subprocess.Popen([sys.executable, "-m", "instantly.cli", "serve", "--idle-timeout", "30"], env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 10
+    while not (_workspace(env) / "daemon.sock").exists():
+        assert proc.poll() is None and time.monotonic() < deadline, "daemon did not start"
+        time.sleep(0.05)
+    yield proc
+    proc.terminate()
+    proc.wait(timeout=10)
+
+
+def _sources(path):
+    return [json.loads(line)["source"] for line in path.read_text().splitlines()]
+
+
+def test_calls_are_forwarded_to_a_running_daemon(env, daemon, tmp_path):
+    spans = tmp_path / "spans.ndjson"
+    proc = _run(env, "--trace-file", spans, "emails", "unread-count")
+
+    assert "count" in json.loads(proc.stdout)
+    assert _sources(spans) == ["daemon"]
+
+
+def test_api_errors_come_back_through_the_daemon(env, daemon):
+    proc = subprocess.run([sys.executable, "-m", "instantly.cli", "campaigns", "get", "missing"],
+                          env=env, capture_output=True, text=True)
+
+    assert proc.returncode == 1
+    assert "404" in proc.stdout + proc.stderr
+
+
+def test_stale_socket_falls_back_to_direct_calls(env, tmp_path):
+    _workspace(env).mkdir(parents=True)
+    dead = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    dead.bind(str(_workspace(env) / "daemon.sock"))
+    dead.close()  # bound but never listening, as a killed daemon leaves it
+    spans = tmp_path / "spans.ndjson"
+
+    _run(env, "--trace-file", spans, "emails", "unread-count")
+
+    # The refused connection is recorded too, then the call goes straight to the API
+    assert _sources(spans) == ["daemon", "api"]
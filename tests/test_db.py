@@ -0,0 +1,36 @@
+import pytest
+
+from instantly.db import META_SCHEMA, connect, get_meta, set_meta, transaction
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = connect(tmp_path / "nested" / "store.db")
+    conn.executescript(META_SCHEMA + "CREATE TABLE t (x INTEGER);")
+    return conn
+
+
+def test_meta_values_are_stored_as_text(conn):
+    assert get_meta(conn, "cursor") == ""
+    assert get_meta(conn, "generation", "0") == "0"
+
+    set_meta(conn, cursor="l1", generation=2)
+    set_meta(conn, generation=3)
+
+    assert (get_meta(conn, "cursor"), get_meta(conn, "generation")) == ("l1", "3")
+
+
+def test_transaction_commits_or_rolls_back_as_a_whole(conn):
+    with transaction(conn):
+        conn.execute("INSERT INTO t VALUES (1)")
+        set_meta(conn, cursor="a")
+
+    with pytest.raises(KeyboardInterrupt):
+        with transaction(conn):
+            conn.execute("INSERT INTO t VALUES (2)")
+            set_meta(conn, cursor="b")
+            raise KeyboardInterrupt
+
+    assert conn.execute("SELECT x FROM t").fetchall() == [(1,)]
+    assert get_meta(conn, "cursor") == "a"
+    assert not conn.in_transaction
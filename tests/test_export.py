@@ -0,0 +1,70 @@
+import json
+from datetime import timedelta
+
+import pytest
+
+from instantly.export import MANIFEST, Manifest
+
+DAY = ("2025-01-01T00:00:00.000Z", "2025-01-02T00:00:00.000Z")
+
+
+def test_manifest_accepts_the_same_window_however_written(tmp_path):
+    Manifest(tmp_path, {}, "jsonl", timedelta(days=1)).complete("part", DAY, 0)
+
+    assert Manifest(tmp_path, {}, "jsonl", timedelta(hours=24)).done("part")
+
+
+def test_manifest_refuses_another_window(tmp_path):
+    Manifest(tmp_path, {}, "jsonl", timedelta(days=1)).complete("part", DAY, 0)
+
+    with pytest.raises(ValueError, match="--window"):
+        Manifest(tmp_path, {}, "jsonl", timedelta(hours=6))
+
+
+def test_manifest_without_window_takes_its_longest_window(tmp_path):
+    state = {"filters": {}, "format": "jsonl", "windows": {"part": {"start": DAY[0], "end": DAY[1], "count": 0}}}
+    (tmp_path / MANIFEST).write_text(json.dumps(state))
+
+    Manifest(tmp_path, {}, "jsonl", timedelta(days=1))
+    with pytest.raises(ValueError):
+        Manifest(tmp_path, {}, "jsonl", timedelta(hours=1))
+
+
+def test_export_rerun_with_another_window_fails(cli, tmp_path):
+    out = tmp_path / "export"
+    args = ["emails", "export", "--out", out, "--since", "2025-01-01", "--until", "2025-01-02"]
+
+    first = json.loads(cli(*args, "--window", "6h").stdout)
+    assert first["windows"] == 4
+    again = json.loads(cli(*args, "--window", "6h").stdout)
+    assert again["skipped"] == 4
+
+    proc = cli(*args, "--window", "1h", check=False)
+    assert proc.returncode == 1
+    assert "--window" in proc.stdout
+
+
+def test_parquet_keeps_fields_missing_from_the_first_row(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    from instantly.export import write_parquet
+
+    rows = [
+        {"id": "e1", "timestamp_created": DAY[0]},
+        {"id": "e2", "timestamp_created": DAY[0], "ue_type": 2, "i_status": 1, "body": {"text": "hi"}},
+    ]
+    assert write_parquet(tmp_path / "part.parquet", rows) == 2
+
+    table = pq.read_table(tmp_path / "part.parquet")
+    assert table.column("ue_type").to_pylist() == [None, 2]
+    assert table.column("i_status").to_pylist() == [None, 1]
+    assert table.column("body").to_pylist() == [None, '{"text":"hi"}']
+
+
+def test_parquet_shards_share_column_types(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    from instantly.export import write_parquet
+
+    write_parquet(tmp_path / "a.parquet", [{"id": "e1"}])
+    write_parquet(tmp_path / "b.parquet", [{"id": "e2", "ue_type": 1, "reminder_ts": DAY[0]}])
+
+    assert pq.read_schema(tmp_path / "a.parquet") == pq.read_schema(tmp_path / "b.parquet")
@@ -0,0 +1,52 @@
+import pytest
+
+from instantly.extract import html_to_text, preview, strip_reply
+
+
+@pytest.mark.parametrize("text", [
+    "Sounds good, call me.\n\nOn Mon, Jan 1, 2025 at 10:00 AM Dana <d@example.com> wrote:\n> earlier",
+    "Sounds good, call me.\n> earlier",
+    "Sounds good, call me.\n-----Original Message-----\nFrom: Dana",
+    "Sounds good, call me.\n-- \nDana, CEO",
+    "Sounds good, call me.\nFrom: Dana <d@example.com>\nSent: Monday",
+    "Sounds good, call me.\nLe lun. 1 janv. 2025, Dana <d@example.com> a écrit :\n> avant",
+    "Sounds good, call me.\nAm 01.01.2025 um 10:00 schrieb Dana:\n> vorher",
+    "Sounds good, call me.\nSent from my iPhone",
+])
+def test_strip_reply_stops_at_the_boundary(text):
+    assert strip_reply(text) == "Sounds good, call me."
+
+
+def test_boundary_spanning_lines():
+    text = "Yes.\nOn Mon, Jan 1, 2025 at 10:00 AM Dana Smith\n<dana@example.com> wrote:\n> earlier"
+    assert strip_reply(text) == "Yes."
+
+
+def test_a_boundary_on_the_first_line_is_not_one():
+    # Alternatives must start at a line break, so a reply that opens with "On ..." is kept
+    assert strip_reply("On Monday works for me.") == "On Monday works for me."
+
+
+def test_whitespace_is_collapsed_and_the_preview_limited():
+    assert strip_reply("a  b\n\n c", limit=3) == "a b"
+    assert len(strip_reply("word " * 2000, limit=50)) == 50
+
+
+def test_long_quoted_thread_after_a_short_reply():
+    text = "Thanks!\n" + "\n".join("> " + "quoted " * 20 for _ in range(5000))
+    assert strip_reply(text) == "Thanks!"
+
+
+def test_html_stops_at_quoted_history_and_skips_styles():
+    html = (
+        "<html><head><style>p {color: red}</style></head><body>"
+        "<p>Hi &amp; welcome,</p><div>see you<br>soon</div>"
+        '<div class="gmail_quote">On Mon Dana wrote: old stuff</div></body></html>'
+    )
+    assert " ".join(html_to_text(html).split()) == "Hi & welcome, see you soon"
+
+
+def test_preview_falls_back_to_html():
+    assert preview({"text": "  ", "html": "<p>From HTML</p><blockquote>old</blockquote>"}) == "From HTML"
+    assert preview({"text": "Plain", "html": "<p>ignored</p>"}) == "Plain"
+    assert preview({}) == ""
@@ -0,0 +1,97 @@
+import sqlite3
+
+import pytest
+
+from instantly.client import InstantlyClient
+from instantly.lead_mirror import LeadMirror
+
+
+class FakeClient:
+    """Serves /leads/list from a list through the client's own pagination, recording the body of each request."""
+
+    iter_pages = InstantlyClient.iter_pages
+
+    def __init__(self, leads):
+        self.leads = leads
+        self.calls = []
+
+    def post(self, path, json=None):
+        self.calls.append(dict(json))
+        items = self.leads
+        if json.get("starting_after"):
+            ids = [lead["id"] for lead in items]
+            items = items[ids.index(json["starting_after"]) + 1:]
+        page = items[:json["limit"]]
+        return {"items": page, "next_starting_after": page[-1]["id"] if page else None}
+
+
+def _lead(number, minute):
+    # IDs deliberately do not sort by creation time
+    return {"id": f"{'z' if number % 2 else 'a'}{number:04d}", "email": f"lead{number}@example.com",
+            "timestamp_created": f"2025-01-01T00:{minute:02d}:00.000Z"}
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    return LeadMirror(tmp_path / "leads.db")
+
+
+def test_newest_first_listing_reads_only_above_the_watermark(mirror):
+    leads = [_lead(n, 59 - n) for n in range(30)]
+    client = FakeClient(leads)
+    assert mirror.sync(client)["full"]
+
+    client.leads = [_lead(100, 59), _lead(101, 59)] + leads
+    result = mirror.sync(client)
+
+    assert not result["full"]
+    assert result["total"] == 32
+    assert result["fetched"] == 3  # the two new leads and the one sharing the watermark's second
+
+
+def test_oldest_first_listing_continues_from_the_last_lead(mirror):
+    leads = [_lead(n, n) for n in range(30)]
+    client = FakeClient(leads)
+    mirror.sync(client)
+
+    client.leads = leads + [_lead(100, 59)]
+    result = mirror.sync(client)
+
+    assert client.calls[-1] == {"starting_after": leads[-1]["id"], "limit": 100}
+    assert (result["full"], result["fetched"], result["total"]) == (False, 1, 31)
+
+
+def test_unknown_order_falls_back_to_full_syncs(mirror):
+    client = FakeClient([_lead(1, 5), _lead(2, 1), _lead(3, 9)])
+    mirror.sync(client)
+
+    client.leads = client.leads[:2]
+    result = mirror.sync(client)
+
+    assert result["full"]
+    assert (result["removed"], result["total"]) == (1, 2)
+
+
+def test_newest_first_sync_with_nothing_new_makes_one_request(mirror):
+    client = FakeClient([_lead(n, (599 - n) // 10) for n in range(250)])
+    mirror.sync(client)
+    assert len(client.calls) == 3
+
+    client.calls.clear()
+    result = mirror.sync(client)
+
+    assert client.calls == [{"limit": 100}]
+    assert not result["full"]
+
+
+def test_query_takes_more_values_than_sqlite_binds(mirror):
+    # Builds differ in the limit (999 in older SQLite, 32766 or more now); pin it low
+    mirror._conn.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)
+    count = 2000
+    mirror.upsert([{"id": f"l{n:06d}", "email": f"Lead{n}@Example.com"} for n in range(count)])
+
+    by_id = list(mirror.query(ids=[f"l{n:06d}" for n in range(count)]))
+    by_contact = list(mirror.query(contacts=[f"lead{n}@example.com" for n in range(count)], limit=5))
+
+    assert len(by_id) == count
+    assert [lead["id"] for lead in by_contact] == [f"l{n:06d}" for n in range(5)]
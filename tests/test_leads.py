@@ -0,0 +1,52 @@
+import json
+
+
+def _interest_file(path, rows):
+    path.write_text("email,interest_value,campaign_id\n" + "".join(f"{e},{v},{c}\n" for e, v, c in rows))
+    return path
+
+
+def _known_status_leads(api, count):
+    return [lead for lead in api.fixtures.leads if lead["lt_interest_status"] is not None][:count]
+
+
+def test_skip_unchanged_is_opt_in(api, cli, tmp_path):
+    cli("leads", "sync")
+    lead = _known_status_leads(api, 1)[0]
+    rows = _interest_file(tmp_path / "rows.csv", [(lead["email"], lead["lt_interest_status"], lead["campaign"])])
+
+    summary = json.loads(cli("leads", "update-interest", "--file", rows).stdout)
+
+    assert summary["unchanged"] == 0
+    assert summary["updated"] == 1
+
+
+def test_skip_unchanged_uses_the_mirror(api, cli, tmp_path):
+    cli("leads", "sync")
+    same, other = _known_status_leads(api, 2)
+    changed = 3 if other["lt_interest_status"] != 3 else 2
+    rows = _interest_file(tmp_path / "rows.csv", [
+        (same["email"], same["lt_interest_status"], same["campaign"]),
+        (other["email"], changed, other["campaign"]),
+    ])
+
+    summary = json.loads(cli("leads", "update-interest", "--file", rows, "--skip-unchanged").stdout)
+    assert (summary["unchanged"], summary["updated"]) == (1, 1)
+
+    # The accepted update was applied to the mirror, so both rows now match it
+    summary = json.loads(cli("leads", "update-interest", "--file", rows, "--skip-unchanged").stdout)
+    assert (summary["unchanged"], summary["updated"]) == (2, 0)
+
+
+def test_skip_unchanged_sends_a_revert(api, cli, tmp_path):
+    cli("leads", "sync")
+    lead = _known_status_leads(api, 1)[0]
+    original = lead["lt_interest_status"]
+    changed = 3 if original != 3 else 2
+    forward = _interest_file(tmp_path / "forward.csv", [(lead["email"], changed, lead["campaign"])])
+    back = _interest_file(tmp_path / "back.csv", [(lead["email"], original, lead["campaign"])])
+
+    cli("leads", "update-interest", "--file", forward, "--skip-unchanged")
+    summary = json.loads(cli("leads", "update-interest", "--file", back, "--skip-unchanged").stdout)
+
+    assert summary["updated"] == 1
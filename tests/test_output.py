@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from instantly import output
+
+ITEMS = [
+    {"id": "a", "subject": "Hi", "body": {"text": "Hello"}, "to": ["x@y.com"], "is_unread": True},
+    {"id": "b", "subject": "Re", "body": {"text": "Long\nreply " + "w" * 60}, "to": [], "is_unread": False},
+]
+
+
+@pytest.fixture(autouse=True)
+def settings(monkeypatch):
+    monkeypatch.setattr(output, "settings", {"output": None, "fields": None})
+    return output.settings
+
+
+def test_parse_fields_with_renames_and_paths():
+    assert output.parse_fields("id, from=from_address_email,body.text,") == [
+        ("id", ("id",)), ("from", ("from_address_email",)), ("body.text", ("body", "text")),
+    ]
+    assert output.parse_fields("") is None
+
+
+def test_project_follows_paths_and_list_indexes():
+    fields = output.parse_fields("id,text=body.text,first=to.0,missing.key")
+
+    assert output.project(ITEMS[0], fields) == {"id": "a", "text": "Hello", "first": "x@y.com", "missing.key": None}
+    assert output.project("plain", fields) == "plain"
+
+
+def test_emit_json_keeps_listing_keys(settings, capsys):
+    settings["fields"] = output.parse_fields("id")
+    output.emit({"items": ITEMS, "next_starting_after": "b"})
+
+    assert json.loads(capsys.readouterr().out) == {"items": [{"id": "a"}, {"id": "b"}], "next_starting_after": "b"}
+
+
+def test_ndjson_writes_the_trailer_last(settings, capsys):
+    settings["output"] = "ndjson"
+    output.emit({"items": ITEMS, "next_starting_after": "b"})
+
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert lines == [*ITEMS, {"next_starting_after": "b"}]
+
+
+def test_json_array_output_matches_json_dumps(capsys):
+    output.emit_items(iter(ITEMS), fmt="json", trailer={"next_starting_after": "b"})
+    assert json.loads(capsys.readouterr().out) == {"items": ITEMS, "next_starting_after": "b"}
+
+    output.emit_items(iter([]), fmt="json")
+    assert json.loads(capsys.readouterr().out) == []
+
+
+def test_csv_encodes_nested_values_and_booleans(capsys):
+    output.emit_items(ITEMS, fmt="csv", fields=output.parse_fields("id,body.text,to,is_unread"))
+
+    out = capsys.readouterr().out
+    assert out.splitlines()[0] == "id,body.text,to,is_unread"
+    assert 'a,Hello,"[""x@y.com""]",true' in out
+
+
+def test_table_clips_wide_cells_and_sends_the_trailer_to_stderr(capsys):
+    output.emit_items(ITEMS, fmt="table", fields=output.parse_fields("id,text=body.text"),
+                      trailer={"next_starting_after": "b"})
+
+    captured = capsys.readouterr()
+    header, rule, first, second = captured.out.splitlines()
+    assert header.split() == ["id", "text"]
+    assert len(second) == len("id  ") + output.TABLE_MAX_WIDTH
+    assert second.endswith("…")
+    assert "\n" not in second
+    assert json.loads(captured.err) == {"next_starting_after": "b"}
@@ -0,0 +1,92 @@
+import subprocess
+import sys
+
+import pytest
+
+from instantly.ratelimit import Rate, RateLimiter, blocked_until_from_headers
+
+from conftest import ROOT
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("instantly.ratelimit.time.time", lambda: now[0])
+    return now
+
+
+def test_burst_defaults_to_count():
+    assert Rate.parse("10/1").burst == 10
+    assert Rate.parse("10/1/5").burst == 5
+    assert Rate.parse("20/60").per_second == pytest.approx(1 / 3)
+    for spec in ("10", "10/1/5/2", "0/1", "10/1/0"):
+        with pytest.raises(ValueError):
+            Rate.parse(spec)
+
+
+def test_a_full_bucket_allows_count_requests_then_refills(tmp_path, clock):
+    limiter = RateLimiter(tmp_path / "rl.json", {"*": "10/1"}, defaults={})
+
+    assert [limiter.reserve("GET /x") for _ in range(10)] == [0.0] * 10
+    assert limiter.reserve("GET /x") == pytest.approx(0.1)
+
+    clock[0] += 0.25
+    assert [limiter.reserve("GET /x") for _ in range(2)] == [0.0, 0.0]
+    assert limiter.reserve("GET /x") == pytest.approx(0.05)
+
+
+def test_a_request_takes_a_token_from_every_matching_bucket(tmp_path, clock):
+    limiter = RateLimiter(tmp_path / "rl.json", {"*": "10/1", "GET /api/v2/emails": "2/60"}, defaults={})
+
+    assert limiter.reserve("GET /api/v2/emails") == 0.0
+    assert limiter.reserve("GET /api/v2/emails") == 0.0
+    assert limiter.reserve("GET /api/v2/emails") == pytest.approx(30)
+    # The refused request took nothing, and other endpoints only use the shared bucket
+    assert [limiter.reserve("GET /api/v2/leads") for _ in range(8)] == [0.0] * 8
+    assert limiter.reserve("GET /api/v2/leads") > 0
+
+
+def test_null_rules_are_disabled(tmp_path):
+    limiter = RateLimiter(tmp_path / "rl.json", {"*": None})
+
+    assert limiter.buckets_for("GET /api/v2/leads") == []
+    assert limiter.buckets_for("GET /api/v2/emails") == ["GET /api/v2/emails"]
+
+
+def test_headers_pause_every_limiter_sharing_the_state_file(tmp_path, clock):
+    first = RateLimiter(tmp_path / "rl.json", {"*": "10/1"}, defaults={})
+    second = RateLimiter(tmp_path / "rl.json", {"*": "10/1"}, defaults={})
+
+    first.observe("GET /x", 429, {"Retry-After": "5"})
+
+    assert second.reserve("GET /x") == pytest.approx(5)
+    clock[0] += 5
+    assert second.reserve("GET /x") == 0.0
+
+
+def test_blocked_until_from_headers():
+    assert blocked_until_from_headers(200, {"Retry-After": "3"}, 100.0) == 103.0
+    assert blocked_until_from_headers(200, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "7"}, 100.0) == 107.0
+    assert blocked_until_from_headers(
+        200, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "1700000000"}, 100.0,
+    ) == 1700000000.0
+    assert blocked_until_from_headers(200, {"X-RateLimit-Remaining": "4", "X-RateLimit-Reset": "7"}, 100.0) is None
+    assert blocked_until_from_headers(429, {}, 100.0) == 101.0
+
+
+def test_processes_draw_from_one_budget(tmp_path):
+    # Four processes each try 10 requests against a 10/3600 bucket: only 10 may go in total
+    script = (
+        "import sys\n"
+        "from instantly.ratelimit import RateLimiter\n"
+        "limiter = RateLimiter(sys.argv[1], {'*': '10/3600'}, defaults={})\n"
+        "print(sum(limiter.reserve('GET /x') == 0 for _ in range(10)))\n"
+    )
+    procs = [
+        subprocess.Popen([sys.executable, "-c", script, str(tmp_path / "rl.json")],
+                         cwd=ROOT, stdout=subprocess.PIPE, text=True)
+        for _ in range(4)
+    ]
+    allowed = [int(proc.communicate()[0]) for proc in procs]
+
+    assert sum(allowed) == 10
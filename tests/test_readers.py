@@ -0,0 +1,106 @@
+import gzip
+
+import pytest
+
+from instantly.readers import iter_json_array, iter_list_items, open_records, read_records
+
+
+def test_csv_quoting_bom_and_ragged_rows(tmp_path):
+    path = tmp_path / "leads.csv"
+    path.write_bytes(
+        b'\xef\xbb\xbfemail,note,city\n'
+        b'ann@example.com,"says ""hi"", twice","Paris"\n'
+        b'bo@example.com,"two\nlines"\n'
+        b'cy@example.com,x,y,extra\n'
+    )
+
+    fmt, rows = open_records(str(path))
+
+    assert fmt == "csv"
+    assert list(rows) == [
+        {"email": "ann@example.com", "note": 'says "hi", twice', "city": "Paris"},
+        {"email": "bo@example.com", "note": "two\nlines", "city": ""},
+        {"email": "cy@example.com", "note": "x", "city": "y"},
+    ]
+
+
+def test_ndjson_skips_blank_lines(tmp_path):
+    path = tmp_path / "leads.jsonl"
+    path.write_text('{"email": "a@x.com"}\n\n  \n{"email": "b@x.com"}\n')
+
+    assert open_records(str(path))[0] == "ndjson"
+    assert [row["email"] for row in read_records(str(path))] == ["a@x.com", "b@x.com"]
+
+
+def test_json_array_spanning_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr("instantly.readers.CHUNK_SIZE", 7)
+    path = tmp_path / "leads.json"
+    path.write_text('[{"email": "a@x.com", "n": 12.5}, {"email": "b@x.com", "tags": ["x", "y"]}]')
+
+    assert list(read_records(str(path))) == [{"email": "a@x.com", "n": 12.5}, {"email": "b@x.com", "tags": ["x", "y"]}]
+
+
+@pytest.mark.parametrize("content, fmt", [
+    (b'[{"email": "a@x.com"}]', "json"),
+    (b'{"email": "a@x.com"}\n', "ndjson"),
+    (b"email\na@x.com\n", "csv"),
+])
+def test_gzip_and_format_sniffed_without_an_extension(tmp_path, content, fmt):
+    path = tmp_path / "upload"
+    path.write_bytes(gzip.compress(content))
+
+    detected, rows = open_records(str(path))
+
+    assert detected == fmt
+    assert list(rows) == [{"email": "a@x.com"}]
+
+
+def test_gz_extension_names_the_inner_format(tmp_path):
+    path = tmp_path / "leads.ndjson.gz"
+    path.write_bytes(gzip.compress(b'{"email": "a@x.com"}\n'))
+
+    assert open_records(str(path))[0] == "ndjson"
+
+
+def test_missing_file_fails_on_open(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        open_records(str(tmp_path / "missing.csv"))
+
+
+def _chunked(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 1000])
+def test_json_array_split_inside_numbers_strings_and_literals(size):
+    text = ' [ 12.5e3 , "a \\"quoted\\" ,]" , true,null , {"k": [1, -20]} ] '
+
+    assert list(iter_json_array(_chunked(text, size))) == [12500.0, 'a "quoted" ,]', True, None, {"k": [1, -20]}]
+
+
+@pytest.mark.parametrize("text", [
+    '{"next_starting_after": "b", "items": [{"id": "a"}, {"id": "b"}], "total": 2}',
+    '{"items": [{"id": "a"}, {"id": "b"}], "total": 2, "next_starting_after": "b"}',
+])
+def test_list_items_collect_meta_before_and_after_the_items(text):
+    meta = {}
+    items = iter_list_items(_chunked(text, 4), meta)
+
+    assert next(items) == {"id": "a"}
+    assert list(items) == [{"id": "b"}]
+    assert meta == {"next_starting_after": "b", "total": 2}
+
+
+def test_list_items_of_empty_and_bare_responses():
+    meta = {}
+    assert list(iter_list_items(['{"items": [], "next_starting_after": null}'], meta)) == []
+    assert meta == {"next_starting_after": None}
+    assert list(iter_list_items(["{}"])) == []
+    assert list(iter_list_items(["[1, ", "2]"])) == [1, 2]
+
+
+@pytest.mark.parametrize("text", ["[1, 2", '[{"a": 1}', '{"items": [1]', "[1 2]", '"x"'])
+def test_truncated_or_malformed_json_raises(text):
+    with pytest.raises(ValueError):
+        list(iter_list_items(_chunked(text, 2)))
+
@@ -0,0 +1,108 @@
+import json
+
+import pytest
+
+from instantly.report import ReplyStore, _direction, aggregate
+
+
+def _email(number, ue_type, day=1, campaign="c1", account="Sender@x.com", status=None):
+    return {"id": f"e{number:04d}", "ue_type": ue_type, "campaign_id": campaign, "eaccount": account,
+            "i_status": status, "timestamp_created": f"2025-01-{day:02d}T{number % 24:02d}:00:00.000Z"}
+
+
+class FakeClient:
+    """Pages /api/v2/emails oldest-first from min_timestamp_created; can fail on a given page."""
+
+    def __init__(self, emails, fail_on_page=None):
+        self.emails = emails
+        self.fail_on_page = fail_on_page
+        self.pages = 0
+
+    def request(self, method, path, params=None, cache_reads=None):
+        self.pages += 1
+        if self.pages == self.fail_on_page:
+            raise ConnectionError("dropped")
+        items = sorted((e for e in self.emails if e["timestamp_created"] >= params["min_timestamp_created"]),
+                       key=lambda e: (e["timestamp_created"], e["id"]))
+        if params.get("starting_after"):
+            ids = [e["id"] for e in items]
+            items = items[ids.index(params["starting_after"]) + 1:]
+        page = items[:params["limit"]]
+        return {"items": page, "next_starting_after": page[-1]["id"] if page else None}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ReplyStore(tmp_path / "report.db")
+    store.reset("2025-01-01T00:00:00.000Z")
+    return store
+
+
+def test_direction_from_ue_type_or_sender():
+    assert _direction({"ue_type": 1}) == "sent"
+    assert _direction({"ue_type": 3}) == "sent"
+    assert _direction({"ue_type": 2}) == "received"
+    assert _direction({"ue_type": 4}) is None
+    assert _direction({"from_address_email": "A@x.com", "eaccount": "a@x.com"}) == "sent"
+    assert _direction({"from_address_email": "lead@y.com", "eaccount": "a@x.com"}) == "received"
+
+
+def test_aggregate_keys_by_campaign_account_status_and_day():
+    counts = aggregate([_email(1, 1), _email(2, 2, status=1), _email(3, 2, status=1), _email(4, 4)])
+
+    assert counts == {
+        ("c1", "sender@x.com", "", "2025-01-01"): {"sent": 1},
+        ("c1", "sender@x.com", "1", "2025-01-01"): {"received": 2},
+    }
+
+
+def test_sync_only_reads_what_is_new(store):
+    client = FakeClient([_email(n, 1 if n % 3 == 0 else 2) for n in range(250)])
+    assert store.sync(client) == 250
+    assert store.sync(client) == 0
+
+    client.emails.append(_email(999, 2, day=2))
+    assert store.sync(client) == 1
+
+    (total,) = store.query([], "2025-01-01")
+    assert (total["sent"], total["received"]) == (84, 167)
+
+
+def test_interrupted_sync_resumes_without_double_counting(store):
+    emails = [_email(n, 2) for n in range(250)]
+    with pytest.raises(ConnectionError):
+        store.sync(FakeClient(emails, fail_on_page=3))
+
+    store.sync(FakeClient(emails))
+
+    (total,) = store.query([], "2025-01-01")
+    assert total["received"] == 250
+
+
+def test_query_groups_and_filters(store):
+    emails = [
+        _email(1, 1, day=1, campaign="c1"), _email(2, 2, day=1, campaign="c1", status=1),
+        _email(3, 1, day=2, campaign="c2", account="other@x.com"), _email(4, 2, day=3, campaign="c2", status=-1),
+    ]
+    store.sync(FakeClient(emails))
+
+    assert store.query(["campaign"], "2025-01-01") == [
+        {"campaign_id": "c1", "sent": 1, "received": 1},
+        {"campaign_id": "c2", "sent": 1, "received": 1},
+    ]
+    assert store.query(["interest"], "2025-01-01", campaign_id="c2") == [
+        {"i_status": None, "sent": 1, "received": 0},
+        {"i_status": -1, "sent": 0, "received": 1},
+    ]
+    assert store.query(["day"], "2025-01-02", until_day="2025-01-02", eaccount="OTHER@x.com") == [
+        {"day": "2025-01-02", "sent": 1, "received": 0},
+    ]
+
+
+def test_report_command_against_the_mock(api, cli):
+    items = json.loads(cli("campaigns", "report", "--since", "2025-01-01", "--by", "campaign").stdout)["items"]
+
+    sent = sum(1 for e in api.fixtures.emails if e["ue_type"] == 1)
+    assert sum(item["sent"] for item in items) == sent
+    assert sum(item["replies"] for item in items) == len(api.fixtures.emails) - sent
+    assert all(item["reply_rate"] == round(item["replies"] / item["sent"], 4) for item in items if item["sent"])
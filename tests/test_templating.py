@@ -0,0 +1,104 @@
+import json
+
+import pytest
+
+from instantly.templating import (
+    MissingVariable, Template, compile_string, find_template, load_template, markdown_to_html, template_body,
+    variable_key,
+)
+
+from conftest import ROOT, ndjson
+
+
+def test_placeholder_names_match_loosely():
+    assert variable_key("First Name") == variable_key("first-name") == variable_key(" first_name ") == "first_name"
+
+    template = Template("Hi {{First Name}} from {{ company-name }}")
+    assert template.variables == {"first_name", "company_name"}
+    assert template.render_text({"first_name": "Ann", "Company Name": "Acme"}) == "Hi Ann from Acme"
+
+
+def test_render_escapes_values_in_html_only():
+    body = Template("Hi **{{name}}**,\n\nsee https://x.com/a.\n\n- one\n- two").render({"name": "<Bo & Co>"})
+
+    assert body["text"] == "Hi **<Bo & Co>**,\n\nsee https://x.com/a.\n\n- one\n- two"
+    assert body["html"] == (
+        '<p>Hi <strong>&lt;Bo &amp; Co&gt;</strong>,</p>\n'
+        '<p>see <a href="https://x.com/a">https://x.com/a</a>.</p>\n'
+        "<ul><li>one</li><li>two</li></ul>"
+    )
+
+
+def test_values_are_never_parsed_as_markup():
+    # A value with ** or a placeholder in it is inserted literally
+    assert Template("{{a}}").render({"a": "**{{b}}**"})["html"] == "<p>**{{b}}**</p>"
+
+
+@pytest.mark.parametrize("variables", [{}, {"name": ""}, {"name": None}])
+def test_missing_or_empty_variables_raise(variables):
+    with pytest.raises(MissingVariable, match="no value for name"):
+        Template("Hi {{name}}").render(variables)
+
+
+def test_markdown_paragraphs_and_line_breaks():
+    assert markdown_to_html("a\nb\n\n\nc < d") == "<p>a<br>b</p>\n<p>c &lt; d</p>"
+
+
+def test_template_body_is_the_template_section():
+    document = "# Name\n\n## When to use\n\nnotes\n\n## Template\n\nHello {{x}}\n\n## Notes\n\nmore"
+    assert template_body(document).strip() == "Hello {{x}}"
+    assert template_body("Just {{x}}") == "Just {{x}}"
+
+
+def test_templates_are_found_by_name_and_compiled_once(tmp_path):
+    path = find_template("short_summary", str(ROOT / "templates"))
+
+    assert path == str((ROOT / "templates" / "short_summary.md").resolve())
+    assert load_template(path) is load_template(path)
+    assert compile_string("Re: {{subject}}") is compile_string("Re: {{subject}}")
+    with pytest.raises(FileNotFoundError):
+        find_template("nope", str(tmp_path))
+
+
+def _rows(tmp_path, rows):
+    (tmp_path / "hi.md").write_text("Hi {{first_name}}")
+    path = tmp_path / "rows.ndjson"
+    path.write_text("".join(json.dumps({"eaccount": "s@x.com", "template": "hi", **row}) + "\n" for row in rows))
+    return path
+
+
+def test_reply_bulk_subject_defaults(cli, tmp_path):
+    rows = _rows(tmp_path, [
+        {"id": "e00000001", "first_name": "Ann", "subject": "Intro"},
+        {"id": "e00000002", "first_name": "Bo", "subject": "RE: Intro"},
+        {"id": "e00000004", "first_name": "Cy"},
+        {"id": "e00000005", "first_name": "Di", "reply_subject": "Quick note for {{first_name}}"},
+    ])
+
+    dry = ndjson(cli("emails", "reply-bulk", "--file", rows, "--templates-dir", tmp_path, "--dry-run").stdout)
+    assert [row["payload"].get("subject") for row in dry] == ["Re: Intro", "RE: Intro", None, "Quick note for Di"]
+
+    sent = cli("emails", "reply-bulk", "--file", rows, "--templates-dir", tmp_path, "--account-rate", "100/1")
+    assert [row["ok"] for row in ndjson(sent.stdout)] == [True] * 4
+
+
+def test_reply_bulk_looks_up_the_original_subject(cli, tmp_path):
+    rows = _rows(tmp_path, [{"id": "e00000004", "first_name": "Cy"}])
+
+    proc = cli("--trace-file", tmp_path / "spans.ndjson", "emails", "reply-bulk", "--file", rows,
+               "--templates-dir", tmp_path)
+
+    assert ndjson(proc.stdout)[0]["ok"]
+    spans = ndjson((tmp_path / "spans.ndjson").read_text())
+    assert [(span["method"], span["endpoint"]) for span in spans] == [
+        ("GET", "/api/v2/emails/{id}"), ("POST", "/api/v2/emails/reply"),
+    ]
+
+
+def test_reply_bulk_with_a_subject_template(cli, tmp_path):
+    rows = _rows(tmp_path, [{"id": "e00000004", "first_name": "Cy"}])
+
+    dry = cli("emails", "reply-bulk", "--file", rows, "--templates-dir", tmp_path, "--subject", "Hello {{first_name}}",
+              "--dry-run")
+
+    assert ndjson(dry.stdout)[0]["payload"]["subject"] == "Hello Cy"
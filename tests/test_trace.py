@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from instantly import trace
+
+
+@pytest.fixture
+def tracer(monkeypatch, tmp_path):
+    current = trace.Tracer(summary=True, path=str(tmp_path / "spans.ndjson"))
+    monkeypatch.setattr(trace, "tracer", current)
+    yield current
+    current.close()
+
+
+class FakeResponse:
+    status_code = 200
+    content = b'{"items": []}'
+    headers = {"X-RateLimit-Remaining": "19", "Content-Type": "application/json"}
+
+    class request:
+        body = b'{"limit": 10}'
+
+
+def test_no_span_without_a_tracer(monkeypatch):
+    monkeypatch.setattr(trace, "tracer", None)
+    with trace.span("GET /api/v2/emails") as current:
+        assert current is None
+
+
+def test_span_records_attempts_sizes_and_headers(tracer, tmp_path):
+    with trace.span("POST /api/v2/leads/list") as current:
+        current.attempt(0.25)
+        current.attempt(0.0)
+        current.response(FakeResponse())
+
+    (record,) = [json.loads(line) for line in (tmp_path / "spans.ndjson").read_text().splitlines()]
+    assert (record["method"], record["endpoint"], record["status"]) == ("POST", "/api/v2/leads/list", 200)
+    assert (record["retries"], record["rate_wait_ms"]) == (1, 250.0)
+    assert (record["request_bytes"], record["response_bytes"]) == (13, 13)
+    assert record["rate_limit"] == {"X-RateLimit-Remaining": "19"}
+
+
+def test_failed_call_keeps_its_error_and_status(tracer):
+    class Failure(Exception):
+        status = 429
+
+    with pytest.raises(Failure):
+        with trace.span("GET /api/v2/emails") as current:
+            current.attempt(0)
+            raise Failure("Too Many Requests")
+
+    (row,) = tracer.report()
+    assert (row["calls"], row["errors"]) == (1, 1)
+    assert tracer._spans[0]["status"] == 429
+
+
+def test_report_groups_by_endpoint_with_percentiles(tracer):
+    for latency in range(1, 101):
+        tracer._spans.append({
+            "method": "GET", "endpoint": "/api/v2/emails", "latency_ms": float(latency), "error": None,
+            "retries": 0, "rate_wait_ms": 1.0, "request_bytes": 0, "response_bytes": 10,
+        })
+    tracer._spans.append({
+        "method": "GET", "endpoint": "/api/v2/campaigns", "latency_ms": 5.0, "error": "boom",
+        "retries": 2, "rate_wait_ms": 0.0, "request_bytes": 3, "response_bytes": None,
+    })
+
+    emails, campaigns = tracer.report()
+
+    assert emails["endpoint"] == "GET /api/v2/emails"
+    assert (emails["calls"], emails["p50_ms"], emails["p95_ms"], emails["p99_ms"]) == (100, 50.0, 95.0, 99.0)
+    assert (emails["rate_wait_ms"], emails["bytes_in"]) == (100.0, 1000)
+    assert (campaigns["errors"], campaigns["retries"], campaigns["bytes_in"]) == (1, 2, 0)
+
+
+def test_trace_file_from_the_cli(cli, tmp_path):
+    spans = tmp_path / "cli-spans.ndjson"
+    cli("--trace-file", spans, "emails", "unread-count")
+
+    (record,) = [json.loads(line) for line in spans.read_text().splitlines()]
+    assert (record["endpoint"], record["status"], record["source"]) == ("/api/v2/emails/unread/count", 200, "api")
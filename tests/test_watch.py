@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from conftest import ndjson
+
+from instantly.watch import Watermark
+
+
+@pytest.mark.parametrize("since, expected", [
+    ("2025-01-01", "2025-01-01T00:00:00.000Z"),
+    ("2025-01-01T00:00:00Z", "2025-01-01T00:00:00.000Z"),
+    ("2025-01-01T05:30:00+02:00", "2025-01-01T03:30:00.000Z"),
+])
+def test_since_is_stored_in_api_format(since, expected):
+    assert Watermark(since=since).timestamp == expected
+
+
+def test_invalid_since_is_rejected():
+    with pytest.raises(ValueError):
+        Watermark(since="yesterday")
+
+
+def test_saved_mark_wins_over_since(tmp_path):
+    path = tmp_path / "mark.json"
+    path.write_text(json.dumps({"timestamp": "2025-02-01T00:00:00.000Z", "boundary_ids": ["e1"]}))
+
+    mark = Watermark(path, since="2025-01-01")
+
+    assert mark.timestamp == "2025-02-01T00:00:00.000Z"
+    assert mark.boundary_ids == {"e1"}
+
+
+def test_watch_once_from_a_date(api, cli):
+    emails = ndjson(cli("emails", "watch", "--once", "--since", "2025-01-01", "--name", "t", "--brief").stdout)
+    assert len(emails) == len(api.fixtures.emails)
+
+    # The mark moved past everything, so a second run finds nothing
+    assert cli("emails", "watch", "--once", "--name", "t", "--brief").stdout.strip() == ""
+
+
+def test_watch_rejects_an_invalid_since(cli):
+    proc = cli("emails", "watch", "--once", "--since", "yesterday", check=False)
+
+    assert proc.returncode == 1
+    assert proc.stdout.startswith("Error:")